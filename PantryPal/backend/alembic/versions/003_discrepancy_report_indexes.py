@@ -0,0 +1,34 @@
+"""discrepancy report indexes
+
+Revision ID: 003_discrepancy_report_indexes
+Revises: 002_add_counter_role
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003_discrepancy_report_indexes'
+down_revision = '002_add_counter_role'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Approved counts within a date range
+    op.create_index('ix_counts_status_count_date', 'counts', ['status', 'count_date'], unique=False)
+    # Covering index so the report reads count item values without heap lookups
+    op.create_index(
+        'ix_count_items_count_id_report',
+        'count_items',
+        ['count_id'],
+        unique=False,
+        postgresql_include=['item_id', 'expected_quantity', 'actual_quantity', 'discrepancy']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_count_items_count_id_report', table_name='count_items')
+    op.drop_index('ix_counts_status_count_date', table_name='counts')
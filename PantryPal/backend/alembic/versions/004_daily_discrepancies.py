@@ -0,0 +1,41 @@
+"""daily discrepancy rollup
+
+Revision ID: 004_daily_discrepancies
+Revises: 003_discrepancy_report_indexes
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '004_daily_discrepancies'
+down_revision = '003_discrepancy_report_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('daily_discrepancies',
+        sa.Column('count_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('item_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('count_date', sa.Date(), nullable=False),
+        sa.Column('expected_quantity', sa.Integer(), nullable=False),
+        sa.Column('actual_quantity', sa.Integer(), nullable=False),
+        sa.Column('discrepancy', sa.Integer(), nullable=False),
+        sa.Column('variance_percentage', sa.Numeric(10, 2), nullable=False),
+        sa.Column('is_significant', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.ForeignKeyConstraint(['count_id'], ['counts.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['item_id'], ['items.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('count_id', 'item_id')
+    )
+    op.create_index('ix_daily_discrepancies_count_date', 'daily_discrepancies', ['count_date', 'item_id'], unique=False)
+    # Existing history is loaded with scripts/backfill_discrepancy_rollup.py
+
+
+def downgrade() -> None:
+    op.drop_index('ix_daily_discrepancies_count_date', table_name='daily_discrepancies')
+    op.drop_table('daily_discrepancies')
@@ -0,0 +1,29 @@
+"""count keyset pagination indexes
+
+Revision ID: 005_count_pagination_indexes
+Revises: 004_daily_discrepancies
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005_count_pagination_indexes'
+down_revision = '004_daily_discrepancies'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Items and users page on their existing unique name/email indexes
+    op.create_index('ix_counts_count_date_id', 'counts', ['count_date', 'id'], unique=False)
+    op.create_index('ix_counts_created_at_id', 'counts', ['created_at', 'id'], unique=False)
+    op.create_index('ix_counts_status_submitted_at_id', 'counts', ['status', 'submitted_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_counts_status_submitted_at_id', table_name='counts')
+    op.drop_index('ix_counts_created_at_id', table_name='counts')
+    op.drop_index('ix_counts_count_date_id', table_name='counts')
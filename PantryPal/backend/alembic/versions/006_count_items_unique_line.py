@@ -0,0 +1,35 @@
+"""unique count line per item
+
+Revision ID: 006_count_items_unique_line
+Revises: 005_count_pagination_indexes
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006_count_items_unique_line'
+down_revision = '005_count_pagination_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The single-item endpoint used to append duplicate lines; keep the most
+    # recently updated one for each (count, item) before enforcing uniqueness
+    op.execute("""
+        DELETE FROM count_items older
+        USING count_items newer
+        WHERE older.count_id = newer.count_id
+          AND older.item_id = newer.item_id
+          AND (older.updated_at, older.id) < (newer.updated_at, newer.id)
+    """)
+    op.create_unique_constraint(
+        'uq_count_items_count_id_item_id', 'count_items', ['count_id', 'item_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_count_items_count_id_item_id', 'count_items', type_='unique')
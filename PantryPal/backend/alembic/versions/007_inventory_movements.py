@@ -0,0 +1,48 @@
+"""inventory movement ledger
+
+Revision ID: 007_inventory_movements
+Revises: 006_count_items_unique_line
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '007_inventory_movements'
+down_revision = '006_count_items_unique_line'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("DO $$ BEGIN IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'movement_reason') THEN CREATE TYPE movement_reason AS ENUM ('adjustment', 'manual', 'count_approval', 'import'); END IF; END$$;")
+
+    op.create_table('inventory_movements',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('item_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('delta', sa.Integer(), nullable=False),
+        sa.Column('quantity_after', sa.Integer(), nullable=False),
+        sa.Column('reason', postgresql.ENUM('adjustment', 'manual', 'count_approval', 'import',
+                  name='movement_reason', create_type=False), nullable=False),
+        sa.Column('count_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.ForeignKeyConstraint(['item_id'], ['items.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['count_id'], ['counts.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_inventory_movements_item_id_created_at', 'inventory_movements',
+        ['item_id', 'created_at', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_inventory_movements_item_id_created_at', table_name='inventory_movements')
+    op.drop_table('inventory_movements')
+    op.execute("DO $$ BEGIN IF EXISTS (SELECT 1 FROM pg_type WHERE typname = 'movement_reason') THEN DROP TYPE movement_reason; END IF; END$$;")
@@ -0,0 +1,24 @@
+"""user token version for revocation
+
+Revision ID: 008_user_token_version
+Revises: 007_inventory_movements
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008_user_token_version'
+down_revision = '007_inventory_movements'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,39 @@
+"""item trigram search indexes
+
+Revision ID: 009_item_trigram_search
+Revises: 008_user_token_version
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009_item_trigram_search'
+down_revision = '008_user_token_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Fuzzy and substring matching on names and descriptions
+    op.create_index(
+        'ix_items_name_trgm', 'items', ['name'],
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+    op.create_index(
+        'ix_items_description_trgm', 'items', ['description'],
+        postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'}
+    )
+    # Case-insensitive prefix lookups, whatever the database collation
+    op.create_index(
+        'ix_items_name_lower_prefix', 'items', [sa.text('lower(name) text_pattern_ops')]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_items_name_lower_prefix', table_name='items')
+    op.drop_index('ix_items_description_trgm', table_name='items')
+    op.drop_index('ix_items_name_trgm', table_name='items')
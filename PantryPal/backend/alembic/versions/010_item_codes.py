@@ -0,0 +1,35 @@
+"""item barcodes and SKUs
+
+Revision ID: 010_item_codes
+Revises: 009_item_trigram_search
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '010_item_codes'
+down_revision = '009_item_trigram_search'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('item_codes',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('item_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('code', sa.String(length=64), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.ForeignKeyConstraint(['item_id'], ['items.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('code', name='uq_item_codes_code')
+    )
+    op.create_index('ix_item_codes_item_id', 'item_codes', ['item_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_item_codes_item_id', table_name='item_codes')
+    op.drop_table('item_codes')
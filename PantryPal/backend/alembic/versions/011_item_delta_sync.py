@@ -0,0 +1,37 @@
+"""item delta sync: updated_at index and tombstones
+
+Revision ID: 011_item_delta_sync
+Revises: 010_item_codes
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '011_item_delta_sync'
+down_revision = '010_item_codes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_items_updated_at_id', 'items', ['updated_at', 'id'], unique=False)
+
+    op.create_table('item_tombstones',
+        sa.Column('item_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('item_id')
+    )
+    op.create_index(
+        'ix_item_tombstones_deleted_at_item_id', 'item_tombstones',
+        ['deleted_at', 'item_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_item_tombstones_deleted_at_item_id', table_name='item_tombstones')
+    op.drop_table('item_tombstones')
+    op.drop_index('ix_items_updated_at_id', table_name='items')
@@ -0,0 +1,53 @@
+"""item change xid: commit-ordered item change tracking
+
+Revision ID: 012_item_change_xid
+Revises: 011_item_delta_sync
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '012_item_change_xid'
+down_revision = '011_item_delta_sync'
+branch_labels = None
+depends_on = None
+
+CHANGE_XID = "pg_current_xact_id()::text::bigint"
+
+
+def upgrade() -> None:
+    # Id of the transaction that last wrote the row (existing rows get this
+    # migration's); unlike a timestamp, it can be checked for having finished
+    for table in ('items', 'item_tombstones'):
+        op.add_column(table, sa.Column(
+            'change_xid', sa.BigInteger(), server_default=sa.text(CHANGE_XID), nullable=False
+        ))
+    op.execute(f"""
+        CREATE FUNCTION stamp_change_xid() RETURNS trigger AS $$
+        BEGIN
+            NEW.change_xid := {CHANGE_XID};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(
+        "CREATE TRIGGER items_change_xid BEFORE INSERT OR UPDATE ON items "
+        "FOR EACH ROW EXECUTE FUNCTION stamp_change_xid()"
+    )
+    op.create_index('ix_items_change_xid_id', 'items', ['change_xid', 'id'], unique=False)
+    op.create_index(
+        'ix_item_tombstones_change_xid_item_id', 'item_tombstones',
+        ['change_xid', 'item_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_item_tombstones_change_xid_item_id', table_name='item_tombstones')
+    op.drop_index('ix_items_change_xid_id', table_name='items')
+    op.execute("DROP TRIGGER items_change_xid ON items")
+    op.execute("DROP FUNCTION stamp_change_xid()")
+    for table in ('item_tombstones', 'items'):
+        op.drop_column(table, 'change_xid')
@@ -0,0 +1,37 @@
+"""daily discrepancy rollup: count creation time
+
+Revision ID: 013_discrepancy_count_created_at
+Revises: 012_item_change_xid
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '013_discrepancy_count_created_at'
+down_revision = '012_item_change_xid'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The dashboard's recent discrepancies go by when the count was created
+    op.add_column('daily_discrepancies', sa.Column('count_created_at', sa.DateTime(), nullable=True))
+    op.execute("""
+        UPDATE daily_discrepancies
+        SET count_created_at = counts.created_at
+        FROM counts
+        WHERE counts.id = daily_discrepancies.count_id
+    """)
+    op.alter_column('daily_discrepancies', 'count_created_at', nullable=False)
+    op.create_index(
+        'ix_daily_discrepancies_count_created_at', 'daily_discrepancies',
+        ['count_created_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_daily_discrepancies_count_created_at', table_name='daily_discrepancies')
+    op.drop_column('daily_discrepancies', 'count_created_at')
@@ -9,16 +9,85 @@ class Settings(BaseSettings):
     DATABASE_HOST: str
     DATABASE_PORT: int = 5432
     DATABASE_NAME: str
+
+    # Connection pool (per worker process)
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30.0
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_ECHO: bool = False
+
+    # Read replica (optional). Unset credentials fall back to the primary's.
+    DATABASE_REPLICA_HOST: str | None = None
+    DATABASE_REPLICA_PORT: int | None = None
+    DATABASE_REPLICA_USER: str | None = None
+    DATABASE_REPLICA_PASSWORD: str | None = None
+    DATABASE_REPLICA_NAME: str | None = None
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 10.0
+    DATABASE_REPLICA_LAG_CHECK_INTERVAL: float = 5.0
     
     @property
     def SQLALCHEMY_DATABASE_URL(self) -> str:
-        return f"postgresql://{self.DATABASE_USER}:{self.DATABASE_PASSWORD}@{self.DATABASE_HOST}:{self.DATABASE_PORT}/{self.DATABASE_NAME}"
+        return f"postgresql+psycopg2://{self.DATABASE_USER}:{self.DATABASE_PASSWORD}@{self.DATABASE_HOST}:{self.DATABASE_PORT}/{self.DATABASE_NAME}"
+
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URL(self) -> str:
+        return f"postgresql+asyncpg://{self.DATABASE_USER}:{self.DATABASE_PASSWORD}@{self.DATABASE_HOST}:{self.DATABASE_PORT}/{self.DATABASE_NAME}"
+
+    @property
+    def SQLALCHEMY_REPLICA_ASYNC_DATABASE_URL(self) -> str | None:
+        if not self.DATABASE_REPLICA_HOST:
+            return None
+        user = self.DATABASE_REPLICA_USER or self.DATABASE_USER
+        password = self.DATABASE_REPLICA_PASSWORD or self.DATABASE_PASSWORD
+        port = self.DATABASE_REPLICA_PORT or self.DATABASE_PORT
+        name = self.DATABASE_REPLICA_NAME or self.DATABASE_NAME
+        return f"postgresql+asyncpg://{user}:{password}@{self.DATABASE_REPLICA_HOST}:{port}/{name}"
 
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Trust role/active claims in access tokens instead of loading the user;
+    # revocation is checked against a token version map refreshed this often
+    AUTH_STATELESS: bool = False
+    AUTH_TOKEN_VERSION_REFRESH_SECONDS: float = 5.0
+
+    # Password hashing. Hashes made with another scheme or round count are
+    # upgraded on the user's next login.
+    PASSWORD_HASH_SCHEME: str = "pbkdf2_sha256"
+    PASSWORD_HASH_ROUNDS: int | None = None
+    # Hashing runs on this many worker threads; requests beyond the queue
+    # limit get a 503 instead of piling up behind a login burst
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # Caching (per worker process; 0 disables)
+    DASHBOARD_CACHE_TTL_SECONDS: float = 30.0
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0
+    PRINCIPAL_CACHE_MAXSIZE: int = 10000
+
+    # Event loop stall detection (opt-in instrumentation)
+    LOOP_MONITOR_ENABLED: bool = False
+    LOOP_MONITOR_INTERVAL_MS: float = 50.0
+    LOOP_STALL_THRESHOLD_MS: float = 100.0
+
+    # Server push. Change events reach every worker over Postgres
+    # LISTEN/NOTIFY on EVENTS_CHANNEL; each push client buffers at most
+    # EVENTS_CLIENT_QUEUE_SIZE events before it is told to resync instead
+    EVENTS_ENABLED: bool = True
+    EVENTS_CHANNEL: str = "pantrypal_events"
+    EVENTS_CLIENT_QUEUE_SIZE: int = 100
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+
+    # Wire format. Responses at least this large are gzipped for clients that
+    # accept it (0 disables); compressed request bodies may inflate to at most
+    # REQUEST_MAX_DECOMPRESSED_BYTES
+    RESPONSE_GZIP_MIN_BYTES: int = 1024
+    RESPONSE_GZIP_LEVEL: int = 6
+    REQUEST_MAX_DECOMPRESSED_BYTES: int = 20 * 1024 * 1024
 
     # CORS
     FRONTEND_URL: str
@@ -1,20 +1,134 @@
-from sqlalchemy import create_engine
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.config import settings
+from app.utils.pool_metrics import PoolMetrics, create_pool_metrics, instrument_engine
+
+logger = logging.getLogger(__name__)
+
+def _create_async_engine(url: str, metrics: PoolMetrics) -> AsyncEngine:
+    """Create an asyncpg engine with the configured, instrumented pool."""
+    async_engine = create_async_engine(
+        url,
+        echo=settings.DATABASE_ECHO,
+        poolclass=metrics.pool_class(),
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+    )
+    instrument_engine(async_engine, metrics)
+    return async_engine
+
+# Async engine used by the API (asyncpg driver)
+engine = _create_async_engine(settings.SQLALCHEMY_ASYNC_DATABASE_URL, create_pool_metrics("primary"))
+
+# Async session factory. Objects stay usable after commit so routers can
+# return them without triggering a lazy refresh outside the event loop.
+AsyncSessionLocal = async_sessionmaker(
+    bind=engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
 
-# Create engine
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URL, echo=True)
+# Optional read replica for read-only routers (dashboard, reports)
+replica_engine: Optional[AsyncEngine] = None
+ReplicaSessionLocal: Optional[async_sessionmaker] = None
+if settings.SQLALCHEMY_REPLICA_ASYNC_DATABASE_URL:
+    replica_engine = _create_async_engine(
+        settings.SQLALCHEMY_REPLICA_ASYNC_DATABASE_URL, create_pool_metrics("replica")
+    )
+    ReplicaSessionLocal = async_sessionmaker(
+        bind=replica_engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Sync engine/session, only for Alembic migrations and the seed scripts
+sync_engine = create_engine(settings.SQLALCHEMY_DATABASE_URL)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
 
 class Base(DeclarativeBase):
     pass
 
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+class ReplicaHealth:
+    """Cached replica lag check so reads only go to a replica that is caught up."""
+
+    def __init__(self):
+        self.healthy = False
+        self.lag_seconds: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def is_stale(self) -> bool:
+        return (
+            self.checked_at is None
+            or time.monotonic() - self.checked_at >= settings.DATABASE_REPLICA_LAG_CHECK_INTERVAL
+        )
+
+    async def check(self) -> bool:
+        """Return whether the replica is usable, re-checking lag at most once per interval."""
+        if not self.is_stale():
+            return self.healthy
+        async with self._lock:
+            if not self.is_stale():
+                return self.healthy
+            try:
+                lag = await asyncio.wait_for(self._fetch_lag(), timeout=2.0)
+                self.lag_seconds = lag
+                self.healthy = lag <= settings.DATABASE_REPLICA_MAX_LAG_SECONDS
+                if not self.healthy:
+                    logger.warning("Replica lag %.1fs exceeds limit, reading from primary", lag)
+            except Exception as exc:
+                logger.warning("Replica lag check failed (%r), reading from primary", exc)
+                self.lag_seconds = None
+                self.healthy = False
+            self.checked_at = time.monotonic()
+            return self.healthy
+
+    async def _fetch_lag(self) -> float:
+        async with replica_engine.connect() as conn:
+            result = await conn.execute(REPLICA_LAG_QUERY)
+            return float(result.scalar() or 0)
+
+    def status(self) -> dict:
+        return {
+            "configured": replica_engine is not None,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": settings.DATABASE_REPLICA_MAX_LAG_SECONDS,
+        }
+
+replica_health = ReplicaHealth()
+
+async def get_read_sessionmaker() -> async_sessionmaker:
+    """Pick the replica when configured and within the lag limit, else the primary."""
+    if ReplicaSessionLocal is not None and await replica_health.check():
+        return ReplicaSessionLocal
+    return AsyncSessionLocal
+
+# Dependency to get a DB session for read-only endpoints
+async def get_read_db():
+    session_factory = await get_read_sessionmaker()
+    async with session_factory() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
@@ -1,19 +1,65 @@
-from typing import Annotated
+from typing import Annotated, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
-from app.database import get_db
+from uuid import UUID
+from app.database import AsyncSessionLocal
 from app.models.user import User
 from app.config import settings
 from app.schemas.auth import TokenData
+from app.utils.principals import Principal, invalidate_principal, principal_cache
+from app.utils.token_versions import token_versions
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
+# For endpoints that also accept the token another way
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login", auto_error=False)
 
-async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: Annotated[Session, Depends(get_db)]
-) -> User:
+async def load_principal(user_id: UUID) -> Optional[Principal]:
+    """Get the principal for a user id, from the cache or else the users table.
+
+    Uses its own short-lived session so cache hits never open one.
+    """
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        async with AsyncSessionLocal() as db:
+            user = await User.get_by_id(db, user_id)
+        if user is None:
+            return None
+        principal = Principal.from_user(user)
+        principal_cache.set(user_id, principal)
+    return principal
+
+async def principal_from_claims(payload: dict, user_id: UUID) -> Optional[Principal]:
+    """Build the principal from a stateless access token's claims.
+
+    Returns None when the claims cannot be vouched for from the version map
+    (no map, a user it has not seen yet, or a token newer than the map because
+    another worker revoked the old ones), so the caller falls back to loading
+    the user. Raises if the token's version has been revoked.
+    """
+    versions = await token_versions.current()
+    if versions is None or user_id not in versions:
+        return None
+    version = payload.get("ver")
+    if isinstance(version, int) and version > versions[user_id]:
+        return None
+    if version != versions[user_id]:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return Principal(
+        id=user_id,
+        email=payload.get("email", ""),
+        full_name=payload.get("name", ""),
+        role=payload["role"],
+        is_active=bool(payload.get("active")),
+        token_version=versions[user_id],
+    )
+
+async def authenticate_token(token: str) -> Principal:
+    """Resolve an access token to its principal, raising 401 if it is not valid."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -26,18 +72,43 @@ async def get_current_user(
         if user_id is None:
             raise credentials_exception
         token_data = TokenData(user_id=user_id)
-    except JWTError:
+        user_uuid = UUID(token_data.user_id)
+    except (JWTError, ValueError):
         raise credentials_exception
         
-    user = User.get_by_id(db, token_data.user_id)
-    if user is None:
+    if settings.AUTH_STATELESS and "role" in payload:
+        principal = await principal_from_claims(payload, user_uuid)
+        if principal is not None:
+            return principal
+    
+    principal = await load_principal(user_uuid)
+    if principal is None:
         raise credentials_exception
+    if "ver" in payload:
+        version = payload["ver"]
+        if isinstance(version, int) and version > principal.token_version:
+            # Issued after a revocation on another worker; this worker's
+            # cached principal is the stale side, so reload it
+            invalidate_principal(user_uuid)
+            principal = await load_principal(user_uuid)
+            if principal is None:
+                raise credentials_exception
+            if settings.AUTH_STATELESS:
+                token_versions.bump(user_uuid, principal.token_version)
+        # Tokens issued before the user's version was bumped are revoked
+        if version != principal.token_version:
+            raise credentials_exception
         
-    return user
+    return principal
+
+async def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)]
+) -> Principal:
+    return await authenticate_token(token)
 
 async def get_current_active_user(
-    current_user: Annotated[User, Depends(get_current_user)]
-) -> User:
+    current_user: Annotated[Principal, Depends(get_current_user)]
+) -> Principal:
     if not current_user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -46,8 +117,8 @@ async def get_current_active_user(
     return current_user
 
 async def get_current_admin_user(
-    current_user: Annotated[User, Depends(get_current_active_user)]
-) -> User:
+    current_user: Annotated[Principal, Depends(get_current_active_user)]
+) -> Principal:
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -56,8 +127,8 @@ async def get_current_admin_user(
     return current_user
 
 async def get_current_manager_or_admin_user(
-    current_user: Annotated[User, Depends(get_current_active_user)]
-) -> User:
+    current_user: Annotated[Principal, Depends(get_current_active_user)]
+) -> Principal:
     if current_user.role not in ["admin", "manager"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -66,8 +137,8 @@ async def get_current_manager_or_admin_user(
     return current_user
 
 async def get_current_counter_or_above_user(
-    current_user: Annotated[User, Depends(get_current_active_user)]
-) -> User:
+    current_user: Annotated[Principal, Depends(get_current_active_user)]
+) -> Principal:
     if current_user.role not in ["admin", "manager", "counter"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
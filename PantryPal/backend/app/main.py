@@ -1,14 +1,43 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.routers import auth, users, items, counts, dashboard, reports
+from app.utils.events import event_broker
+from app.utils.loop_monitor import RouteTrackingMiddleware, loop_monitor
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.utils.wire import ResponseCompressionMiddleware
+from app.routers import auth, users, items, counts, dashboard, reports, metrics, events
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    if settings.EVENTS_ENABLED:
+        event_broker.start()
+    yield
+    await event_broker.stop()
+    await loop_monitor.stop()
 
 app = FastAPI(
     title="PantryPal API",
     description="Inventory management system with daily count workflow",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+if settings.LOOP_MONITOR_ENABLED:
+    # Lets stall reports name the route that blocked the loop
+    app.add_middleware(RouteTrackingMiddleware, monitor=loop_monitor)
+
+if settings.RESPONSE_GZIP_MIN_BYTES > 0:
+    app.add_middleware(
+        ResponseCompressionMiddleware,
+        # Server-Sent Events must reach the client as they are sent
+        exclude_paths=("/api/events",),
+        minimum_size=settings.RESPONSE_GZIP_MIN_BYTES,
+        compresslevel=settings.RESPONSE_GZIP_LEVEL
+    )
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -24,6 +53,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Last-Modified"],
 )
 
 # Include routers
@@ -33,6 +63,8 @@ app.include_router(items.router, prefix="/api/items", tags=["Items"])
 app.include_router(counts.router, prefix="/api/counts", tags=["Counts"])
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
 app.include_router(reports.router, prefix="/api/reports", tags=["Reports"])
+app.include_router(metrics.router, prefix="/api/metrics", tags=["Metrics"])
+app.include_router(events.router, prefix="/api/events", tags=["Events"])
 
 @app.get("/")
 async def root():
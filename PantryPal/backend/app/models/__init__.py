@@ -1,3 +1,5 @@
 from app.models.user import *
 from app.models.item import *
-from app.models.count import *
\ No newline at end of file
+from app.models.count import *
+from app.models.discrepancy import *
+from app.models.inventory import *
\ No newline at end of file
@@ -1,7 +1,15 @@
 from datetime import datetime, date
 from typing import Optional, List
-from sqlalchemy import String, Text, ForeignKey, DateTime, select, Date, func
-from sqlalchemy.orm import Mapped, mapped_column, relationship, Session
+from sqlalchemy import (
+    String, Text, ForeignKey, DateTime, select, Date, func, Enum as SQLAEnum,
+    Index, Integer, Numeric, UniqueConstraint, Uuid, bindparam, case, cast, column,
+    literal, or_, true
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import (
+    Mapped, mapped_column, query_expression, relationship, selectinload, with_expression
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID, uuid4
 from enum import Enum
@@ -15,10 +23,22 @@ class CountStatus(str, Enum):
 
 class Count(Base):
     __tablename__ = "counts"
+    __table_args__ = (
+        # Report queries filter approved counts by date range
+        Index("ix_counts_status_count_date", "status", "count_date"),
+        # Keyset pagination keys for the count list endpoints
+        Index("ix_counts_count_date_id", "count_date", "id"),
+        Index("ix_counts_created_at_id", "created_at", "id"),
+        Index("ix_counts_status_submitted_at_id", "status", "submitted_at", "id"),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     count_date: Mapped[date] = mapped_column(Date, index=True)
-    status: Mapped[CountStatus] = mapped_column(String(20), server_default=CountStatus.DRAFT.value)
+    # Map to the native count_status enum so asyncpg binds the right type
+    status: Mapped[CountStatus] = mapped_column(
+        SQLAEnum(CountStatus, name="count_status", values_callable=lambda enum: [e.value for e in enum]),
+        server_default=CountStatus.DRAFT.value
+    )
     created_by: Mapped[UUID] = mapped_column(ForeignKey("users.id"))
     submitted_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     reviewed_by: Mapped[Optional[UUID]] = mapped_column(ForeignKey("users.id"), nullable=True)
@@ -30,6 +50,13 @@ class Count(Base):
         DateTime, server_default=func.now(), onupdate=func.now()
     )
 
+    # Creator's full name, filled in by queries that load it with with_expression()
+    created_by_name: Mapped[Optional[str]] = query_expression()
+    # Line aggregates, filled in by with_summary()
+    items_count: Mapped[Optional[int]] = query_expression()
+    total_abs_discrepancy: Mapped[Optional[int]] = query_expression()
+    significant_discrepancy_count: Mapped[Optional[int]] = query_expression()
+
     # Relationships
     creator = relationship("User", foreign_keys=[created_by], back_populates="created_counts")
     reviewer = relationship("User", foreign_keys=[reviewed_by], back_populates="reviewed_counts")
@@ -41,34 +68,111 @@ class Count(Base):
         return await db.get(cls, count_id)
 
     @classmethod
-    def get_by_id_sync(cls, db: Session, count_id: UUID) -> Optional["Count"]:
-        """Get a count by ID (sync version)."""
-        return db.get(cls, count_id)
+    async def get_with_items(cls, db: AsyncSession, count_id: UUID) -> Optional["Count"]:
+        """Get a count by ID with its count items eagerly loaded (and refreshed)."""
+        stmt = (
+            select(cls)
+            .where(cls.id == count_id)
+            .options(selectinload(cls.count_items))
+            .execution_options(populate_existing=True)
+        )
+        result = await db.execute(stmt)
+        return result.scalar_one_or_none()
 
     @classmethod
-    async def get_user_active_count(cls, db: AsyncSession, user_id: UUID, count_date: date) -> Optional["Count"]:
-        """Get a user's active count for a specific date."""
-        stmt = select(cls).where(
-            (cls.created_by == user_id) & 
-            (cls.count_date == count_date) &
-            (cls.status == CountStatus.DRAFT)
+    async def get_version(cls, db: AsyncSession, count_id: UUID):
+        """Owner and change markers of a count and its lines, without loading them.
+
+        Returns a row of (created_by, updated_at, items_count, items_updated_at),
+        or None when the count does not exist. Line edits do not touch the
+        count row, so the line count and latest line change are included.
+        """
+        lines = select(
+            func.count().label("items_count"),
+            func.max(CountItem.updated_at).label("items_updated_at")
+        ).where(CountItem.count_id == cls.id).lateral("lines")
+        stmt = select(
+            cls.created_by, cls.updated_at, lines.c.items_count, lines.c.items_updated_at
+        ).join(lines, true()).where(cls.id == count_id)
+        result = await db.execute(stmt)
+        return result.one_or_none()
+
+    @classmethod
+    async def get_for_update(cls, db: AsyncSession, count_id: UUID) -> Optional["Count"]:
+        """Get a count by ID, row-locked until the transaction ends.
+
+        Re-reads the row so status checks see any change that committed while
+        waiting for the lock.
+        """
+        stmt = (
+            select(cls)
+            .where(cls.id == count_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
         )
         result = await db.execute(stmt)
         return result.scalar_one_or_none()
 
     @classmethod
-    def get_user_active_count_sync(cls, db: Session, user_id: UUID, count_date: date) -> Optional["Count"]:
-        """Get a user's active count for a specific date (sync version)."""
+    def with_summary(cls, query):
+        """Load line aggregates onto the counts of ``query`` instead of the lines.
+
+        A lateral subquery aggregates each count's lines after the outer
+        filter and limit apply, reading only the count_items covering index.
+        """
+        summary = select(
+            func.count().label("items_count"),
+            func.coalesce(func.sum(func.abs(CountItem.discrepancy)), 0).label("total_abs_discrepancy"),
+            func.count().filter(CountItem.has_significant_discrepancy).label("significant_discrepancy_count")
+        ).where(CountItem.count_id == cls.id).lateral("summary")
+        return query.join(summary, true()).options(
+            with_expression(cls.items_count, summary.c.items_count),
+            with_expression(cls.total_abs_discrepancy, summary.c.total_abs_discrepancy),
+            with_expression(cls.significant_discrepancy_count, summary.c.significant_discrepancy_count)
+        )
+
+    @classmethod
+    async def get_user_active_count(cls, db: AsyncSession, user_id: UUID, count_date: date) -> Optional["Count"]:
+        """Get a user's active count for a specific date."""
         stmt = select(cls).where(
             (cls.created_by == user_id) & 
             (cls.count_date == count_date) &
             (cls.status == CountStatus.DRAFT)
         )
-        result = db.execute(stmt)
+        result = await db.execute(stmt)
         return result.scalar_one_or_none()
 
+    def submit(self) -> None:
+        """Mark the count as submitted for review."""
+        self.status = CountStatus.SUBMITTED
+        self.submitted_at = datetime.utcnow()
+
+    def approve(self, reviewer_id: UUID) -> None:
+        """Mark the count as approved by a reviewer."""
+        self.status = CountStatus.APPROVED
+        self.reviewed_by = reviewer_id
+        self.reviewed_at = datetime.utcnow()
+
+    def reject(self, reviewer_id: UUID, reason: Optional[str] = None) -> None:
+        """Mark the count as rejected by a reviewer."""
+        self.status = CountStatus.REJECTED
+        self.reviewed_by = reviewer_id
+        self.reviewed_at = datetime.utcnow()
+        if reason:
+            self.rejection_reason = reason
+
 class CountItem(Base):
     __tablename__ = "count_items"
+    __table_args__ = (
+        # Covers the discrepancy report so it can be answered from the index
+        Index(
+            "ix_count_items_count_id_report",
+            "count_id",
+            postgresql_include=["item_id", "expected_quantity", "actual_quantity", "discrepancy"]
+        ),
+        # One line per item per count; the bulk upsert conflicts on this
+        UniqueConstraint("count_id", "item_id", name="uq_count_items_count_id_item_id"),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     count_id: Mapped[UUID] = mapped_column(ForeignKey("counts.id"))
@@ -86,9 +190,98 @@ class CountItem(Base):
     count = relationship("Count", back_populates="count_items")
     item = relationship("Item", back_populates="count_items")
 
-    @property
+    @classmethod
+    def summary_subquery(cls, count_filter=None):
+        """Per-count aggregates over count items, for joining onto Count queries.
+
+        Pass the outer query's Count criteria as ``count_filter`` so only the
+        counts in scope are aggregated instead of the whole history.
+        """
+        query = select(
+            cls.count_id.label("count_id"),
+            func.count(cls.id).label("items_count")
+        )
+        if count_filter is not None:
+            query = query.where(cls.count_id.in_(select(Count.id).where(count_filter)))
+        return query.group_by(cls.count_id).subquery()
+
+    @classmethod
+    def upsert_statement(cls, count_id: UUID, lines: list):
+        """Insert or update a batch of count lines in one statement.
+
+        ``lines`` are CountItemCreate-like objects with unique item ids. They are
+        bound as four arrays and unnested, so the statement is the same whatever
+        the batch size. New lines take the item's current quantity as expected;
+        existing lines keep theirs and get actual quantity and discrepancy
+        recomputed, plus notes when given. Returns the item ids that matched
+        an item, so callers can spot unknown ones.
+        """
+        from app.models.item import Item
+
+        rows = func.unnest(
+            bindparam("ids", [uuid4() for _ in lines], type_=ARRAY(Uuid)),
+            bindparam("item_ids", [line.item_id for line in lines], type_=ARRAY(Uuid)),
+            bindparam("actual_quantities", [line.actual_quantity for line in lines], type_=ARRAY(Integer)),
+            bindparam("notes", [line.notes for line in lines], type_=ARRAY(Text)),
+        ).table_valued(
+            column("id", Uuid),
+            column("item_id", Uuid),
+            column("actual_quantity", Integer),
+            column("notes", Text),
+        ).render_derived(name="lines")
+
+        stmt = insert(cls).from_select(
+            ["id", "count_id", "item_id", "expected_quantity", "actual_quantity", "discrepancy", "notes"],
+            select(
+                rows.c.id,
+                literal(count_id, Uuid),
+                rows.c.item_id,
+                Item.current_quantity,
+                rows.c.actual_quantity,
+                rows.c.actual_quantity - Item.current_quantity,
+                rows.c.notes,
+            ).join_from(rows, Item, Item.id == rows.c.item_id)
+        )
+        return stmt.on_conflict_do_update(
+            constraint="uq_count_items_count_id_item_id",
+            set_={
+                "actual_quantity": stmt.excluded.actual_quantity,
+                "discrepancy": stmt.excluded.actual_quantity - cls.expected_quantity,
+                "notes": func.coalesce(stmt.excluded.notes, cls.notes),
+                "updated_at": func.now(),
+            }
+        ).returning(cls.item_id)
+
+    @hybrid_property
     def has_significant_discrepancy(self) -> bool:
         """Check if the discrepancy is more than 10% of expected quantity."""
         if self.expected_quantity == 0:
             return self.actual_quantity > 0
-        return abs(self.discrepancy) > (self.expected_quantity * 0.1)
\ No newline at end of file
+        return abs(self.discrepancy) > (self.expected_quantity * 0.1)
+
+    @has_significant_discrepancy.inplace.expression
+    @classmethod
+    def _has_significant_discrepancy_expression(cls):
+        # abs(discrepancy) * 10 > expected keeps the comparison in integers
+        return or_(
+            (cls.expected_quantity == 0) & (cls.actual_quantity > 0),
+            (cls.expected_quantity > 0) & (func.abs(cls.discrepancy) * 10 > cls.expected_quantity)
+        )
+
+    @hybrid_property
+    def variance_percentage(self) -> float:
+        """Absolute discrepancy as a percentage of expected quantity (100% if none was expected)."""
+        if self.expected_quantity == 0:
+            return 100.0 if self.actual_quantity > 0 else 0.0
+        return abs(self.discrepancy) / self.expected_quantity * 100
+
+    @variance_percentage.inplace.expression
+    @classmethod
+    def _variance_percentage_expression(cls):
+        return case(
+            (cls.expected_quantity == 0, case((cls.actual_quantity > 0, 100), else_=0)),
+            else_=(
+                cast(func.abs(cls.discrepancy), Numeric) * 100
+                / func.nullif(cls.expected_quantity, 0)
+            )
+        )
@@ -0,0 +1,72 @@
+from datetime import datetime, date
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import Boolean, Date, DateTime, ForeignKey, Index, Numeric, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+from app.models.count import Count, CountItem, CountStatus
+
+class DailyDiscrepancy(Base):
+    """Rollup of approved count lines with a non-zero discrepancy, one row per count and item."""
+    __tablename__ = "daily_discrepancies"
+    __table_args__ = (
+        Index("ix_daily_discrepancies_count_date", "count_date", "item_id"),
+        Index("ix_daily_discrepancies_count_created_at", "count_created_at"),
+    )
+
+    count_id: Mapped[UUID] = mapped_column(ForeignKey("counts.id", ondelete="CASCADE"), primary_key=True)
+    item_id: Mapped[UUID] = mapped_column(ForeignKey("items.id", ondelete="CASCADE"), primary_key=True)
+    count_date: Mapped[date] = mapped_column(Date)
+    # When the count was created, for the dashboard's past-week window
+    count_created_at: Mapped[datetime] = mapped_column(DateTime)
+    expected_quantity: Mapped[int]
+    actual_quantity: Mapped[int]
+    discrepancy: Mapped[int]
+    variance_percentage: Mapped[Decimal] = mapped_column(Numeric(10, 2))
+    is_significant: Mapped[bool] = mapped_column(Boolean)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+    @classmethod
+    def populate_statement(cls, count_filter):
+        """INSERT ... SELECT rolling up the approved counts matching ``count_filter``.
+
+        Idempotent: re-running it for the same counts overwrites their rows.
+        Works with both the async API session and the sync backfill session.
+        """
+        source = select(
+            CountItem.count_id,
+            CountItem.item_id,
+            Count.count_date,
+            Count.created_at,
+            CountItem.expected_quantity,
+            CountItem.actual_quantity,
+            CountItem.discrepancy,
+            func.round(CountItem.variance_percentage, 2),
+            CountItem.has_significant_discrepancy
+        ).join(Count).where(
+            (Count.status == CountStatus.APPROVED) &
+            (CountItem.discrepancy != 0) &
+            count_filter
+        )
+        stmt = insert(cls).from_select(
+            [
+                "count_id", "item_id", "count_date", "count_created_at", "expected_quantity",
+                "actual_quantity", "discrepancy", "variance_percentage", "is_significant"
+            ],
+            source
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=[cls.count_id, cls.item_id],
+            set_={
+                "count_date": stmt.excluded.count_date,
+                "count_created_at": stmt.excluded.count_created_at,
+                "expected_quantity": stmt.excluded.expected_quantity,
+                "actual_quantity": stmt.excluded.actual_quantity,
+                "discrepancy": stmt.excluded.discrepancy,
+                "variance_percentage": stmt.excluded.variance_percentage,
+                "is_significant": stmt.excluded.is_significant,
+            }
+        )
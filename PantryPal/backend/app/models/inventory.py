@@ -0,0 +1,41 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import DateTime, ForeignKey, Index, Text, func, Enum as SQLAEnum
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.database import Base
+
+class MovementReason(str, Enum):
+    ADJUSTMENT = "adjustment"
+    MANUAL = "manual"
+    COUNT_APPROVAL = "count_approval"
+    IMPORT = "import"
+
+class InventoryMovement(Base):
+    """Append-only record of a change to an item's on-hand quantity."""
+    __tablename__ = "inventory_movements"
+    __table_args__ = (
+        # Item history is read newest first
+        Index("ix_inventory_movements_item_id_created_at", "item_id", "created_at", "id"),
+    )
+
+    # Rows are written by INSERT ... SELECT, so ids come from the database
+    id: Mapped[UUID] = mapped_column(primary_key=True, server_default=func.gen_random_uuid())
+    item_id: Mapped[UUID] = mapped_column(ForeignKey("items.id", ondelete="CASCADE"))
+    delta: Mapped[int]
+    quantity_after: Mapped[int]
+    reason: Mapped[MovementReason] = mapped_column(
+        SQLAEnum(MovementReason, name="movement_reason", values_callable=lambda enum: [e.value for e in enum])
+    )
+    count_id: Mapped[Optional[UUID]] = mapped_column(
+        ForeignKey("counts.id", ondelete="SET NULL"), nullable=True
+    )
+    user_id: Mapped[Optional[UUID]] = mapped_column(ForeignKey("users.id"), nullable=True)
+    notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+    # Relationships
+    item = relationship("Item")
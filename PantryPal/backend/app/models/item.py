@@ -1,10 +1,14 @@
 from datetime import datetime
 from enum import Enum
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from uuid import UUID, uuid4
 
-from sqlalchemy import DateTime, String, Integer, Text, ForeignKey, select, func
+from sqlalchemy import (
+    BigInteger, DateTime, FetchedValue, String, Integer, Text, ForeignKey, Index, UniqueConstraint,
+    select, func, text, Enum as SQLAEnum
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import Base
 
@@ -18,13 +22,34 @@ class ItemCategory(str, Enum):
     FROZEN_FOODS = "Frozen Foods"
     OTHER = "Other"
 
+# Id of the writing transaction. Rows carry it in change_xid (set by the
+# database, see migration 012) so readers can tell when a change has committed.
+CHANGE_XID = text("pg_current_xact_id()::text::bigint")
+# Every transaction with a lower id than this has finished
+SETTLED_XID = text("pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+
 class Item(Base):
     __tablename__ = "items"
+    __table_args__ = (
+        # Item search: trigram matching on name/description, plus case-insensitive prefixes
+        Index("ix_items_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index(
+            "ix_items_description_trgm", "description",
+            postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}
+        ),
+        Index("ix_items_name_lower_prefix", text("lower(name) text_pattern_ops")),
+        Index("ix_items_updated_at_id", "updated_at", "id"),
+        # Delta sync reads changes in (change_xid, id) order
+        Index("ix_items_change_xid_id", "change_xid", "id"),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     name: Mapped[str] = mapped_column(String(255), unique=True, index=True)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    category: Mapped[ItemCategory] = mapped_column(String(50))
+    # Map to the native item_category enum so asyncpg binds the right type
+    category: Mapped[ItemCategory] = mapped_column(
+        SQLAEnum(ItemCategory, name="item_category", values_callable=lambda enum: [e.value for e in enum])
+    )
     unit_of_measure: Mapped[str] = mapped_column(String(50))
     par_level: Mapped[int] = mapped_column(Integer)
     current_quantity: Mapped[int] = mapped_column(Integer)
@@ -33,10 +58,15 @@ class Item(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
+    # Stamped on every insert and update by the items_change_xid trigger
+    change_xid: Mapped[int] = mapped_column(
+        BigInteger, server_default=CHANGE_XID, server_onupdate=FetchedValue()
+    )
 
     # Relationships
     creator = relationship("User", back_populates="items")
     count_items = relationship("CountItem", back_populates="item")
+    codes = relationship("ItemCode", back_populates="item", passive_deletes=True)
 
     @property
     def is_low_stock(self) -> bool:
@@ -44,18 +74,70 @@ class Item(Base):
         return self.current_quantity < self.par_level
 
     @classmethod
-    def get_by_id(cls, db, item_id: UUID) -> Optional["Item"]:
+    async def get_by_id(cls, db: AsyncSession, item_id: UUID) -> Optional["Item"]:
         """Get an item by ID."""
-        return db.get(cls, item_id)
+        return await db.get(cls, item_id)
 
     @classmethod
-    def get_by_id_sync(cls, db, item_id: UUID) -> Optional["Item"]:
-        """Get an item by ID (sync version - alias for compatibility)."""
-        return db.get(cls, item_id)
+    async def catalog_version(cls, db: AsyncSession) -> Tuple[Optional[int], Optional[datetime]]:
+        """Version of the whole catalog and its latest change time, from index lookups only.
+
+        The version is the newest change_xid across items and tombstones among
+        settled transactions, those below the snapshot's xmin, as for delta
+        sync. Every write from then on has a higher xid, so the version moves
+        with each committed add, edit or delete; like /items/changes, it does
+        so once every older transaction has finished, which for a write
+        committed alongside a slow one means when the slow one ends.
+        """
+        latest_xid = func.greatest(
+            select(func.max(cls.change_xid)).where(cls.change_xid < SETTLED_XID).scalar_subquery(),
+            select(func.max(ItemTombstone.change_xid))
+            .where(ItemTombstone.change_xid < SETTLED_XID).scalar_subquery(),
+        )
+        last_modified = func.greatest(
+            select(func.max(cls.updated_at)).scalar_subquery(),
+            select(func.max(ItemTombstone.deleted_at)).scalar_subquery(),
+        )
+        result = await db.execute(select(latest_xid, last_modified))
+        return result.one()
 
     @classmethod
-    def get_low_stock(cls, db) -> list["Item"]:
+    async def get_low_stock(cls, db: AsyncSession) -> list["Item"]:
         """Get all items that are below their par level."""
         stmt = select(cls).where(cls.current_quantity < cls.par_level)
-        result = db.execute(stmt)
-        return result.scalars().all()
\ No newline at end of file
+        result = await db.execute(stmt)
+        return result.scalars().all()
+
+class ItemCode(Base):
+    """A barcode or SKU identifying an item; an item may have several."""
+    __tablename__ = "item_codes"
+    __table_args__ = (
+        # Scan lookups resolve a code through this index
+        UniqueConstraint("code", name="uq_item_codes_code"),
+    )
+
+    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
+    item_id: Mapped[UUID] = mapped_column(ForeignKey("items.id", ondelete="CASCADE"), index=True)
+    code: Mapped[str] = mapped_column(String(64))
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+    # Relationships
+    item = relationship("Item", back_populates="codes")
+
+    @staticmethod
+    def normalize(code: str) -> str:
+        """Canonical form codes are stored and looked up in (trimmed, upper case)."""
+        return code.strip().upper()
+
+class ItemTombstone(Base):
+    """Marks a deleted item so delta sync clients learn to drop it."""
+    __tablename__ = "item_tombstones"
+    __table_args__ = (
+        Index("ix_item_tombstones_deleted_at_item_id", "deleted_at", "item_id"),
+        Index("ix_item_tombstones_change_xid_item_id", "change_xid", "item_id"),
+    )
+
+    # No foreign key: the item row is gone
+    item_id: Mapped[UUID] = mapped_column(primary_key=True)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    change_xid: Mapped[int] = mapped_column(BigInteger, server_default=CHANGE_XID)
@@ -1,8 +1,8 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, Boolean, DateTime, Enum as SQLAEnum, select, func
+from sqlalchemy import String, Boolean, DateTime, Integer, Enum as SQLAEnum, select, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID, uuid4
 from enum import Enum
 from app.database import Base
@@ -22,9 +22,11 @@ class User(Base):
     full_name: Mapped[str] = mapped_column(String(255))
     # Use enum values (e.g. 'admin') rather than enum names (e.g. 'ADMIN') so DB rows match
     role: Mapped[UserRole] = mapped_column(
-        SQLAEnum(UserRole, values_callable=lambda enum: [e.value for e in enum])
+        SQLAEnum(UserRole, name="user_role", values_callable=lambda enum: [e.value for e in enum])
     )
     is_active: Mapped[bool] = mapped_column(Boolean, server_default='true')
+    # Embedded in tokens; bumping it revokes every token issued before
+    token_version: Mapped[int] = mapped_column(Integer, server_default='0')
     created_at: Mapped[datetime] = mapped_column(
         DateTime, server_default=func.now()
     )
@@ -36,14 +38,18 @@ class User(Base):
     items = relationship("Item", back_populates="creator")
     created_counts = relationship("Count", back_populates="creator", foreign_keys="[Count.created_by]")
     reviewed_counts = relationship("Count", back_populates="reviewer", foreign_keys="[Count.reviewed_by]")
+    def revoke_tokens(self) -> None:
+        """Invalidate all tokens issued so far (incremented in SQL on flush)."""
+        self.token_version = User.token_version + 1
+
     @classmethod
-    def get_by_id(cls, db: Session, user_id: UUID) -> Optional["User"]:
+    async def get_by_id(cls, db: AsyncSession, user_id: UUID) -> Optional["User"]:
         """Get a user by ID."""
-        return db.get(cls, user_id)
+        return await db.get(cls, user_id)
 
     @classmethod
-    def get_by_email(cls, db: Session, email: str) -> Optional["User"]:
+    async def get_by_email(cls, db: AsyncSession, email: str) -> Optional["User"]:
         """Get a user by email."""
         stmt = select(cls).where(cls.email == email)
-        result = db.execute(stmt)
+        result = await db.execute(stmt)
         return result.scalar_one_or_none()
\ No newline at end of file
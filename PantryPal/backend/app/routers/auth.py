@@ -2,31 +2,33 @@ from datetime import timedelta
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.database import get_db
 from app.models.user import User
 from app.schemas.auth import Token, UserCreate, UserRead
 from app.utils.security import (
-    verify_password,
-    get_password_hash,
+    hash_password_async,
+    verify_and_update_password,
     create_access_token,
-    create_refresh_token
+    create_refresh_token,
+    token_claims
 )
 from app.config import settings
 from app.dependencies import get_current_active_user
+from app.utils.principals import Principal
 
 router = APIRouter()
 
 @router.post("/register", response_model=UserRead)
 async def register(
     user_in: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Register a new user."""
     # Check if email already exists
-    result = db.execute(select(User).where(User.email == user_in.email))
+    result = await db.execute(select(User).where(User.email == user_in.email))
     if result.scalar_one_or_none():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -35,27 +37,32 @@ async def register(
     
     user = User(
         email=user_in.email,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=await hash_password_async(user_in.password),
         full_name=user_in.full_name,
         role=user_in.role
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     return user
 
 @router.post("/login", response_model=Token)
 async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Login user and return tokens."""
     # Find user by email
-    result = db.execute(select(User).where(User.email == form_data.username))
+    result = await db.execute(select(User).where(User.email == form_data.username))
     user = result.scalar_one_or_none()
+    # End the read transaction so the pooled connection is not held while hashing
+    await db.commit()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    verified, new_hash = (False, None)
+    if user:
+        verified, new_hash = await verify_and_update_password(form_data.password, user.hashed_password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -68,13 +75,18 @@ async def login(
             detail="Inactive user"
         )
     
+    # Upgrade hashes made with an outdated scheme or round count
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+    
     # Create tokens
     access_token = create_access_token(
-        data={"sub": str(user.id)},
+        data=token_claims(user),
         expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     refresh_token = create_refresh_token(
-        data={"sub": str(user.id)}
+        data=token_claims(user, include_profile=False)
     )
     
     return {
@@ -85,15 +97,15 @@ async def login(
 
 @router.post("/refresh", response_model=Token)
 async def refresh_token(
-    current_user: Annotated[User, Depends(get_current_active_user)]
+    current_user: Annotated[Principal, Depends(get_current_active_user)]
 ):
     """Create new access token using refresh token."""
     access_token = create_access_token(
-        data={"sub": str(current_user.id)},
+        data=token_claims(current_user),
         expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     refresh_token = create_refresh_token(
-        data={"sub": str(current_user.id)}
+        data=token_claims(current_user, include_profile=False)
     )
     
     return {
@@ -104,7 +116,7 @@ async def refresh_token(
 
 @router.get("/me", response_model=UserRead)
 async def read_users_me(
-    current_user: Annotated[User, Depends(get_current_active_user)]
+    current_user: Annotated[Principal, Depends(get_current_active_user)]
 ):
     """Get current user information."""
     return current_user
\ No newline at end of file
@@ -1,8 +1,8 @@
-from typing import List
-from fastapi.encoders import jsonable_encoder
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import TypeAdapter
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from datetime import date, datetime, timedelta
 
@@ -12,75 +12,197 @@ from app.dependencies import (
     get_current_counter_or_above_user
 )
 from app.database import get_db
-from app.models.count import Count, CountItem, CountStatus
-from app.models.item import Item
-from app.models.user import User
+from app.models.count import Count, CountStatus
 from app.schemas.count import (
     CountCreate,
     CountRead,
+    CountSummary,
     CountUpdate,
     CountItemCreate,
     CountItemUpdate,
+    CountLineEditBatch,
     CountSubmit,
     CountReview
 )
 from app.services import CountService
+from app.utils.cache import invalidate_dashboard_cache
+from app.utils.http_cache import conditional_get
+from app.utils.pagination import apply_keyset, set_next_cursor, split_page
+from app.utils.principals import Principal
+from app.utils.wire import WireFormatRoute, wire_response
 
-router = APIRouter()
+router = APIRouter(route_class=WireFormatRoute)
 
-@router.get("/", response_model=List[CountRead])
+# List endpoints return CountSummary rows unless ?include=items asks for the lines
+CountListRead = List[Union[CountSummary, CountRead]]
+INCLUDE_PATTERN = "^items$"
+
+COUNT_LIST_ADAPTERS = {
+    None: TypeAdapter(List[CountSummary]),
+    "items": TypeAdapter(List[CountRead]),
+}
+
+def count_list(
+    request: Request, counts: List[Count], include: Optional[str], next_cursor: Optional[str]
+) -> Response:
+    """Serialize a page of counts in one validate-and-dump pass.
+
+    The union response model is only documentation: validating against it
+    would convert the page a second time, and could lazy-load the lines of a
+    summary page.
+    """
+    adapter = COUNT_LIST_ADAPTERS[include]
+    response = wire_response(request, adapter, adapter.validate_python(counts))
+    set_next_cursor(response, next_cursor)
+    return response
+
+@router.get("/", response_model=CountListRead)
 async def list_counts(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    include: Optional[str] = Query(None, pattern=INCLUDE_PATTERN),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    """List all counts based on user's role, including creator's name."""
-    counts = CountService.get_counts(db, current_user.id, current_user.role, skip, limit)
-    # Convert dicts to CountRead models
-    return [CountRead(**jsonable_encoder(c)) for c in counts]
+    """List counts based on user's role, including creator's name, newest count date first.
+
+    Counts come with line totals only; pass ``include=items`` for the lines
+    themselves. Pass the X-Next-Cursor response header back as ``cursor`` for
+    the next page.
+    """
+    counts, next_cursor = await CountService.get_counts(
+        db, current_user.id, current_user.role, skip, limit, cursor,
+        include_items=include == "items"
+    )
+    return count_list(request, counts, include, next_cursor)
 
 @router.post("/", response_model=CountRead)
 async def create_count(
     count: CountCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new count."""
     # Check if user already has an active count for this date
-    if CountService.check_active_count_exists(db, current_user.id, count.count_date):
+    if await CountService.check_active_count_exists(db, current_user.id, count.count_date):
         raise HTTPException(
             status_code=400,
             detail="You already have an active count for this date"
         )
 
-    return CountService.create_count(db, count, current_user.id)
+    return await CountService.create_count(db, count, current_user.id)
+
+# Static list routes are declared before /{count_id} so they are not captured by it
+@router.get("/pending", response_model=CountListRead)
+async def list_pending_counts(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include: Optional[str] = Query(None, pattern=INCLUDE_PATTERN),
+    current_user: Principal = Depends(get_current_counter_or_above_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List counts pending review (for counters and managers), most recently submitted first."""
+    counts, next_cursor = await CountService.get_pending_counts(
+        db, skip, limit, cursor, include_items=include == "items"
+    )
+    return count_list(request, counts, include, next_cursor)
+
+@router.get("/drafts", response_model=CountListRead)
+async def list_draft_counts(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include: Optional[str] = Query(None, pattern=INCLUDE_PATTERN),
+    current_user: Principal = Depends(get_current_counter_or_above_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List all draft counts (for counters to view and edit)."""
+    query = CountService.project_counts(
+        select(Count).where(Count.status == CountStatus.DRAFT), include == "items"
+    )
+    
+    # Counters can see all drafts, staff can only see their own
+    if current_user.role == "staff":
+        query = query.where(Count.created_by == current_user.id)
+    
+    query = apply_keyset(query, [Count.created_at, Count.id], limit, cursor, skip, descending=True)
+    result = await db.execute(query)
+    counts, next_cursor = split_page(result.scalars().all(), limit, lambda c: (c.created_at, c.id))
+    return count_list(request, counts, include, next_cursor)
+
+@router.get("/today", response_model=CountListRead)
+async def get_today_counts(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include: Optional[str] = Query(None, pattern=INCLUDE_PATTERN),
+    current_user: Principal = Depends(get_current_counter_or_above_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get counts for today's date."""
+    today = date.today()
+    query = CountService.project_counts(
+        select(Count).where(Count.count_date == today), include == "items"
+    )
+    
+    # Apply role-based filtering
+    if current_user.role == "staff":
+        query = query.where(Count.created_by == current_user.id)
+    
+    query = apply_keyset(query, [Count.created_at, Count.id], limit, cursor, skip, descending=True)
+    result = await db.execute(query)
+    counts, next_cursor = split_page(result.scalars().all(), limit, lambda c: (c.created_at, c.id))
+    return count_list(request, counts, include, next_cursor)
 
 @router.get("/{count_id}", response_model=CountRead)
 async def get_count(
     count_id: UUID,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get a specific count by ID."""
-    count = Count.get_by_id_sync(db, count_id)
-    if not count:
+    """Get a specific count by ID.
+
+    Answers If-None-Match / If-Modified-Since with a 304 from a version
+    check, before the count and its lines are loaded.
+    """
+    version = await Count.get_version(db, count_id)
+    if not version:
         raise HTTPException(status_code=404, detail="Count not found")
     
-    if current_user.role == "staff" and count.created_by != current_user.id:
+    if current_user.role == "staff" and version.created_by != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to view this count")
     
+    last_modified = max(filter(None, (version.updated_at, version.items_updated_at)))
+    not_modified = conditional_get(
+        request, response,
+        ("count", count_id, version.updated_at, version.items_count, version.items_updated_at),
+        last_modified
+    )
+    if not_modified is not None:
+        return not_modified
+    
+    count = await Count.get_with_items(db, count_id)
+    if not count:
+        raise HTTPException(status_code=404, detail="Count not found")
     return count
 
 @router.post("/{count_id}/submit", response_model=CountRead)
 async def submit_count(
     count_id: UUID,
     submission: CountSubmit,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Submit a count for review."""
-    count = Count.get_by_id_sync(db, count_id)
+    count = await Count.get_with_items(db, count_id)
     if not count:
         raise HTTPException(status_code=404, detail="Count not found")
     
@@ -94,60 +216,45 @@ async def submit_count(
     if not count.count_items:
         raise HTTPException(status_code=400, detail="Cannot submit empty count")
     
-    count.status = CountStatus.SUBMITTED
-    count.submitted_at = datetime.utcnow()
-    if submission.notes:
-        count.notes = submission.notes
-    
-    db.commit()
-    db.refresh(count)
-    return count
+    return await CountService.submit_count(db, count.id, submission.notes)
 
 @router.post("/{count_id}/review", response_model=CountRead)
 async def review_count(
     count_id: UUID,
     review: CountReview,
-    current_user: User = Depends(get_current_manager_or_admin_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_manager_or_admin_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Approve or reject a count."""
-    count = Count.get_by_id_sync(db, count_id)
+    # Locked so two reviewers cannot both pass the status check
+    count = await Count.get_for_update(db, count_id)
     if not count:
         raise HTTPException(status_code=404, detail="Count not found")
     
     if count.status != CountStatus.SUBMITTED:
         raise HTTPException(status_code=400, detail="Count is not submitted")
     
-    count.reviewed_by = current_user.id
-    count.reviewed_at = datetime.utcnow()
-    
     if review.approved:
-        count.status = CountStatus.APPROVED
-        # Update inventory quantities
-        for count_item in count.count_items:
-            count_item.item.current_quantity = count_item.actual_quantity
-    else:
-        if not review.rejection_reason:
-            raise HTTPException(status_code=400, detail="Rejection reason is required")
-        count.status = CountStatus.REJECTED
-        count.rejection_reason = review.rejection_reason
-    
-    if review.notes:
-        count.notes = review.notes
-    
-    db.commit()
-    db.refresh(count)
-    return count
+        # Applies inventory quantities and updates the discrepancy rollup
+        return await CountService.approve_count(
+            db, count_id, current_user.id, notes=review.notes
+        )
+    
+    if not review.rejection_reason:
+        raise HTTPException(status_code=400, detail="Rejection reason is required")
+    return await CountService.reject_count(
+        db, count_id, current_user.id, review.rejection_reason, notes=review.notes
+    )
 
 @router.post("/{count_id}/items", response_model=CountRead)
 async def add_count_item(
     count_id: UUID,
     item: CountItemCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Add an item to a count."""
-    count = Count.get_by_id_sync(db, count_id)
+    count = await Count.get_by_id(db, count_id)
     if not count:
         raise HTTPException(status_code=404, detail="Count not found")
     
@@ -157,36 +264,22 @@ async def add_count_item(
     if count.status != CountStatus.DRAFT:
         raise HTTPException(status_code=400, detail="Can only modify draft counts")
     
-    # Get the item and its current quantity
-    db_item = Item.get_by_id_sync(db, item.item_id)
-    if not db_item:
+    # Adding an item that is already on the count updates its line
+    missing = await CountService.upsert_count_items(db, count.id, [item])
+    if missing:
         raise HTTPException(status_code=404, detail="Item not found")
-    
-    # Create count item
-    count_item = CountItem(
-        count_id=count.id,
-        item_id=db_item.id,
-        expected_quantity=db_item.current_quantity,
-        actual_quantity=item.actual_quantity,
-        discrepancy=item.actual_quantity - db_item.current_quantity,
-        notes=item.notes
-    )
-    
-    db.add(count_item)
-    db.commit()
-    db.refresh(count)
-    return count
+    return await Count.get_with_items(db, count.id)
 
 @router.put("/{count_id}/items/{item_id}", response_model=CountRead)
 async def update_count_item(
     count_id: UUID,
     item_id: UUID,
     item_update: CountItemUpdate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a count item."""
-    count = Count.get_by_id_sync(db, count_id)
+    count = await Count.get_with_items(db, count_id)
     if not count:
         raise HTTPException(status_code=404, detail="Count not found")
     
@@ -209,19 +302,19 @@ async def update_count_item(
     if item_update.notes is not None:
         count_item.notes = item_update.notes
     
-    db.commit()
-    db.refresh(count)
-    return count
+    await db.commit()
+    invalidate_dashboard_cache()
+    return await Count.get_with_items(db, count.id)
 
 @router.delete("/{count_id}/items/{item_id}", response_model=CountRead)
 async def delete_count_item(
     count_id: UUID,
     item_id: UUID,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Remove an item from a count."""
-    count = Count.get_by_id_sync(db, count_id)
+    count = await Count.get_with_items(db, count_id)
     if not count:
         raise HTTPException(status_code=404, detail="Count not found")
     
@@ -236,65 +329,20 @@ async def delete_count_item(
     if not count_item:
         raise HTTPException(status_code=404, detail="Item not found in count")
     
-    db.delete(count_item)
-    db.commit()
-    db.refresh(count)
-    return count
-
-@router.get("/pending", response_model=List[CountRead])
-async def list_pending_counts(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(10, ge=1, le=100),
-    current_user: User = Depends(get_current_counter_or_above_user),
-    db: Session = Depends(get_db)
-):
-    """List all counts pending review (for counters and managers)."""
-    return CountService.get_pending_counts(db)
-
-@router.get("/drafts", response_model=List[CountRead])
-async def list_draft_counts(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(10, ge=1, le=100),
-    current_user: User = Depends(get_current_counter_or_above_user),
-    db: Session = Depends(get_db)
-):
-    """List all draft counts (for counters to view and edit)."""
-    query = select(Count).where(Count.status == CountStatus.DRAFT)
-    
-    # Counters can see all drafts, staff can only see their own
-    if current_user.role == "staff":
-        query = query.where(Count.created_by == current_user.id)
-    
-    query = query.order_by(Count.created_at.desc()).offset(skip).limit(limit)
-    result = db.execute(query)
-    return result.scalars().all()
-
-@router.get("/today", response_model=List[CountRead])
-async def get_today_counts(
-    current_user: User = Depends(get_current_counter_or_above_user),
-    db: Session = Depends(get_db)
-):
-    """Get all counts for today's date."""
-    today = date.today()
-    query = select(Count).where(Count.count_date == today)
-    
-    # Apply role-based filtering
-    if current_user.role == "staff":
-        query = query.where(Count.created_by == current_user.id)
-    
-    query = query.order_by(Count.created_at.desc())
-    result = db.execute(query)
-    return result.scalars().all()
+    await db.delete(count_item)
+    await db.commit()
+    invalidate_dashboard_cache()
+    return await Count.get_with_items(db, count.id)
 
 @router.put("/{count_id}", response_model=CountRead)
 async def update_count(
     count_id: UUID,
     count_update: CountUpdate,
-    current_user: User = Depends(get_current_counter_or_above_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_counter_or_above_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a count (counters can update any draft count)."""
-    count = Count.get_by_id_sync(db, count_id)
+    count = await Count.get_with_items(db, count_id)
     if not count:
         raise HTTPException(status_code=404, detail="Count not found")
     
@@ -311,19 +359,19 @@ async def update_count(
     if count_update.notes is not None:
         count.notes = count_update.notes
     
-    db.commit()
-    db.refresh(count)
-    return count
+    await db.commit()
+    invalidate_dashboard_cache()
+    return await Count.get_with_items(db, count.id)
 
 @router.post("/{count_id}/bulk-items", response_model=CountRead)
 async def bulk_add_count_items(
     count_id: UUID,
     items: List[CountItemCreate],
-    current_user: User = Depends(get_current_counter_or_above_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_counter_or_above_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Bulk add multiple items to a count."""
-    count = Count.get_by_id_sync(db, count_id)
+    """Bulk add or update multiple items on a count in one statement."""
+    count = await Count.get_by_id(db, count_id)
     if not count:
         raise HTTPException(status_code=404, detail="Count not found")
     
@@ -334,37 +382,34 @@ async def bulk_add_count_items(
     if count.status != CountStatus.DRAFT:
         raise HTTPException(status_code=400, detail="Can only modify draft counts")
     
-    # Process each item
-    for item_data in items:
-        # Get the item and its current quantity
-        db_item = Item.get_by_id_sync(db, item_data.item_id)
-        if not db_item:
-            raise HTTPException(status_code=404, detail=f"Item {item_data.item_id} not found")
-        
-        # Check if item already exists in count
-        existing_count_item = next(
-            (ci for ci in count.count_items if ci.item_id == item_data.item_id), 
-            None
-        )
-        
-        if existing_count_item:
-            # Update existing item
-            existing_count_item.actual_quantity = item_data.actual_quantity
-            existing_count_item.discrepancy = item_data.actual_quantity - existing_count_item.expected_quantity
-            if item_data.notes:
-                existing_count_item.notes = item_data.notes
-        else:
-            # Create new count item
-            count_item = CountItem(
-                count_id=count.id,
-                item_id=db_item.id,
-                expected_quantity=db_item.current_quantity,
-                actual_quantity=item_data.actual_quantity,
-                discrepancy=item_data.actual_quantity - db_item.current_quantity,
-                notes=item_data.notes
-            )
-            db.add(count_item)
-    
-    db.commit()
-    db.refresh(count)
-    return count
\ No newline at end of file
+    missing = await CountService.upsert_count_items(db, count.id, items)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Item {missing[0]} not found")
+    return await Count.get_with_items(db, count.id)
+
+@router.post("/{count_id}/line-edits", response_model=CountRead)
+async def apply_count_line_edits(
+    count_id: UUID,
+    batch: CountLineEditBatch,
+    current_user: Principal = Depends(get_current_counter_or_above_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Apply a queued batch of line edits (set or remove) to a draft count.
+
+    Meant for clients that counted offline: edits are sent in the order they
+    were made and applied atomically, the last edit to an item winning.
+    """
+    count = await Count.get_by_id(db, count_id)
+    if not count:
+        raise HTTPException(status_code=404, detail="Count not found")
+    
+    if current_user.role == "staff" and count.created_by != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to modify this count")
+    
+    if count.status != CountStatus.DRAFT:
+        raise HTTPException(status_code=400, detail="Can only modify draft counts")
+    
+    missing = await CountService.apply_line_edits(db, count.id, batch.edits)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Item {missing[0]} not found")
+    return await Count.get_with_items(db, count.id)
@@ -5,20 +5,44 @@ from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.dependencies import get_current_active_user
-from app.database import get_db
-from app.models.user import User
+from app.database import get_read_db
 from app.models.item import Item
 from app.models.count import Count, CountItem, CountStatus
+from app.models.discrepancy import DailyDiscrepancy
+from app.utils.cache import dashboard_cache
+from app.utils.principals import Principal
 
 router = APIRouter()
 
+def counts_with_items_count_query(count_filter):
+    """Select matching counts plus their item count in a single query."""
+    summary = CountItem.summary_subquery(count_filter)
+    return select(
+        Count.id,
+        Count.count_date,
+        Count.status,
+        func.coalesce(summary.c.items_count, 0).label("items_count")
+    ).outerjoin(summary, summary.c.count_id == Count.id).where(count_filter)
+
 @router.get("/stats")
 async def get_dashboard_stats(
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
 ) -> Dict[str, Any]:
-    """Get role-based dashboard statistics."""
+    """Get role-based dashboard statistics (cached per role, per user for staff)."""
+    if current_user.role in ["admin", "manager"]:
+        cache_key = ("role", current_user.role)
+    else:
+        cache_key = ("user", current_user.id)
     
+    stats = dashboard_cache.get(cache_key)
+    if stats is None:
+        stats = await compute_dashboard_stats(db, current_user)
+        dashboard_cache.set(cache_key, stats)
+    return stats
+
+async def compute_dashboard_stats(db: AsyncSession, current_user: Principal) -> Dict[str, Any]:
+    """Run the dashboard queries for the given user's role."""
     if current_user.role in ["admin", "manager"]:
         # Admin/Manager stats
         one_week_ago = datetime.utcnow() - timedelta(days=7)
@@ -36,20 +60,25 @@ async def get_dashboard_stats(
         pending_result = await db.execute(pending_query)
         pending_count = pending_result.scalar()
         
-        # Get recent counts
-        recent_counts_query = select(Count).where(
+        # Get recent counts with their item counts
+        recent_counts_query = counts_with_items_count_query(
             Count.created_at >= one_week_ago
         ).order_by(Count.created_at.desc())
         recent_counts_result = await db.execute(recent_counts_query)
-        recent_counts = recent_counts_result.scalars().all()
+        recent_counts = recent_counts_result.all()
         
-        # Get top discrepancies
-        discrepancy_query = select(CountItem).join(Count).where(
-            (Count.status == CountStatus.APPROVED) &
-            (Count.created_at >= one_week_ago)
-        ).order_by(func.abs(CountItem.discrepancy).desc()).limit(5)
+        # Get top discrepancies from the daily rollup, with item name joined in
+        discrepancy_query = select(
+            Item.name.label("item_name"),
+            DailyDiscrepancy.expected_quantity,
+            DailyDiscrepancy.actual_quantity,
+            DailyDiscrepancy.discrepancy,
+            DailyDiscrepancy.count_date
+        ).join(Item, Item.id == DailyDiscrepancy.item_id).where(
+            DailyDiscrepancy.count_created_at >= one_week_ago
+        ).order_by(func.abs(DailyDiscrepancy.discrepancy).desc()).limit(5)
         discrepancy_result = await db.execute(discrepancy_query)
-        top_discrepancies = discrepancy_result.scalars().all()
+        top_discrepancies = discrepancy_result.all()
         
         return {
             "total_items": items_stats["total_items"],
@@ -60,17 +89,17 @@ async def get_dashboard_stats(
                     "id": str(count.id),
                     "date": count.count_date,
                     "status": count.status,
-                    "items_count": len(count.count_items)
+                    "items_count": count.items_count
                 }
                 for count in recent_counts
             ],
             "top_discrepancies": [
                 {
-                    "item_name": item.item.name,
+                    "item_name": item.item_name,
                     "expected": item.expected_quantity,
                     "actual": item.actual_quantity,
                     "discrepancy": item.discrepancy,
-                    "date": item.count.count_date
+                    "date": item.count_date
                 }
                 for item in top_discrepancies
             ]
@@ -80,27 +109,27 @@ async def get_dashboard_stats(
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
         
         # Get active counts
-        active_counts_query = select(Count).where(
+        active_counts_query = counts_with_items_count_query(
             (Count.created_by == current_user.id) &
             (Count.status == CountStatus.DRAFT)
         )
         active_counts_result = await db.execute(active_counts_query)
-        active_counts = active_counts_result.scalars().all()
+        active_counts = active_counts_result.all()
         
         # Get recent counts
-        recent_counts_query = select(Count).where(
+        recent_counts_query = counts_with_items_count_query(
             (Count.created_by == current_user.id) &
             (Count.created_at >= thirty_days_ago)
         ).order_by(Count.created_at.desc())
         recent_counts_result = await db.execute(recent_counts_query)
-        recent_counts = recent_counts_result.scalars().all()
+        recent_counts = recent_counts_result.all()
         
         return {
             "active_counts": [
                 {
                     "id": str(count.id),
                     "date": count.count_date,
-                    "items_count": len(count.count_items)
+                    "items_count": count.items_count
                 }
                 for count in active_counts
             ],
@@ -109,8 +138,8 @@ async def get_dashboard_stats(
                     "id": str(count.id),
                     "date": count.count_date,
                     "status": count.status,
-                    "items_count": len(count.count_items)
+                    "items_count": count.items_count
                 }
                 for count in recent_counts
             ]
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,79 @@
+import time
+from typing import AsyncIterator, Callable, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from jose import jwt
+
+from app.config import settings
+from app.dependencies import authenticate_token, optional_oauth2_scheme
+from app.utils.events import Subscription, event_broker
+from app.utils.principals import Principal
+
+router = APIRouter()
+
+# Milliseconds an EventSource waits before reconnecting after the stream ends
+RECONNECT_MS = 5000
+
+def event_filter(principal: Principal) -> Callable[[dict], bool]:
+    """Match the counts endpoints: staff only see events on their own counts, everyone else sees all."""
+    if principal.role != "staff":
+        return lambda event: True
+    user_id = str(principal.id)
+    return lambda event: event["data"].get("created_by", user_id) == user_id
+
+async def event_stream(subscription: Subscription, expires_at: float) -> AsyncIterator[str]:
+    yield f"retry: {RECONNECT_MS}\n\n"
+    while True:
+        remaining = expires_at - time.time()
+        if remaining <= 0:
+            # The client reconnects with a fresh token
+            return
+        payload = await subscription.get(min(remaining, settings.EVENTS_HEARTBEAT_SECONDS))
+        if payload is None:
+            # Keeps proxies from closing an idle stream
+            yield ": keepalive\n\n"
+        else:
+            yield f"data: {payload}\n\n"
+
+@router.get("")
+async def stream_events(
+    token: Optional[str] = Query(
+        None, description="Access token, for clients such as EventSource that cannot set headers"
+    ),
+    bearer: Optional[str] = Depends(optional_oauth2_scheme)
+):
+    """Stream change events as Server-Sent Events, so clients can stop polling.
+
+    Each event's data is JSON ``{"type", "data"}``: ``count.submitted``,
+    ``count.reviewed`` and ``count.deleted`` with the count's id, status and
+    owner; ``item.changed``, ``item.deleted`` and ``items.imported`` for the
+    catalog; and ``resync`` when the client may have missed events and should
+    refetch what it shows. The stream ends when the access token expires.
+    """
+    access_token = bearer or token
+    if access_token is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    principal = await authenticate_token(access_token)
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    expires_at = jwt.get_unverified_claims(access_token).get("exp", float("inf"))
+
+    async def stream() -> AsyncIterator[str]:
+        with event_broker.subscribe(event_filter(principal)) as subscription:
+            async for chunk in event_stream(subscription, expires_at):
+                yield chunk
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        # Proxies such as nginx would otherwise buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,6 +1,6 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 from app.dependencies import (
@@ -8,74 +8,251 @@ from app.dependencies import (
     get_current_manager_or_admin_user
 )
 from app.database import get_db
-from app.models.item import ItemCategory
-from app.models.user import User
-from app.schemas.item import ItemCreate, ItemRead, ItemUpdate
-from app.services import ItemService
+from app.models.item import Item, ItemCategory, ItemCode
+from app.schemas.item import (
+    InventoryMovementRead,
+    ItemAdjust,
+    ItemChanges,
+    ItemCodeCreate,
+    ItemCodeLookup,
+    ItemCodeLookupResult,
+    ItemCodeRead,
+    ItemCreate,
+    ItemImportResult,
+    ItemRead,
+    ItemUpdate
+)
+from app.services import InventoryService, ItemService
+from app.utils.http_cache import conditional_get
+from app.utils.imports import detect_format, iter_import_records
+from app.utils.pagination import set_next_cursor
+from app.utils.principals import Principal
+from app.utils.wire import WireFormatRoute
 
-router = APIRouter()
+router = APIRouter(route_class=WireFormatRoute)
 
 @router.get("/", response_model=List[ItemRead])
-def list_items(
+async def list_items(
+    request: Request,
+    response: Response,
     category: Optional[ItemCategory] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List items ordered by name, optionally filtered by category.
+
+    Pass the X-Next-Cursor response header back as ``cursor`` for the next page.
+    Responses carry an ETag for the whole catalog's version; polling with
+    If-None-Match gets a 304 until any item changes. As with ``/changes``, a
+    change shows up once every older transaction has finished.
+    """
+    version, last_modified = await Item.catalog_version(db)
+    not_modified = conditional_get(request, response, ("items", version), last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    items, next_cursor = await ItemService.get_items(db, category, skip, limit, cursor)
+    set_next_cursor(response, next_cursor)
+    return items
+
+@router.get("/changes", response_model=ItemChanges)
+async def list_item_changes(
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=1000),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Items created, updated or deleted since a sync token, for offline clients.
+
+    Call without ``since`` for a full initial sync, then keep passing back
+    ``next_token``; repeat immediately while ``has_more`` is true. Changes
+    show up once every older transaction has finished.
+    """
+    items, deleted, next_token, has_more = await ItemService.get_item_changes(db, since, limit)
+    return {"items": items, "deleted": deleted, "next_token": next_token, "has_more": has_more}
+
+@router.get("/search", response_model=List[ItemRead])
+async def search_items(
+    q: str = Query(..., min_length=1, max_length=100),
+    category: Optional[ItemCategory] = None,
+    limit: int = Query(20, ge=1, le=50),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Search items by partial or approximate name (or description), best matches first."""
+    return await ItemService.search_items(db, q, category, limit)
+
+@router.get("/by-code/{code:path}", response_model=ItemRead)
+async def get_item_by_code(
+    code: str,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Resolve a scanned barcode or SKU to its item."""
+    item = await ItemService.get_item_by_code(db, code)
+    if not item:
+        raise HTTPException(status_code=404, detail="No item has this code")
+    return item
+
+@router.post("/by-code", response_model=ItemCodeLookupResult)
+async def lookup_items_by_code(
+    lookup: ItemCodeLookup,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    """List all items, optionally filtered by category."""
-    return ItemService.get_items(db, category, skip, limit)
+    """Resolve up to 500 codes in one query.
+
+    ``items`` is keyed by the codes as sent; unknown codes are listed in ``missing``.
+    """
+    found = await ItemService.get_items_by_codes(db, lookup.codes)
+    items = {}
+    missing = []
+    for code in lookup.codes:
+        item = found.get(ItemCode.normalize(code))
+        if item is None:
+            missing.append(code)
+        else:
+            items[code] = item
+    return {"items": items, "missing": missing}
 
 @router.get("/low-stock", response_model=List[ItemRead])
-def list_low_stock_items(
-    current_user: User = Depends(get_current_manager_or_admin_user),
-    db: Session = Depends(get_db)
+async def list_low_stock_items(
+    current_user: Principal = Depends(get_current_manager_or_admin_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """List all items that are below their par level."""
-    return ItemService.get_low_stock_items(db)
+    return await ItemService.get_low_stock_items(db)
 
 @router.get("/{item_id}", response_model=ItemRead)
-def get_item(
+async def get_item(
     item_id: UUID,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific item by ID."""
-    item = ItemService.get_item_by_id(db, item_id)
+    item = await ItemService.get_item_by_id(db, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     return item
 
 @router.post("/", response_model=ItemRead)
-def create_item(
+async def create_item(
     item: ItemCreate,
-    current_user: User = Depends(get_current_manager_or_admin_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_manager_or_admin_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new item."""
-    return ItemService.create_item(db, item, current_user.id)
+    return await ItemService.create_item(db, item, current_user.id)
+
+@router.post("/import", response_model=ItemImportResult)
+async def import_items(
+    file: UploadFile = File(...),
+    upload_format: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$"),
+    current_user: Principal = Depends(get_current_manager_or_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Bulk create or update items from a CSV or NDJSON upload.
+
+    Rows are matched on item name. The format is taken from ``format`` or
+    else the file extension/content type. Invalid rows are skipped and
+    reported by row number; the rest are applied in one transaction.
+    """
+    fmt = upload_format or detect_format(file.filename, file.content_type)
+    records = iter_import_records(file.file, fmt)
+    return await ItemService.import_items(db, records, current_user.id)
 
 @router.put("/{item_id}", response_model=ItemRead)
-def update_item(
+async def update_item(
     item_id: UUID,
     item_update: ItemUpdate,
-    current_user: User = Depends(get_current_manager_or_admin_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_manager_or_admin_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update an existing item."""
-    db_item = ItemService.update_item(db, item_id, item_update)
+    db_item = await ItemService.update_item(db, item_id, item_update, current_user.id)
+    if not db_item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return db_item
+
+@router.post("/{item_id}/adjust", response_model=ItemRead)
+async def adjust_item(
+    item_id: UUID,
+    adjustment: ItemAdjust,
+    current_user: Principal = Depends(get_current_manager_or_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Add a signed delta to an item's quantity (e.g. waste or a delivery)."""
+    db_item = await ItemService.adjust_item_quantity(
+        db, item_id, adjustment.delta, current_user.id, adjustment.notes
+    )
     if not db_item:
         raise HTTPException(status_code=404, detail="Item not found")
     return db_item
 
+@router.get("/{item_id}/movements", response_model=List[InventoryMovementRead])
+async def list_item_movements(
+    item_id: UUID,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_manager_or_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List an item's quantity movements, newest first."""
+    movements, next_cursor = await InventoryService.get_movements(db, item_id, skip, limit, cursor)
+    set_next_cursor(response, next_cursor)
+    return movements
+
+@router.get("/{item_id}/codes", response_model=List[ItemCodeRead])
+async def list_item_codes(
+    item_id: UUID,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List the barcodes and SKUs assigned to an item."""
+    if not await ItemService.get_item_by_id(db, item_id):
+        raise HTTPException(status_code=404, detail="Item not found")
+    return await ItemService.get_item_codes(db, item_id)
+
+@router.post("/{item_id}/codes", response_model=ItemCodeRead)
+async def add_item_code(
+    item_id: UUID,
+    item_code: ItemCodeCreate,
+    current_user: Principal = Depends(get_current_manager_or_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Assign a barcode or SKU to an item (codes are trimmed and upper-cased)."""
+    if not await ItemService.get_item_by_id(db, item_id):
+        raise HTTPException(status_code=404, detail="Item not found")
+    assigned = await ItemService.add_item_code(db, item_id, item_code.code)
+    if assigned.item_id != item_id:
+        raise HTTPException(status_code=409, detail="Code is already assigned to another item")
+    return assigned
+
+@router.delete("/{item_id}/codes/{code:path}")
+async def remove_item_code(
+    item_id: UUID,
+    code: str,
+    current_user: Principal = Depends(get_current_manager_or_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Remove a barcode or SKU from an item."""
+    if not await ItemService.remove_item_code(db, item_id, code):
+        raise HTTPException(status_code=404, detail="Code not found on this item")
+    return {"message": "Code removed successfully"}
+
 @router.delete("/{item_id}")
-def delete_item(
+async def delete_item(
     item_id: UUID,
-    current_user: User = Depends(get_current_manager_or_admin_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_manager_or_admin_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete an item."""
-    success = ItemService.delete_item(db, item_id)
+    success = await ItemService.delete_item(db, item_id)
     if not success:
         raise HTTPException(status_code=404, detail="Item not found")
     return {"message": "Item deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,56 @@
+from typing import Dict, Any
+from fastapi import APIRouter, Depends
+
+from app.database import replica_health
+from app.dependencies import get_current_admin_user
+from app.utils.cache import dashboard_cache
+from app.utils.events import event_broker
+from app.utils.loop_monitor import loop_monitor
+from app.utils.pool_metrics import get_pool_stats
+from app.utils.security import password_hash_pool
+from app.utils.principals import Principal, principal_cache
+from app.utils.token_versions import token_versions
+
+router = APIRouter()
+
+@router.get("/db-pool")
+async def get_db_pool_metrics(
+    current_user: Principal = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """Connection pool usage, checkout wait times and churn for this worker."""
+    return {**get_pool_stats(), "replica": replica_health.status()}
+
+@router.get("/cache")
+async def get_cache_metrics(
+    current_user: Principal = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """Hit/miss counters for the in-process caches of this worker."""
+    return {
+        "dashboard": dashboard_cache.stats(),
+        "principals": principal_cache.stats(),
+        "token_versions": token_versions.status(),
+    }
+
+@router.get("/password-hashing")
+async def get_password_hashing_metrics(
+    current_user: Principal = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """Queue depth, rejections and hash durations of this worker's hashing pool."""
+    return password_hash_pool.stats()
+
+@router.get("/event-loop")
+async def get_event_loop_metrics(
+    current_user: Principal = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """Event loop lag percentiles and recent stalls with their route and stack.
+
+    Only populated when LOOP_MONITOR_ENABLED is set.
+    """
+    return loop_monitor.stats()
+
+@router.get("/events")
+async def get_event_metrics(
+    current_user: Principal = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """Push subscribers, event counts and LISTEN/NOTIFY connection state of this worker."""
+    return event_broker.status()
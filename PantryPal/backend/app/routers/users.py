@@ -1,5 +1,5 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
@@ -7,32 +7,39 @@ from uuid import UUID
 from app.dependencies import get_current_admin_user
 from app.database import get_db
 from app.models.user import User, UserRole
-from app.schemas.auth import UserCreate, UserRead
-from app.utils.security import get_password_hash
+from app.schemas.auth import UserCreate, UserRead, UserUpdate
+from app.utils.security import hash_password_async
+from app.utils.pagination import apply_keyset, set_next_cursor, split_page
+from app.utils.principals import Principal, invalidate_principal
+from app.utils.token_versions import token_versions
 
 router = APIRouter()
 
 @router.get("/", response_model=List[UserRead])
 async def list_users(
+    response: Response,
     role: UserRole = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    current_user: User = Depends(get_current_admin_user),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """List all users, optionally filtered by role."""
+    """List users ordered by email, optionally filtered by role."""
     query = select(User)
     if role:
         query = query.where(User.role == role)
     
-    query = query.offset(skip).limit(limit)
+    query = apply_keyset(query, [User.email], limit, cursor, skip)
     result = await db.execute(query)
-    return result.scalars().all()
+    users, next_cursor = split_page(result.scalars().all(), limit, lambda u: (u.email,))
+    set_next_cursor(response, next_cursor)
+    return users
 
 @router.post("/", response_model=UserRead)
 async def create_user(
     user_in: UserCreate,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new user."""
@@ -46,7 +53,7 @@ async def create_user(
     
     user = User(
         email=user_in.email,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=await hash_password_async(user_in.password),
         full_name=user_in.full_name,
         role=user_in.role
     )
@@ -58,7 +65,7 @@ async def create_user(
 @router.get("/{user_id}", response_model=UserRead)
 async def get_user(
     user_id: UUID,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific user by ID."""
@@ -73,8 +80,8 @@ async def get_user(
 @router.put("/{user_id}", response_model=UserRead)
 async def update_user(
     user_id: UUID,
-    user_update: UserCreate,
-    current_user: User = Depends(get_current_admin_user),
+    user_update: UserUpdate,
+    current_user: Principal = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Update a user's information."""
@@ -94,20 +101,32 @@ async def update_user(
                 detail="Email already registered"
             )
     
+    # Role and activation changes, and any password sent, revoke the user's existing tokens
+    revoke = user_update.role != user.role or user_update.password is not None or (
+        user_update.is_active is not None and user_update.is_active != user.is_active
+    )
+    
     user.email = user_update.email
     user.full_name = user_update.full_name
     user.role = user_update.role
+    if user_update.is_active is not None:
+        user.is_active = user_update.is_active
     if user_update.password:
-        user.hashed_password = get_password_hash(user_update.password)
+        user.hashed_password = await hash_password_async(user_update.password)
+    if revoke:
+        user.revoke_tokens()
     
     await db.commit()
+    invalidate_principal(user.id)
     await db.refresh(user)
+    if revoke:
+        token_versions.bump(user.id, user.token_version)
     return user
 
 @router.delete("/{user_id}")
 async def delete_user(
     user_id: UUID,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Delete a user."""
@@ -126,4 +145,6 @@ async def delete_user(
     
     await db.delete(user)
     await db.commit()
+    invalidate_principal(user_id)
+    token_versions.forget(user_id)
     return {"message": "User deleted successfully"}
\ No newline at end of file
@@ -22,7 +22,9 @@ class UserCreate(BaseModel):
     role: str = "staff"  # Default role for new users
 
     @field_validator("password")
-    def password_strength(cls, v: str) -> str:
+    def password_strength(cls, v: Optional[str]) -> Optional[str]:
+        if v is None:
+            return v
         # enforce at least one lowercase, one uppercase and one digit
         if not re.search(r"[a-z]", v):
             raise ValueError("password must contain at least one lowercase letter")
@@ -32,6 +34,11 @@ class UserCreate(BaseModel):
             raise ValueError("password must contain at least one digit")
         return v
 
+class UserUpdate(UserCreate):
+    # Omitted to keep the current password
+    password: Optional[str] = Field(None, min_length=8)
+    is_active: Optional[bool] = None
+
 class UserRead(BaseModel):
     id: UUID
     email: EmailStr
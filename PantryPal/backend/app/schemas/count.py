@@ -1,6 +1,6 @@
 from datetime import date, datetime
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from uuid import UUID
 from app.models.count import CountStatus
 
@@ -16,6 +16,23 @@ class CountItemUpdate(BaseModel):
     actual_quantity: Optional[int] = Field(None, ge=0)
     notes: Optional[str] = None
 
+class CountLineEdit(BaseModel):
+    """One queued edit to a count line: set its quantity (and notes) or remove it."""
+    item_id: UUID
+    actual_quantity: Optional[int] = Field(None, ge=0)
+    notes: Optional[str] = None
+    remove: bool = False
+
+    @model_validator(mode="after")
+    def check_quantity(self):
+        if not self.remove and self.actual_quantity is None:
+            raise ValueError("actual_quantity is required unless the line is removed")
+        return self
+
+class CountLineEditBatch(BaseModel):
+    # Edits in the order they were made; the last edit to an item wins
+    edits: List[CountLineEdit] = Field(..., min_length=1, max_length=5000)
+
 class CountItemRead(CountItemBase):
     id: UUID
     count_id: UUID
@@ -40,7 +57,7 @@ class CountUpdate(BaseModel):
     notes: Optional[str] = None
     rejection_reason: Optional[str] = None
 
-class CountRead(CountBase):
+class CountReadBase(CountBase):
     id: UUID
     status: CountStatus
     created_by: UUID
@@ -49,13 +66,21 @@ class CountRead(CountBase):
     reviewed_by: Optional[UUID]
     reviewed_at: Optional[datetime]
     rejection_reason: Optional[str]
-    count_items: List[CountItemRead]
     created_at: datetime
     updated_at: datetime
 
     class Config:
         from_attributes = True
 
+class CountRead(CountReadBase):
+    count_items: List[CountItemRead]
+
+class CountSummary(CountReadBase):
+    """Count without its lines; the line aggregates are computed in SQL."""
+    items_count: int
+    total_abs_discrepancy: int
+    significant_discrepancy_count: int
+
 class CountSubmit(BaseModel):
     notes: Optional[str] = None
 
@@ -1,7 +1,9 @@
-from typing import Optional
-from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field, field_validator
 from uuid import UUID
-from app.models.item import ItemCategory
+from app.models.inventory import MovementReason
+from app.models.item import ItemCategory, ItemCode
 
 class ItemBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
@@ -27,4 +29,70 @@ class ItemRead(ItemBase):
     is_low_stock: bool
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ItemChanges(BaseModel):
+    items: List[ItemRead]
+    deleted: List[UUID]
+    next_token: str
+    has_more: bool
+
+class ItemImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+class ItemImportResult(BaseModel):
+    total_rows: int
+    created: int
+    updated: int
+    failed: int
+    errors: List[ItemImportRowError]
+
+
+class ItemAdjust(BaseModel):
+    delta: int = Field(..., description="Signed change to the on-hand quantity")
+    notes: Optional[str] = None
+
+class InventoryMovementRead(BaseModel):
+    id: UUID
+    item_id: UUID
+    delta: int
+    quantity_after: int
+    reason: MovementReason
+    count_id: Optional[UUID]
+    user_id: Optional[UUID]
+    notes: Optional[str]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ItemCodeCreate(BaseModel):
+    code: str = Field(..., min_length=1, max_length=64)
+
+    @field_validator("code")
+    def code_not_blank(cls, v: str) -> str:
+        if not ItemCode.normalize(v):
+            raise ValueError("code must not be blank")
+        return v
+
+class ItemCodeRead(BaseModel):
+    code: str
+    item_id: UUID
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ItemCodeLookup(BaseModel):
+    codes: List[str] = Field(..., min_length=1, max_length=500)
+
+    @field_validator("codes")
+    def codes_not_blank(cls, v: List[str]) -> List[str]:
+        if not all(ItemCode.normalize(code) for code in v):
+            raise ValueError("codes must not be blank")
+        return v
+
+class ItemCodeLookupResult(BaseModel):
+    items: Dict[str, ItemRead]
+    missing: List[str]
@@ -1,4 +1,6 @@
 from app.services.item_service import ItemService
 from app.services.count_service import CountService
+from app.services.report_service import ReportService
+from app.services.inventory_service import InventoryService
 
-__all__ = ["ItemService", "CountService"]
+__all__ = ["ItemService", "CountService", "ReportService", "InventoryService"]
@@ -1,50 +1,63 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 from datetime import date
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import Uuid, any_, bindparam, delete, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, with_expression
 
 from app.models.count import Count, CountItem, CountStatus
-from app.models.item import Item
-from app.schemas.count import CountCreate, CountItemCreate, CountItemUpdate
+from app.models.discrepancy import DailyDiscrepancy
+from app.services.inventory_service import InventoryService
+from app.schemas.count import CountCreate, CountItemCreate, CountItemUpdate, CountLineEdit
+from app.utils.cache import invalidate_dashboard_cache
+from app.utils.events import publish_event
+from app.utils.pagination import apply_keyset, split_page
 
 
 class CountService:
     """Service class for count-related business logic."""
     
     @staticmethod
-    def get_counts(
-        db: Session,
+    def project_counts(query, include_items: bool = False):
+        """Load each count's lines (one extra query per page) or just their aggregates."""
+        if include_items:
+            return query.options(selectinload(Count.count_items))
+        return Count.with_summary(query)
+
+    @staticmethod
+    async def get_counts(
+        db: AsyncSession,
         user_id: UUID,
         user_role: str,
         skip: int = 0,
-        limit: int = 10
-    ) -> list:
-        """Get list of counts based on user role, including creator's full_name."""
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        include_items: bool = False
+    ) -> Tuple[List[Count], Optional[str]]:
+        """Get a page of counts based on user role, including creator's full_name."""
         from app.models.user import User
-        query = select(Count, User.full_name).join(User, Count.created_by == User.id)
+        query = (
+            select(Count)
+            .join(User, Count.created_by == User.id)
+            .options(with_expression(Count.created_by_name, User.full_name))
+        )
+        query = CountService.project_counts(query, include_items)
         if user_role == "staff":
             # Staff can only see their own counts
             query = query.where(Count.created_by == user_id)
-        query = query.order_by(Count.count_date.desc()).offset(skip).limit(limit)
-        result = db.execute(query)
-        counts = []
-        for count, full_name in result.all():
-            count_dict = count.__dict__.copy()
-            count_dict["created_by_name"] = full_name
-            # Add count_items as a list of dicts for Pydantic
-            count_dict["count_items"] = [item.__dict__ for item in getattr(count, "count_items", [])]
-            counts.append(count_dict)
-        return counts
+        query = apply_keyset(query, [Count.count_date, Count.id], limit, cursor, skip, descending=True)
+        result = await db.execute(query)
+        return split_page(result.scalars().all(), limit, lambda count: (count.count_date, count.id))
     
     @staticmethod
-    def get_count_by_id(db: Session, count_id: UUID) -> Optional[Count]:
+    async def get_count_by_id(db: AsyncSession, count_id: UUID) -> Optional[Count]:
         """Get a specific count by ID."""
-        return Count.get_by_id_sync(db, count_id)
+        return await Count.get_with_items(db, count_id)
     
     @staticmethod
-    def create_count(
-        db: Session,
+    async def create_count(
+        db: AsyncSession,
         count_data: CountCreate,
         user_id: UUID
     ) -> Count:
@@ -54,58 +67,89 @@ class CountService:
             created_by=user_id
         )
         db.add(db_count)
-        db.commit()
-        db.refresh(db_count)
-        return db_count
+        await db.commit()
+        invalidate_dashboard_cache()
+        return await Count.get_with_items(db, db_count.id)
     
     @staticmethod
-    def check_active_count_exists(
-        db: Session,
+    async def check_active_count_exists(
+        db: AsyncSession,
         user_id: UUID,
         count_date: date
     ) -> bool:
         """Check if user has an active count for the given date."""
-        existing_count = Count.get_user_active_count_sync(db, user_id, count_date)
+        existing_count = await Count.get_user_active_count(db, user_id, count_date)
         return existing_count is not None
     
     @staticmethod
-    def add_items_to_count(
-        db: Session,
+    async def upsert_count_items(
+        db: AsyncSession,
         count_id: UUID,
         items_data: List[CountItemCreate]
-    ) -> List[CountItem]:
-        """Add items to a count."""
-        count_items = []
-        for item_data in items_data:
-            # Get the item to get expected quantity
-            item = Item.get_by_id(db, item_data.item_id)
-            if not item:
-                continue
-            
-            count_item = CountItem(
-                count_id=count_id,
-                item_id=item_data.item_id,
-                expected_quantity=item.current_quantity,
-                actual_quantity=item_data.actual_quantity
+    ) -> List[UUID]:
+        """Add or update a count's lines in a single statement.
+
+        Lines repeating an item id collapse to the last one. If any item id does
+        not exist nothing is written and the unknown ids are returned; otherwise
+        the change is committed and an empty list returned.
+        """
+        lines = list({line.item_id: line for line in items_data}.values())
+        if not lines:
+            return []
+        return await CountService._write_lines(db, count_id, lines, [])
+
+    @staticmethod
+    async def apply_line_edits(
+        db: AsyncSession,
+        count_id: UUID,
+        edits: List[CountLineEdit]
+    ) -> List[UUID]:
+        """Apply a client's queued line edits in one transaction.
+
+        Edits are reduced to the final state of each item (the last edit wins),
+        then removed lines are deleted and the rest upserted, one statement
+        each. Unknown item ids abort the batch as in upsert_count_items.
+        """
+        final = {edit.item_id: edit for edit in edits}
+        removed = [item_id for item_id, edit in final.items() if edit.remove]
+        lines = [edit for edit in final.values() if not edit.remove]
+        return await CountService._write_lines(db, count_id, lines, removed)
+
+    @staticmethod
+    async def _write_lines(
+        db: AsyncSession,
+        count_id: UUID,
+        lines: list,
+        removed: List[UUID]
+    ) -> List[UUID]:
+        if removed:
+            await db.execute(
+                delete(CountItem).where(
+                    CountItem.count_id == count_id,
+                    CountItem.item_id == any_(bindparam("item_ids", removed, type_=ARRAY(Uuid)))
+                )
             )
-            db.add(count_item)
-            count_items.append(count_item)
-        
-        db.commit()
-        for count_item in count_items:
-            db.refresh(count_item)
-        
-        return count_items
+        if lines:
+            result = await db.execute(CountItem.upsert_statement(count_id, lines))
+            found = set(result.scalars().all())
+            missing = [line.item_id for line in lines if line.item_id not in found]
+            if missing:
+                await db.rollback()
+                return missing
+
+        await db.commit()
+        invalidate_dashboard_cache()
+        return []
     
     @staticmethod
-    def update_count_item(
-        db: Session,
+    async def update_count_item(
+        db: AsyncSession,
         count_item_id: UUID,
         update_data: CountItemUpdate
     ) -> Optional[CountItem]:
         """Update a count item."""
         query = select(CountItem).where(CountItem.id == count_item_id)
-        result = db.execute(query)
+        result = await db.execute(query)
         count_item = result.scalar_one_or_none()
         
         if not count_item:
@@ -115,94 +159,144 @@ class CountService:
         for field, value in update_values.items():
             setattr(count_item, field, value)
         
-        db.commit()
-        db.refresh(count_item)
+        await db.commit()
+        invalidate_dashboard_cache()
+        await db.refresh(count_item)
         return count_item
     
     @staticmethod
-    def delete_count_item(db: Session, count_item_id: UUID) -> bool:
+    async def delete_count_item(db: AsyncSession, count_item_id: UUID) -> bool:
         """Delete a count item."""
         query = select(CountItem).where(CountItem.id == count_item_id)
-        result = db.execute(query)
+        result = await db.execute(query)
         count_item = result.scalar_one_or_none()
         
         if not count_item:
             return False
         
-        db.delete(count_item)
-        db.commit()
+        await db.delete(count_item)
+        await db.commit()
+        invalidate_dashboard_cache()
         return True
     
     @staticmethod
-    def submit_count(db: Session, count_id: UUID) -> Optional[Count]:
+    async def submit_count(
+        db: AsyncSession,
+        count_id: UUID,
+        notes: Optional[str] = None
+    ) -> Optional[Count]:
         """Submit a count for review."""
-        count = Count.get_by_id_sync(db, count_id)
+        count = await Count.get_by_id(db, count_id)
         if not count:
             return None
         
         count.submit()
-        db.commit()
-        db.refresh(count)
-        return count
+        if notes:
+            count.notes = notes
+        await db.commit()
+        invalidate_dashboard_cache()
+        publish_event("count.submitted", id=count.id, status=count.status, created_by=count.created_by)
+        return await Count.get_with_items(db, count_id)
     
     @staticmethod
-    def approve_count(
-        db: Session,
+    async def approve_count(
+        db: AsyncSession,
         count_id: UUID,
         reviewer_id: UUID,
-        apply_changes: bool = True
+        apply_changes: bool = True,
+        notes: Optional[str] = None
     ) -> Optional[Count]:
-        """Approve a count and optionally apply inventory changes."""
-        count = Count.get_by_id_sync(db, count_id)
+        """Approve a count, optionally apply inventory changes, and roll up its discrepancies.
+
+        Runs in a fixed number of statements whatever the count's size. The
+        count row is locked first so it cannot be approved twice, then the
+        affected items are locked in id order before being updated, so
+        concurrent approvals sharing items wait on each other instead of
+        deadlocking or interleaving their writes. Each changed item gets a
+        count_approval movement.
+        """
+        count = await Count.get_for_update(db, count_id)
         if not count:
             return None
         
         count.approve(reviewer_id)
+        if notes:
+            count.notes = notes
         
         # Apply inventory changes if requested
         if apply_changes:
-            for count_item in count.count_items:
-                item = count_item.item
-                item.current_quantity = count_item.actual_quantity
+            await InventoryService.apply_count(db, count_id, reviewer_id)
+        
+        # Maintain the discrepancy rollup in the same transaction
+        await db.flush()
+        await db.execute(DailyDiscrepancy.populate_statement(Count.id == count_id))
         
-        db.commit()
-        db.refresh(count)
-        return count
+        await db.commit()
+        invalidate_dashboard_cache()
+        publish_event(
+            "count.reviewed",
+            id=count.id,
+            status=count.status,
+            created_by=count.created_by,
+            items_changed=apply_changes
+        )
+        return await Count.get_with_items(db, count_id)
     
     @staticmethod
-    def reject_count(
-        db: Session,
+    async def reject_count(
+        db: AsyncSession,
         count_id: UUID,
-        reviewer_id: UUID
+        reviewer_id: UUID,
+        reason: Optional[str] = None,
+        notes: Optional[str] = None
     ) -> Optional[Count]:
         """Reject a count."""
-        count = Count.get_by_id_sync(db, count_id)
+        count = await Count.get_by_id(db, count_id)
         if not count:
             return None
         
-        count.reject(reviewer_id)
-        db.commit()
-        db.refresh(count)
-        return count
+        count.reject(reviewer_id, reason)
+        if notes:
+            count.notes = notes
+        await db.commit()
+        invalidate_dashboard_cache()
+        publish_event(
+            "count.reviewed",
+            id=count.id,
+            status=count.status,
+            created_by=count.created_by,
+            items_changed=False
+        )
+        return await Count.get_with_items(db, count_id)
     
     @staticmethod
-    def delete_count(db: Session, count_id: UUID) -> bool:
+    async def delete_count(db: AsyncSession, count_id: UUID) -> bool:
         """Delete a count (only if in draft status)."""
-        count = Count.get_by_id_sync(db, count_id)
+        count = await Count.get_by_id(db, count_id)
         if not count:
             return False
         
         if count.status != CountStatus.DRAFT:
             return False
         
-        db.delete(count)
-        db.commit()
+        await db.delete(count)
+        await db.commit()
+        invalidate_dashboard_cache()
+        publish_event("count.deleted", id=count_id, created_by=count.created_by)
         return True
     
     @staticmethod
-    def get_pending_counts(db: Session) -> List[Count]:
-        """Get all counts pending review."""
-        query = select(Count).where(Count.status == CountStatus.SUBMITTED)
-        query = query.order_by(Count.submitted_at.desc())
-        result = db.execute(query)
-        return result.scalars().all()
+    async def get_pending_counts(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        include_items: bool = False
+    ) -> Tuple[List[Count], Optional[str]]:
+        """Get a page of counts pending review, most recently submitted first."""
+        query = CountService.project_counts(
+            select(Count).where(Count.status == CountStatus.SUBMITTED), include_items
+        )
+        query = apply_keyset(query, [Count.submitted_at, Count.id], limit, cursor, skip, descending=True)
+        result = await db.execute(query)
+        return split_page(result.scalars().all(), limit, lambda count: (count.submitted_at, count.id))
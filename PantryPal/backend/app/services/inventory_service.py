@@ -0,0 +1,145 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Integer, Text, Uuid, bindparam, column, func, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.count import CountItem
+from app.models.inventory import InventoryMovement, MovementReason
+from app.models.item import Item
+from app.utils.pagination import apply_keyset, split_page
+
+
+def _unnest(name: str, values: Dict[UUID, int]):
+    """Bind an item id -> number mapping as a two-column (item_id, <name>) CTE."""
+    rows = func.unnest(
+        bindparam("item_ids", list(values.keys()), type_=ARRAY(Uuid)),
+        bindparam(name, list(values.values()), type_=ARRAY(Integer)),
+    ).table_valued(column("item_id", Uuid), column(name, Integer)).render_derived(name="rows")
+    return select(rows.c.item_id, rows.c[name]).cte("source")
+
+
+class InventoryService:
+    """Service class for on-hand quantity changes and their movement ledger.
+
+    Every change is one statement: the affected items are locked in id order,
+    updated in place, and a movement row is appended for each item whose
+    quantity actually changed. Nothing is committed here, so the changes join
+    the caller's transaction.
+    """
+
+    @staticmethod
+    async def _apply(
+        db: AsyncSession,
+        source,
+        new_quantity,
+        reason: MovementReason,
+        user_id: Optional[UUID],
+        count_id: Optional[UUID],
+        notes: Optional[str]
+    ) -> Dict[UUID, int]:
+        # Locking in id order up front keeps concurrent batches that share
+        # items from deadlocking on each other
+        locked = (
+            select(Item.id, Item.current_quantity)
+            .where(Item.id.in_(select(source.c.item_id)))
+            .order_by(Item.id)
+            .with_for_update()
+            .cte("locked")
+        )
+        updated = (
+            update(Item)
+            .where(Item.id == locked.c.id, Item.id == source.c.item_id)
+            .values(current_quantity=new_quantity, updated_at=datetime.utcnow())
+            .returning(
+                Item.id.label("item_id"),
+                Item.current_quantity.label("quantity_after"),
+                (Item.current_quantity - locked.c.current_quantity).label("delta"),
+            )
+            .cte("updated")
+        )
+        logged = insert(InventoryMovement).from_select(
+            ["item_id", "delta", "quantity_after", "reason", "count_id", "user_id", "notes"],
+            select(
+                updated.c.item_id,
+                updated.c.delta,
+                updated.c.quantity_after,
+                literal(reason, InventoryMovement.reason.type),
+                literal(count_id, Uuid),
+                literal(user_id, Uuid),
+                literal(notes, Text),
+            ).where(updated.c.delta != 0)
+        ).cte("logged")
+
+        result = await db.execute(
+            select(updated.c.item_id, updated.c.quantity_after).add_cte(logged)
+        )
+        return {item_id: quantity for item_id, quantity in result.all()}
+
+    @staticmethod
+    async def adjust_quantities(
+        db: AsyncSession,
+        deltas: Dict[UUID, int],
+        reason: MovementReason = MovementReason.ADJUSTMENT,
+        user_id: Optional[UUID] = None,
+        notes: Optional[str] = None
+    ) -> Dict[UUID, int]:
+        """Add signed deltas to item quantities; returns the new quantity per item found."""
+        if not deltas:
+            return {}
+        source = _unnest("delta", deltas)
+        return await InventoryService._apply(
+            db, source, Item.current_quantity + source.c.delta,
+            reason, user_id, None, notes
+        )
+
+    @staticmethod
+    async def set_quantities(
+        db: AsyncSession,
+        quantities: Dict[UUID, int],
+        reason: MovementReason = MovementReason.MANUAL,
+        user_id: Optional[UUID] = None,
+        notes: Optional[str] = None
+    ) -> Dict[UUID, int]:
+        """Set item quantities outright, logging the difference; returns quantities per item found."""
+        if not quantities:
+            return {}
+        source = _unnest("quantity", quantities)
+        return await InventoryService._apply(
+            db, source, source.c.quantity,
+            reason, user_id, None, notes
+        )
+
+    @staticmethod
+    async def apply_count(db: AsyncSession, count_id: UUID, user_id: UUID) -> Dict[UUID, int]:
+        """Set each counted item to its counted quantity, attributing movements to the count."""
+        source = (
+            select(CountItem.item_id, CountItem.actual_quantity.label("quantity"))
+            .where(CountItem.count_id == count_id)
+            .cte("source")
+        )
+        return await InventoryService._apply(
+            db, source, source.c.quantity,
+            MovementReason.COUNT_APPROVAL, user_id, count_id, None
+        )
+
+    @staticmethod
+    async def get_movements(
+        db: AsyncSession,
+        item_id: UUID,
+        skip: int = 0,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[InventoryMovement], Optional[str]]:
+        """Get a page of an item's movements, newest first."""
+        query = select(InventoryMovement).where(InventoryMovement.item_id == item_id)
+        query = apply_keyset(
+            query, [InventoryMovement.created_at, InventoryMovement.id], limit, cursor, skip,
+            descending=True
+        )
+        result = await db.execute(query)
+        return split_page(
+            result.scalars().all(), limit, lambda movement: (movement.created_at, movement.id)
+        )
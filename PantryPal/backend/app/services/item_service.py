@@ -1,111 +1,416 @@
-from typing import List, Optional
-from uuid import UUID
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from uuid import UUID, uuid4
+from pydantic import ValidationError
+from sqlalchemy import (
+    Boolean, String, Uuid, any_, bindparam, delete, false, func, literal_column, or_, select,
+    true, tuple_, union_all
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
-from app.models.item import Item, ItemCategory
-from app.schemas.item import ItemCreate, ItemUpdate
+from app.models.inventory import MovementReason
+from app.models.item import SETTLED_XID, Item, ItemCategory, ItemCode, ItemTombstone
+from app.schemas.item import (
+    ItemCreate,
+    ItemImportResult,
+    ItemImportRowError,
+    ItemUpdate
+)
+from app.services.inventory_service import InventoryService
+from app.utils.cache import invalidate_dashboard_cache
+from app.utils.events import publish_event
+from app.utils.imports import ImportRecord, take
+from app.utils.pagination import apply_keyset, decode_cursor, encode_cursor, split_page
+
+IMPORT_BATCH_SIZE = 1000
+
+# Columns an import overwrites when the item name already exists; quantity
+# changes on existing items go through the movement ledger instead
+IMPORT_UPDATE_COLUMNS = (
+    "description",
+    "category",
+    "unit_of_measure",
+    "par_level",
+    "updated_at",
+)
+
+# Below this many characters trigrams say little, so only prefixes are matched
+SEARCH_MIN_FUZZY_LENGTH = 3
+# Description matches rank below name matches of the same strength
+SEARCH_DESCRIPTION_WEIGHT = 0.5
+
+
+def _like_prefix(term: str) -> str:
+    escaped = term.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+# Tie-breaker for a sync token that has caught up with the settle point
+_MAX_UUID = UUID(int=(1 << 128) - 1)
 
 
 class ItemService:
     """Service class for item-related business logic."""
     
     @staticmethod
-    def get_items(
-        db: Session,
+    async def get_items(
+        db: AsyncSession,
         category: Optional[ItemCategory] = None,
         skip: int = 0,
-        limit: int = 10
-    ) -> List[Item]:
-        """Get list of items with optional filtering."""
+        limit: int = 10,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Item], Optional[str]]:
+        """Get a page of items ordered by their unique name, with the next page's cursor."""
         query = select(Item)
         if category:
             query = query.where(Item.category == category)
         
-        query = query.offset(skip).limit(limit)
-        result = db.execute(query)
-        return result.scalars().all()
+        query = apply_keyset(query, [Item.name], limit, cursor, skip)
+        result = await db.execute(query)
+        return split_page(result.scalars().all(), limit, lambda item: (item.name,))
     
     @staticmethod
-    def get_low_stock_items(db: Session) -> List[Item]:
+    async def search_items(
+        db: AsyncSession,
+        q: str,
+        category: Optional[ItemCategory] = None,
+        limit: int = 20
+    ) -> List[Item]:
+        """Find items by partial or misspelled name, best matches first.
+
+        Case-insensitive name prefixes are tried first on their btree index and
+        answer on their own when they fill the page. Otherwise items whose name
+        or description contains a close match of the term (pg_trgm word
+        similarity, served by the trigram indexes) are ranked with prefix
+        matches first, then by similarity.
+        """
+        term = q.strip()
+        if not term:
+            return []
+        base = select(Item)
+        if category:
+            base = base.where(Item.category == category)
+
+        is_prefix = func.lower(Item.name).like(_like_prefix(term), escape="\\")
+        result = await db.execute(base.where(is_prefix).order_by(Item.name).limit(limit))
+        prefixed = result.scalars().all()
+        if len(prefixed) == limit or len(term) < SEARCH_MIN_FUZZY_LENGTH:
+            return prefixed
+
+        term_param = bindparam("term", term, type_=String)
+        score = func.greatest(
+            func.word_similarity(term_param, Item.name),
+            func.word_similarity(term_param, func.coalesce(Item.description, "")) * SEARCH_DESCRIPTION_WEIGHT
+        )
+        query = base.where(or_(
+            is_prefix,
+            term_param.op("<%")(Item.name),
+            term_param.op("<%")(Item.description)
+        )).order_by(is_prefix.desc(), score.desc(), Item.name).limit(limit)
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_item_by_code(db: AsyncSession, code: str) -> Optional[Item]:
+        """Resolve a barcode or SKU to its item."""
+        result = await db.execute(
+            select(Item).join(ItemCode, ItemCode.item_id == Item.id)
+            .where(ItemCode.code == ItemCode.normalize(code))
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_items_by_codes(db: AsyncSession, codes: List[str]) -> Dict[str, Item]:
+        """Resolve many codes in one query; returns normalized code -> item for the known ones.
+
+        The codes are bound as one array so the statement is the same for any batch size.
+        """
+        normalized = list({ItemCode.normalize(code) for code in codes})
+        result = await db.execute(
+            select(ItemCode.code, Item).join(Item, ItemCode.item_id == Item.id)
+            .where(ItemCode.code == any_(bindparam("codes", normalized, type_=ARRAY(String))))
+        )
+        return {code: item for code, item in result.all()}
+
+    @staticmethod
+    async def get_item_codes(db: AsyncSession, item_id: UUID) -> List[ItemCode]:
+        """Get the codes assigned to an item, oldest first."""
+        result = await db.execute(
+            select(ItemCode)
+            .where(ItemCode.item_id == item_id)
+            .order_by(ItemCode.created_at, ItemCode.code)
+        )
+        return result.scalars().all()
+
+    @staticmethod
+    async def add_item_code(db: AsyncSession, item_id: UUID, code: str) -> ItemCode:
+        """Assign a code to an item; returns the code's row, which names another item if it was taken."""
+        code = ItemCode.normalize(code)
+        await db.execute(
+            insert(ItemCode)
+            .values(id=uuid4(), item_id=item_id, code=code)
+            .on_conflict_do_nothing(constraint="uq_item_codes_code")
+        )
+        await db.commit()
+        result = await db.execute(select(ItemCode).where(ItemCode.code == code))
+        return result.scalar_one()
+
+    @staticmethod
+    async def remove_item_code(db: AsyncSession, item_id: UUID, code: str) -> bool:
+        """Remove a code from an item; returns False when the item does not have it."""
+        result = await db.execute(
+            delete(ItemCode)
+            .where(ItemCode.item_id == item_id, ItemCode.code == ItemCode.normalize(code))
+            .returning(ItemCode.id)
+        )
+        await db.commit()
+        return result.first() is not None
+
+    @staticmethod
+    async def get_item_changes(
+        db: AsyncSession,
+        since: Optional[str] = None,
+        limit: int = 500
+    ) -> Tuple[List[Item], List[UUID], str, bool]:
+        """Items changed and ids deleted after a sync token, in commit-safe order.
+
+        Item writes and tombstones are read as one (change_xid, id) ordered
+        stream, each side from its own index. Only changes by transactions
+        older than the oldest one still running are returned, so a slow
+        transaction can never commit a change behind a token already handed
+        out; a long-running transaction delays sync instead. Once a client has
+        caught up, its token moves to that point so the next call starts there.
+
+        Returns (changed items, deleted ids, next token, whether more remain).
+        """
+        # Taken before reading, so every transaction below it is visible to the read
+        settled = (await db.execute(select(SETTLED_XID))).scalar_one()
+
+        changes = union_all(
+            select(Item.id.label("id"), Item.change_xid.label("change_xid"), false().label("deleted")),
+            select(ItemTombstone.item_id, ItemTombstone.change_xid, true())
+        ).subquery("changes")
+        key = [changes.c.change_xid, changes.c.id]
+        since_key = decode_cursor(since, key) if since else None
+
+        query = select(changes).where(changes.c.change_xid < settled)
+        if since_key:
+            query = query.where(tuple_(*key) > tuple_(*since_key))
+        result = await db.execute(query.order_by(*key).limit(limit + 1))
+        rows = result.all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if has_more:
+            next_key = (rows[-1].change_xid, rows[-1].id)
+        else:
+            next_key = max(filter(None, [(settled - 1, _MAX_UUID), since_key]))
+        next_token = encode_cursor(next_key)
+
+        deleted = [row.id for row in rows if row.deleted]
+        updated_ids = [row.id for row in rows if not row.deleted]
+        items = []
+        if updated_ids:
+            result = await db.execute(
+                select(Item)
+                .where(Item.id == any_(bindparam("item_ids", updated_ids, type_=ARRAY(Uuid))))
+                .order_by(Item.change_xid, Item.id)
+            )
+            items = result.scalars().all()
+        return items, deleted, next_token, has_more
+
+    @staticmethod
+    async def get_low_stock_items(db: AsyncSession) -> List[Item]:
         """Get all items below their par level."""
-        return Item.get_low_stock(db)
+        return await Item.get_low_stock(db)
     
     @staticmethod
-    def get_item_by_id(db: Session, item_id: UUID) -> Optional[Item]:
+    async def get_item_by_id(db: AsyncSession, item_id: UUID) -> Optional[Item]:
         """Get a specific item by ID."""
-        return Item.get_by_id(db, item_id)
+        return await Item.get_by_id(db, item_id)
     
     @staticmethod
-    def create_item(db: Session, item_data: ItemCreate, user_id: UUID) -> Item:
+    async def create_item(db: AsyncSession, item_data: ItemCreate, user_id: UUID) -> Item:
         """Create a new item."""
         db_item = Item(
             **item_data.model_dump(),
             created_by=user_id
         )
         db.add(db_item)
-        db.commit()
-        db.refresh(db_item)
+        await db.commit()
+        invalidate_dashboard_cache()
+        publish_event("item.changed", id=db_item.id)
+        await db.refresh(db_item)
         return db_item
     
     @staticmethod
-    def update_item(
-        db: Session,
+    def _read_import_batch(
+        records: Iterator[ImportRecord],
+        size: int
+    ) -> Tuple[int, Dict[str, ItemCreate], List[ItemImportRowError]]:
+        """Parse and validate the next batch of import records.
+
+        Runs in a worker thread since it reads the spooled upload and does the
+        CPU-bound validation. Rows are keyed by name so a repeated name within a
+        batch keeps its last occurrence, which the upsert could not apply twice.
+        """
+        batch = take(records, size)
+        valid: Dict[str, ItemCreate] = {}
+        errors: List[ItemImportRowError] = []
+        for row, data, parse_error in batch:
+            if parse_error:
+                errors.append(ItemImportRowError(row=row, errors=[parse_error]))
+                continue
+            try:
+                item = ItemCreate.model_validate(data)
+            except ValidationError as e:
+                errors.append(ItemImportRowError(row=row, errors=[
+                    f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+                    for err in e.errors()
+                ]))
+                continue
+            valid.pop(item.name, None)
+            valid[item.name] = item
+        return len(batch), valid, errors
+
+    @staticmethod
+    async def import_items(
+        db: AsyncSession,
+        records: Iterator[ImportRecord],
+        user_id: UUID,
+        batch_size: int = IMPORT_BATCH_SIZE
+    ) -> ItemImportResult:
+        """Upsert items from parsed import records, keyed on item name.
+
+        Records are validated and written a batch at a time so memory stays
+        bounded by the batch size rather than the upload. Existing names get
+        their details and quantity overwritten; rows that fail validation are
+        reported back by row number and skipped. Everything commits together.
+        Quantity changes on existing items are recorded as import movements.
+        """
+        result = ItemImportResult(total_rows=0, created=0, updated=0, failed=0, errors=[])
+        # Core insert against the table so executemany batches into multi-row VALUES
+        upsert = insert(Item.__table__)
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[Item.__table__.c.name],
+            set_={column: upsert.excluded[column] for column in IMPORT_UPDATE_COLUMNS}
+        ).returning(
+            Item.__table__.c.id,
+            Item.__table__.c.name,
+            literal_column("xmax = 0", Boolean).label("inserted")
+        )
+
+        while True:
+            count, valid, errors = await run_in_threadpool(
+                ItemService._read_import_batch, records, batch_size
+            )
+            if not count:
+                break
+            result.total_rows += count
+            result.failed += len(errors)
+            result.errors.extend(errors)
+            if not valid:
+                continue
+
+            now = datetime.utcnow()
+            rows = [
+                {**item.model_dump(), "id": uuid4(), "created_by": user_id, "updated_at": now}
+                for item in valid.values()
+            ]
+            upserted = (await db.execute(upsert, rows)).all()
+            existing = {row.id: valid[row.name].current_quantity for row in upserted if not row.inserted}
+            await InventoryService.set_quantities(db, existing, MovementReason.IMPORT, user_id)
+            result.created += len(upserted) - len(existing)
+            result.updated += len(existing)
+
+        if result.created or result.updated:
+            await db.commit()
+            invalidate_dashboard_cache()
+            # One event for the whole file; clients catch up through delta sync
+            publish_event("items.imported", created=result.created, updated=result.updated)
+        return result
+
+    @staticmethod
+    async def update_item(
+        db: AsyncSession,
         item_id: UUID,
-        item_data: ItemUpdate
+        item_data: ItemUpdate,
+        user_id: Optional[UUID] = None
     ) -> Optional[Item]:
-        """Update an existing item."""
-        db_item = Item.get_by_id(db, item_id)
+        """Update an existing item; a quantity change is recorded as a manual movement."""
+        db_item = await Item.get_by_id(db, item_id)
         if not db_item:
             return None
         
         update_data = item_data.model_dump(exclude_unset=True)
+        new_quantity = update_data.pop("current_quantity", None)
         for field, value in update_data.items():
             setattr(db_item, field, value)
+        if new_quantity is not None:
+            await InventoryService.set_quantities(
+                db, {item_id: new_quantity}, MovementReason.MANUAL, user_id
+            )
         
-        db.commit()
-        db.refresh(db_item)
+        await db.commit()
+        invalidate_dashboard_cache()
+        publish_event("item.changed", id=item_id)
+        await db.refresh(db_item)
         return db_item
     
     @staticmethod
-    def delete_item(db: Session, item_id: UUID) -> bool:
+    async def delete_item(db: AsyncSession, item_id: UUID) -> bool:
         """Delete an item."""
-        db_item = Item.get_by_id(db, item_id)
+        db_item = await Item.get_by_id(db, item_id)
         if not db_item:
             return False
         
-        db.delete(db_item)
-        db.commit()
+        await db.delete(db_item)
+        # Lets delta sync clients drop the item
+        db.add(ItemTombstone(item_id=item_id))
+        await db.commit()
+        invalidate_dashboard_cache()
+        publish_event("item.deleted", id=item_id)
         return True
     
     @staticmethod
-    def adjust_item_quantity(
-        db: Session,
+    async def adjust_item_quantity(
+        db: AsyncSession,
         item_id: UUID,
-        quantity_change: float
+        quantity_change: int,
+        user_id: Optional[UUID] = None,
+        notes: Optional[str] = None
     ) -> Optional[Item]:
-        """Adjust item quantity by a specified amount (can be positive or negative)."""
-        db_item = Item.get_by_id(db, item_id)
-        if not db_item:
+        """Adjust item quantity by a specified amount (can be positive or negative).
+
+        The change is applied atomically in the database, so concurrent
+        adjustments never overwrite each other.
+        """
+        quantities = await InventoryService.adjust_quantities(
+            db, {item_id: quantity_change}, MovementReason.ADJUSTMENT, user_id, notes
+        )
+        if item_id not in quantities:
             return None
         
-        db_item.current_quantity += quantity_change
-        db.commit()
-        db.refresh(db_item)
-        return db_item
+        await db.commit()
+        invalidate_dashboard_cache()
+        publish_event("item.changed", id=item_id)
+        return await db.get(Item, item_id, populate_existing=True)
     
     @staticmethod
-    def set_item_quantity(
-        db: Session,
+    async def set_item_quantity(
+        db: AsyncSession,
         item_id: UUID,
-        new_quantity: float
+        new_quantity: int,
+        user_id: Optional[UUID] = None
     ) -> Optional[Item]:
-        """Set item quantity to a specific value."""
-        db_item = Item.get_by_id(db, item_id)
-        if not db_item:
+        """Set item quantity to a specific value, recording the difference as a movement."""
+        quantities = await InventoryService.set_quantities(
+            db, {item_id: new_quantity}, MovementReason.MANUAL, user_id
+        )
+        if item_id not in quantities:
             return None
         
-        db_item.current_quantity = new_quantity
-        db.commit()
-        db.refresh(db_item)
-        return db_item
+        await db.commit()
+        invalidate_dashboard_cache()
+        publish_event("item.changed", id=item_id)
+        return await db.get(Item, item_id, populate_existing=True)
@@ -0,0 +1,132 @@
+from datetime import date
+from itertools import groupby
+from typing import Any, Dict, List
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.count import Count, CountItem
+from app.models.discrepancy import DailyDiscrepancy
+from app.models.item import Item
+from app.models.user import User
+
+COUNT_SUMMARY_COLUMNS = (
+    "id", "date", "staff", "status", "total_items", "submitted_at", "reviewed_at", "reviewer"
+)
+DISCREPANCY_COLUMNS = (
+    "item_name", "date", "expected", "actual", "discrepancy", "variance_percentage"
+)
+
+
+class ReportService:
+    """Service class for reporting queries."""
+
+    @staticmethod
+    def count_summary_query(start_date: date, end_date: date):
+        """Counts in a date range with staff/reviewer names and item totals, newest first."""
+        date_filter = (Count.count_date >= start_date) & (Count.count_date <= end_date)
+        creator = aliased(User)
+        reviewer = aliased(User)
+        summary = CountItem.summary_subquery(date_filter)
+        return select(
+            Count.id,
+            Count.count_date,
+            Count.status,
+            Count.submitted_at,
+            Count.reviewed_at,
+            creator.full_name.label("staff"),
+            reviewer.full_name.label("reviewer"),
+            func.coalesce(summary.c.items_count, 0).label("total_items")
+        ).join(
+            creator, Count.created_by == creator.id
+        ).outerjoin(
+            reviewer, Count.reviewed_by == reviewer.id
+        ).outerjoin(
+            summary, summary.c.count_id == Count.id
+        ).where(date_filter).order_by(Count.count_date.desc())
+
+    @staticmethod
+    def count_summary_row(count) -> Dict[str, Any]:
+        """One row of ``count_summary_query`` as a report record."""
+        return {
+            "id": str(count.id),
+            "date": count.count_date,
+            "staff": count.staff,
+            "status": count.status,
+            "total_items": count.total_items,
+            "submitted_at": count.submitted_at,
+            "reviewed_at": count.reviewed_at,
+            "reviewer": count.reviewer
+        }
+
+    @staticmethod
+    async def get_count_summary(
+        db: AsyncSession,
+        start_date: date,
+        end_date: date
+    ) -> List[Dict[str, Any]]:
+        """Get the daily count summary for a date range."""
+        result = await db.execute(ReportService.count_summary_query(start_date, end_date))
+        return [ReportService.count_summary_row(count) for count in result]
+
+    @staticmethod
+    def discrepancy_query(
+        start_date: date,
+        end_date: date,
+        min_variance_percentage: float
+    ):
+        """Flat, item-ordered rows of significant discrepancies from the daily rollup."""
+        return select(
+            Item.name.label("item_name"),
+            DailyDiscrepancy.count_date,
+            DailyDiscrepancy.expected_quantity,
+            DailyDiscrepancy.actual_quantity,
+            DailyDiscrepancy.discrepancy,
+            DailyDiscrepancy.variance_percentage
+        ).join(Item, Item.id == DailyDiscrepancy.item_id).where(
+            (DailyDiscrepancy.count_date >= start_date) &
+            (DailyDiscrepancy.count_date <= end_date) &
+            DailyDiscrepancy.is_significant &
+            (DailyDiscrepancy.variance_percentage >= min_variance_percentage)
+        ).order_by(
+            Item.name,
+            DailyDiscrepancy.count_date
+        )
+
+    @staticmethod
+    def discrepancy_row(row) -> Dict[str, Any]:
+        """One discrepancy as a flat record (exports emit these ungrouped)."""
+        return {
+            "item_name": row.item_name,
+            "date": row.count_date,
+            "expected": row.expected_quantity,
+            "actual": row.actual_quantity,
+            "discrepancy": row.discrepancy,
+            "variance_percentage": float(row.variance_percentage)
+        }
+
+    @staticmethod
+    async def get_discrepancy_report(
+        db: AsyncSession,
+        start_date: date,
+        end_date: date,
+        min_variance_percentage: float
+    ) -> List[Dict[str, Any]]:
+        """Get items with significant discrepancies, grouped by item name."""
+        query = ReportService.discrepancy_query(start_date, end_date, min_variance_percentage)
+        result = await db.execute(query)
+
+        return [
+            {
+                "item_name": item_name,
+                "discrepancies": [
+                    {
+                        key: value
+                        for key, value in ReportService.discrepancy_row(row).items()
+                        if key != "item_name"
+                    }
+                    for row in rows
+                ]
+            }
+            for item_name, rows in groupby(result, key=lambda row: row.item_name)
+        ]
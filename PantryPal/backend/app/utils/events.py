@@ -0,0 +1,226 @@
+import asyncio
+import json
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Set
+
+import asyncpg
+
+from app.config import settings
+from app.utils.cache import invalidate_dashboard_cache
+
+logger = logging.getLogger(__name__)
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_PAYLOAD_BYTES = 7999
+# Events waiting for the notify connection, and how many go per round trip
+OUTBOX_SIZE = 10000
+SEND_BATCH = 100
+# Seconds between reconnect attempts, backing off to the last value
+RECONNECT_DELAYS = (0.5, 1, 2, 5, 10)
+
+# Tells a client it may have missed events and should refetch what it shows
+RESYNC_EVENT = "resync"
+RESYNC_PAYLOAD = json.dumps({"type": RESYNC_EVENT, "data": {}})
+
+
+def _encode(event_type: str, data: Dict[str, Any]) -> str:
+    payload = json.dumps({"type": event_type, "data": data}, default=str, separators=(",", ":"))
+    if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+        logger.warning("Event %s is too large to notify, sending a resync instead", event_type)
+        return RESYNC_PAYLOAD
+    return payload
+
+
+class Subscription:
+    """One push client's bounded queue of encoded events.
+
+    A client that falls a full queue behind has its backlog replaced by a
+    single resync event, so a slow reader never holds up the broker or the
+    other clients.
+    """
+
+    def __init__(self, queue_size: int, accepts: Callable[[dict], bool]):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.accepts = accepts
+
+    def offer(self, event: dict, payload: str) -> bool:
+        """Queue an event if the client wants it; False if the client had fallen behind."""
+        if event["type"] != RESYNC_EVENT and not self.accepts(event):
+            return True
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_PAYLOAD)
+            return False
+        return True
+
+    async def get(self, timeout: float) -> Optional[str]:
+        """Next encoded event, or None if none arrives within ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroker:
+    """Change events for server push, shared by all workers over Postgres LISTEN/NOTIFY.
+
+    Services publish an event after committing a write. Each worker keeps one
+    dedicated connection, outside the pool, that sends queued events with
+    pg_notify and listens on the same channel, so every worker (the publisher
+    included) hands each event to its subscribers from the one listener
+    callback. Publishing never waits on the database. Events published while
+    the connection is down are sent once it is back, and subscribers are told
+    to resync since other workers' events may have been missed. When the
+    broker is not running, events only reach this worker's subscribers.
+    """
+
+    def __init__(self, channel: str, queue_size: int):
+        self.channel = channel
+        self.queue_size = queue_size
+        self.subscribers: Set[Subscription] = set()
+        self.connected = False
+        self.published = 0
+        self.received = 0
+        self.undeliverable = 0
+        self.overflows = 0
+        self.reconnects = 0
+        self._outbox: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        """Connect and start relaying events; call from inside the running loop."""
+        if self.running:
+            return
+        self._outbox = asyncio.Queue(maxsize=OUTBOX_SIZE)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._outbox = None
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> None:
+        payload = _encode(event_type, data)
+        self.published += 1
+        if not self.running:
+            self._dispatch(payload)
+            return
+        try:
+            self._outbox.put_nowait(payload)
+        except asyncio.QueueFull:
+            # Other workers miss this one; at least this worker's clients see it
+            self.undeliverable += 1
+            self._dispatch(payload)
+
+    @contextmanager
+    def subscribe(self, accepts: Callable[[dict], bool] = lambda event: True) -> Iterator[Subscription]:
+        """Register a subscriber for the duration of the block.
+
+        ``accepts`` filters events by their decoded ``{"type", "data"}``;
+        resync events always pass.
+        """
+        subscription = Subscription(self.queue_size, accepts)
+        self.subscribers.add(subscription)
+        try:
+            yield subscription
+        finally:
+            self.subscribers.discard(subscription)
+
+    def _dispatch(self, payload: str) -> None:
+        # The write may have happened on another worker, whose cache
+        # invalidation does not reach this one
+        invalidate_dashboard_cache()
+        event = json.loads(payload)
+        for subscription in list(self.subscribers):
+            if not subscription.offer(event, payload):
+                self.overflows += 1
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        self.received += 1
+        try:
+            self._dispatch(payload)
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed event on %s: %r", channel, payload[:200])
+
+    async def _run(self) -> None:
+        attempt = 0
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(
+                    user=settings.DATABASE_USER,
+                    password=settings.DATABASE_PASSWORD,
+                    host=settings.DATABASE_HOST,
+                    port=settings.DATABASE_PORT,
+                    database=settings.DATABASE_NAME,
+                )
+                await connection.add_listener(self.channel, self._on_notify)
+                self.connected = True
+                if attempt:
+                    self._dispatch(RESYNC_PAYLOAD)
+                attempt = 0
+                await self._send(connection)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Event channel connection failed (%r), reconnecting", exc)
+            finally:
+                self.connected = False
+                if connection is not None:
+                    connection.terminate()
+            await asyncio.sleep(RECONNECT_DELAYS[min(attempt, len(RECONNECT_DELAYS) - 1)])
+            attempt += 1
+            self.reconnects += 1
+
+    async def _send(self, connection: asyncpg.Connection) -> None:
+        while True:
+            try:
+                payload = await asyncio.wait_for(
+                    self._outbox.get(), settings.EVENTS_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                # An idle listener would not notice a dropped connection
+                await connection.execute("SELECT 1", timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+                continue
+            payloads = [payload]
+            while len(payloads) < SEND_BATCH and not self._outbox.empty():
+                payloads.append(self._outbox.get_nowait())
+            await connection.executemany(
+                "SELECT pg_notify($1, $2)", [(self.channel, payload) for payload in payloads]
+            )
+
+    def status(self) -> dict:
+        return {
+            "enabled": settings.EVENTS_ENABLED,
+            "running": self.running,
+            "connected": self.connected,
+            "subscribers": len(self.subscribers),
+            "outbox": self._outbox.qsize() if self._outbox is not None else 0,
+            "published": self.published,
+            "received": self.received,
+            "undeliverable": self.undeliverable,
+            "overflows": self.overflows,
+            "reconnects": self.reconnects,
+        }
+
+
+event_broker = EventBroker(settings.EVENTS_CHANNEL, settings.EVENTS_CLIENT_QUEUE_SIZE)
+
+
+def publish_event(event_type: str, **data: Any) -> None:
+    """Push a change event to subscribed clients on every worker, after the write commits."""
+    event_broker.publish(event_type, data)
@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Dict, Sequence
+from uuid import UUID
+
+from fastapi.responses import StreamingResponse
+
+from app.database import get_read_sessionmaker
+
+EXPORT_FORMATS = ("json", "csv", "ndjson")
+# Query parameter pattern for endpoints offering the streamed formats
+EXPORT_FORMAT_PATTERN = "^(json|csv|ndjson)$"
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+# Encoded output is flushed to the client in chunks of roughly this size
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+Row = Dict[str, Any]
+
+
+def _plain(value: Any) -> Any:
+    """Reduce a column value to something csv/json can write."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+async def stream_query_rows(query, to_row: Callable[[Any], Row]) -> AsyncIterator[Row]:
+    """Yield rows of ``query`` through a server-side cursor, converted by ``to_row``.
+
+    Opens its own read session: a streamed response outlives the request's
+    dependencies, so it cannot use the session they provided.
+    """
+    session_factory = await get_read_sessionmaker()
+    async with session_factory() as db:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for row in result:
+            yield to_row(row)
+
+
+async def encode_csv(rows: AsyncIterator[Row], columns: Sequence[str]) -> AsyncIterator[bytes]:
+    """Encode rows as CSV with a header line, in chunks of about EXPORT_CHUNK_BYTES."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for row in rows:
+        writer.writerow([_plain(row.get(column)) for column in columns])
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def encode_ndjson(rows: AsyncIterator[Row]) -> AsyncIterator[bytes]:
+    """Encode rows as one JSON object per line, in chunks of about EXPORT_CHUNK_BYTES."""
+    chunk = []
+    size = 0
+    async for row in rows:
+        line = json.dumps(row, default=_plain) + "\n"
+        chunk.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_BYTES:
+            yield "".join(chunk).encode()
+            chunk.clear()
+            size = 0
+    if chunk:
+        yield "".join(chunk).encode()
+
+
+def export_response(
+    rows: AsyncIterator[Row],
+    fmt: str,
+    columns: Sequence[str],
+    filename: str
+) -> StreamingResponse:
+    """Stream rows as a CSV or NDJSON download."""
+    body = encode_csv(rows, columns) if fmt == "csv" else encode_ndjson(rows)
+    return StreamingResponse(
+        body,
+        media_type=_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
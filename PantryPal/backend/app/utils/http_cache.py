@@ -0,0 +1,77 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional, Sequence
+
+from fastapi import Request, Response
+
+from app.utils.wire import prefers_msgpack
+
+# Clients may keep responses but must revalidate them before each reuse
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(version: Sequence[Any]) -> str:
+    """Strong ETag for a resource version (any tuple of values that changes with it)."""
+    digest = hashlib.sha1(repr(tuple(version)).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def http_date(value: datetime) -> str:
+    # Stored timestamps are naive UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    candidates = (tag.strip() for tag in header.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _not_modified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def conditional_get(
+    request: Request,
+    response: Response,
+    version: Sequence[Any],
+    last_modified: Optional[datetime] = None
+) -> Optional[Response]:
+    """Handle conditional GET for a resource whose version is already known.
+
+    Sets ETag, Last-Modified and Cache-Control on ``response``. Returns a 304
+    response to send as-is when the client's copy is current, so callers can
+    skip loading and serializing the resource; otherwise returns None.
+    """
+    # Each wire format is its own representation, so it needs its own ETag
+    etag = make_etag((*version, prefers_msgpack(request)))
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, etag)
+    else:
+        # If-Modified-Since only counts when If-None-Match is absent
+        if_modified_since = request.headers.get("if-modified-since")
+        fresh = (
+            if_modified_since is not None
+            and last_modified is not None
+            and _not_modified_since(if_modified_since, last_modified)
+        )
+    if fresh:
+        return Response(status_code=304, headers=headers)
+    return None
@@ -0,0 +1,111 @@
+import codecs
+import csv
+import io
+import json
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+# (row number, parsed record or None, parse error or None)
+ImportRecord = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+_EXTENSIONS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+}
+
+_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    """Work out the upload format from its file extension or content type."""
+    name = (filename or "").lower()
+    for extension, fmt in _EXTENSIONS.items():
+        if name.endswith(extension):
+            return fmt
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in _CONTENT_TYPES:
+        return _CONTENT_TYPES[media_type]
+    raise HTTPException(
+        status_code=400,
+        detail="Could not determine upload format; pass format=csv or format=ndjson"
+    )
+
+
+def _text_stream(fileobj: BinaryIO) -> io.TextIOBase:
+    # utf-8-sig drops the BOM spreadsheet exports like to prepend
+    return codecs.getreader("utf-8-sig")(fileobj, errors="strict")
+
+
+def _blank_to_none(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        key.strip(): (value if value != "" else None)
+        for key, value in record.items()
+        if key is not None
+    }
+
+
+def iter_csv_records(fileobj: BinaryIO) -> Iterator[ImportRecord]:
+    """Lazily read a CSV upload with a header row, one record per data row.
+
+    Row numbers count the header as row 1 so they match what a spreadsheet shows.
+    Empty cells become None so optional fields fall back to their defaults.
+    """
+    reader = csv.DictReader(_text_stream(fileobj))
+    while True:
+        try:
+            record = next(reader)
+        except StopIteration:
+            return
+        except (csv.Error, UnicodeDecodeError) as e:
+            yield reader.line_num, None, str(e)
+            return
+        if None in record:
+            yield reader.line_num, None, "Row has more fields than the header"
+            continue
+        yield reader.line_num, _blank_to_none(record), None
+
+
+def iter_ndjson_records(fileobj: BinaryIO) -> Iterator[ImportRecord]:
+    """Lazily read a newline-delimited JSON upload, one object per line.
+
+    Blank lines are skipped but still counted, so row numbers are line numbers.
+    """
+    line_num = 0
+    try:
+        for line_num, line in enumerate(_text_stream(fileobj), start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_num, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_num, None, "Expected a JSON object"
+                continue
+            yield line_num, record, None
+    except UnicodeDecodeError as e:
+        yield line_num + 1, None, str(e)
+
+
+def iter_import_records(fileobj: BinaryIO, fmt: str) -> Iterator[ImportRecord]:
+    """Pick the record reader for an upload format."""
+    if fmt == "csv":
+        return iter_csv_records(fileobj)
+    return iter_ndjson_records(fileobj)
+
+
+def take(records: Iterator[ImportRecord], size: int) -> List[ImportRecord]:
+    """Pull the next ``size`` records off a reader."""
+    return list(islice(records, size))
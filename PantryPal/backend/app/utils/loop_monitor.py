@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.utils.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Loop lag buckets in milliseconds; the interesting range is well under the defaults
+LAG_BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Frames kept from the blocked loop thread's stack
+STACK_LIMIT = 25
+
+
+class LoopMonitor:
+    """Event loop lag and stall detector for this worker (opt-in).
+
+    A heartbeat coroutine sleeps for a fixed interval and records how late it
+    wakes up; that lateness is time the loop spent running something else
+    without yielding. A watchdog thread notices when the heartbeat stops
+    arriving and, while the loop is still blocked, captures the loop thread's
+    stack and the request route of the task that is running, so the blocking
+    call is caught in the act.
+    """
+
+    def __init__(self, interval_ms: float, threshold_ms: float):
+        self.interval = interval_ms / 1000
+        self.threshold_ms = threshold_ms
+        self.lag = Histogram(LAG_BUCKETS_MS)
+        self.stalls = 0
+        self.recent_stalls: deque = deque(maxlen=20)
+        # Request scope of each in-flight task, filled in by RouteTrackingMiddleware
+        self.task_scopes: Dict[asyncio.Task, dict] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0
+        self._current_stall: Optional[Dict[str, Any]] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat_task is not None
+
+    def start(self) -> None:
+        """Start monitoring the running loop; call from inside it."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat_task = self._loop.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self._stop.set()
+        self._heartbeat_task.cancel()
+        try:
+            await self._heartbeat_task
+        except asyncio.CancelledError:
+            pass
+        self._heartbeat_task = None
+        self._watchdog.join(timeout=1)
+        self._watchdog = None
+
+    async def _heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        expected = loop.time() + self.interval
+        while True:
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            lag_ms = max(now - expected, 0) * 1000
+            self.lag.observe(lag_ms)
+            self._last_beat = time.monotonic()
+            stall = self._current_stall
+            if stall is not None:
+                # The watchdog saw the stall start; now we know how long it was
+                stall["duration_ms"] = round(lag_ms, 1)
+                self._current_stall = None
+                logger.warning("Event loop stall in %s lasted %.0fms", stall["route"], lag_ms)
+            expected = now + self.interval
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval / 2):
+            blocked_ms = (time.monotonic() - self._last_beat - self.interval) * 1000
+            if blocked_ms >= self.threshold_ms and self._current_stall is None:
+                self._record_stall(blocked_ms)
+
+    def _record_stall(self, blocked_ms: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame, limit=STACK_LIMIT) if frame is not None else []
+        stall = {
+            "detected_at": time.time(),
+            "blocked_ms_at_detection": round(blocked_ms, 1),
+            "duration_ms": None,
+            "route": self._current_route(),
+            "stack": [line.rstrip() for line in stack],
+        }
+        self.stalls += 1
+        self.recent_stalls.append(stall)
+        self._current_stall = stall
+        logger.warning(
+            "Event loop blocked for %.0fms in %s; loop thread stack:\n%s",
+            blocked_ms, stall["route"], "".join(stack)
+        )
+
+    def _current_route(self) -> str:
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+        scope = self.task_scopes.get(task) if task is not None else None
+        if scope is None:
+            return "<no request>"
+        route = scope.get("route")
+        return f"{scope.get('method', '')} {getattr(route, 'path', None) or scope.get('path')}"
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.running,
+            "interval_ms": self.interval * 1000,
+            "stall_threshold_ms": self.threshold_ms,
+            "lag_ms": self.lag.snapshot(),
+            "stalls": self.stalls,
+            "recent_stalls": list(self.recent_stalls),
+        }
+
+
+class RouteTrackingMiddleware:
+    """ASGI middleware mapping the request task to its scope for stall reports.
+
+    Pure ASGI rather than BaseHTTPMiddleware so the endpoint runs in the same
+    task that is registered here.
+    """
+
+    def __init__(self, app, monitor: LoopMonitor):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        task = asyncio.current_task()
+        self.monitor.task_scopes[task] = scope
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.monitor.task_scopes.pop(task, None)
+
+
+loop_monitor = LoopMonitor(settings.LOOP_MONITOR_INTERVAL_MS, settings.LOOP_STALL_THRESHOLD_MS)
@@ -0,0 +1,68 @@
+import threading
+from typing import Dict, Optional, Sequence
+
+# Default latency buckets in milliseconds
+DEFAULT_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Small fixed-bucket latency histogram (milliseconds), safe to share across threads."""
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(sorted(buckets_ms))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            # One extra slot for observations above the last bucket
+            self._counts = [0] * (len(self.buckets_ms) + 1)
+            self._count = 0
+            self._sum = 0.0
+            self._max = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        index = len(self.buckets_ms)
+        for i, bound in enumerate(self.buckets_ms):
+            if value_ms <= bound:
+                index = i
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value_ms
+            if value_ms > self._max:
+                self._max = value_ms
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Approximate a percentile as the upper bound of the bucket it falls in."""
+        with self._lock:
+            if self._count == 0:
+                return None
+            target = self._count * pct / 100
+            seen = 0
+            for i, count in enumerate(self._counts):
+                seen += count
+                if seen >= target:
+                    if i < len(self.buckets_ms):
+                        return float(min(self.buckets_ms[i], self._max))
+                    return self._max
+            return self._max
+
+    def snapshot(self) -> Dict:
+        p50, p95, p99 = self.percentile(50), self.percentile(95), self.percentile(99)
+        with self._lock:
+            buckets = {
+                f"le_{bound}": count
+                for bound, count in zip(self.buckets_ms, self._counts)
+            }
+            buckets["le_inf"] = self._counts[-1]
+            return {
+                "count": self._count,
+                "sum_ms": round(self._sum, 3),
+                "max_ms": round(self._max, 3),
+                "p50_ms": p50,
+                "p95_ms": p95,
+                "p99_ms": p99,
+                "buckets": buckets,
+            }
@@ -0,0 +1,89 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+
+# Response header carrying the cursor for the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _from_json(value: Any, python_type: type) -> Any:
+    if value is None:
+        return None
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is UUID:
+        return UUID(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row into an opaque cursor."""
+    raw = json.dumps([_to_json(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> Tuple:
+    """Decode a cursor back into typed sort key values for ``columns``."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match sort key")
+        return tuple(
+            _from_json(value, column.type.python_type)
+            for value, column in zip(values, columns)
+        )
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def apply_keyset(
+    query,
+    columns: Sequence,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    descending: bool = False
+):
+    """Order ``query`` by ``columns`` and fetch one page (plus one row to detect more).
+
+    With a cursor the query seeks past the last seen key; otherwise ``skip``
+    is applied as an offset so existing callers keep working.
+    """
+    if cursor:
+        key = tuple_(*columns)
+        last = tuple_(*decode_cursor(cursor, columns))
+        query = query.where(key < last if descending else key > last)
+    elif skip:
+        query = query.offset(skip)
+    ordering = [column.desc() if descending else column.asc() for column in columns]
+    return query.order_by(*ordering).limit(limit + 1)
+
+
+def split_page(rows: Sequence, limit: int, key: Callable[[Any], Sequence]) -> Tuple[List, Optional[str]]:
+    """Trim the look-ahead row and build the cursor for the next page."""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(key(page[-1]))
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
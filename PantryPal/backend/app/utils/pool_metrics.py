@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.utils.metrics import Histogram
+
+
+class PoolMetrics:
+    """Connection pool counters for one engine in this worker process."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkout_wait = Histogram()
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.connections_opened = 0
+        self.connections_closed = 0
+        self.connections_invalidated = 0
+        self.engine = None
+
+    def incr(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def pool_class(self) -> type:
+        """Build a pool class bound to these metrics (survives pool.recreate())."""
+        return type(
+            "InstrumentedAsyncQueuePool",
+            (InstrumentedAsyncQueuePool,),
+            {"metrics": self},
+        )
+
+    def snapshot(self) -> Dict:
+        state = {}
+        if self.engine is not None:
+            # Read the live pool; engine.dispose() swaps in a new instance
+            pool = self.engine.sync_engine.pool
+            state = {
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                # QueuePool reports overflow relative to pool_size (negative when idle)
+                "overflow_in_use": max(pool.overflow(), 0),
+                "timeout_seconds": pool.timeout(),
+            }
+        with self._lock:
+            counters = {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "connections_opened": self.connections_opened,
+                "connections_closed": self.connections_closed,
+                "connections_invalidated": self.connections_invalidated,
+            }
+        return {
+            **state,
+            **counters,
+            "checkout_wait_ms": self.checkout_wait.snapshot(),
+        }
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long callers wait for a connection."""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.incr("checkout_timeouts")
+            raise
+        finally:
+            self.metrics.checkout_wait.observe((time.perf_counter() - start) * 1000)
+
+
+_registry: Dict[str, PoolMetrics] = {}
+
+
+def create_pool_metrics(name: str) -> PoolMetrics:
+    """Create (or replace) the metrics holder for a named engine."""
+    metrics = PoolMetrics(name)
+    _registry[name] = metrics
+    return metrics
+
+
+def instrument_engine(engine: AsyncEngine, metrics: PoolMetrics) -> None:
+    """Attach pool event listeners that feed connection churn counters."""
+    sync_engine = engine.sync_engine
+    metrics.engine = engine
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.incr("connections_opened")
+
+    @event.listens_for(sync_engine, "close")
+    def _on_close(dbapi_connection, connection_record):
+        metrics.incr("connections_closed")
+
+    @event.listens_for(sync_engine, "close_detached")
+    def _on_close_detached(dbapi_connection):
+        metrics.incr("connections_closed")
+
+    @event.listens_for(sync_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.incr("connections_invalidated")
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.incr("checkouts")
+
+
+def get_pool_stats() -> Dict:
+    """Snapshot of every instrumented pool in this worker."""
+    return {
+        "pid": os.getpid(),
+        "pools": {name: metrics.snapshot() for name, metrics in _registry.items()},
+    }
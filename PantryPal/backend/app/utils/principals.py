@@ -0,0 +1,43 @@
+from dataclasses import dataclass
+from uuid import UUID
+
+from app.config import settings
+from app.utils.cache import TTLCache
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as seen by request handlers.
+
+    A detached snapshot of the fields authorization needs, so it can be cached
+    across requests without holding on to a session-bound ``User``.
+    """
+    id: UUID
+    email: str
+    full_name: str
+    role: str
+    is_active: bool
+    token_version: int = 0
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        role = user.role.value if hasattr(user.role, "value") else user.role
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            role=role,
+            is_active=user.is_active,
+            token_version=user.token_version,
+        )
+
+
+# Authenticated principals keyed by user id (the token subject)
+principal_cache = TTLCache(
+    settings.PRINCIPAL_CACHE_TTL_SECONDS, settings.PRINCIPAL_CACHE_MAXSIZE
+)
+
+
+def invalidate_principal(user_id: UUID) -> None:
+    """Forget a cached principal after its user is changed or deleted."""
+    principal_cache.invalidate(user_id)
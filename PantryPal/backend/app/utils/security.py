@@ -1,12 +1,26 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
 from jose import jwt
 from passlib.context import CryptContext
 from app.config import settings
+from app.utils.metrics import Histogram
 
 # Password hashing configuration
-# Use pbkdf2_sha256 for development to avoid bcrypt native dependency issues
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# The configured scheme hashes new passwords; pbkdf2_sha256 is kept so existing
+# hashes still verify, and "auto" marks them for upgrade on the next login
+_rounds = (
+    {f"{settings.PASSWORD_HASH_SCHEME}__rounds": settings.PASSWORD_HASH_ROUNDS}
+    if settings.PASSWORD_HASH_ROUNDS else {}
+)
+pwd_context = CryptContext(
+    schemes=list(dict.fromkeys([settings.PASSWORD_HASH_SCHEME, "pbkdf2_sha256"])),
+    deprecated="auto",
+    **_rounds
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
@@ -16,6 +30,100 @@ def get_password_hash(password: str) -> str:
     """Generate password hash."""
     return pwd_context.hash(password)
 
+
+class PasswordHashPool:
+    """Bounded thread pool that keeps password hashing off the event loop.
+
+    The hash functions release the GIL, so threads hash in parallel. Calls
+    beyond ``max_pending`` (running plus queued) are refused with a 503 so a
+    login burst degrades into fast retries rather than a frozen server.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.durations = Histogram()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+
+    def _timed(self, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.durations.observe((time.perf_counter() - start) * 1000)
+
+    async def run(self, fn, *args):
+        # Only touched from the event loop thread, so no lock is needed
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent sign-ins, please retry",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._timed, fn, *args
+            )
+            self.completed += 1
+            return result
+        finally:
+            self.pending -= 1
+
+    def stats(self) -> dict:
+        return {
+            "scheme": settings.PASSWORD_HASH_SCHEME,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "duration_ms": self.durations.snapshot(),
+        }
+
+
+password_hash_pool = PasswordHashPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the hashing pool."""
+    return await password_hash_pool.run(pwd_context.hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool."""
+    return await password_hash_pool.run(pwd_context.verify, plain_password, hashed_password)
+
+async def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify a password on the hashing pool.
+
+    Also returns a replacement hash when the stored one uses an outdated
+    scheme or round count, else None.
+    """
+    return await password_hash_pool.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
+def token_claims(user, include_profile: bool = True) -> dict:
+    """Claims identifying ``user`` (a User or Principal) in a token.
+
+    Tokens always carry the user's token version so they can be revoked. In
+    stateless mode access tokens also carry what authorization needs, letting
+    requests skip the user lookup.
+    """
+    claims = {"sub": str(user.id), "ver": user.token_version}
+    if include_profile and settings.AUTH_STATELESS:
+        claims.update({
+            "role": user.role.value if hasattr(user.role, "value") else user.role,
+            "active": user.is_active,
+            "email": user.email,
+            "name": user.full_name,
+        })
+    return claims
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a new access token."""
     to_encode = data.copy()
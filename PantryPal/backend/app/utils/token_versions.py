@@ -0,0 +1,80 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class TokenVersionMap:
+    """In-memory user id -> token version map for stateless auth.
+
+    The whole map is reloaded at most once per refresh interval (one small
+    query per worker, however many requests arrive), so checking a token is a
+    dict lookup. Revocations made by this worker are applied immediately;
+    other workers pick them up on their next refresh.
+    """
+
+    def __init__(self):
+        self.versions: Dict[UUID, int] = {}
+        self.loaded_at: Optional[float] = None
+        self.available = False
+        self.refreshes = 0
+        self.failures = 0
+        self._lock = asyncio.Lock()
+
+    def is_stale(self) -> bool:
+        return (
+            self.loaded_at is None
+            or time.monotonic() - self.loaded_at >= settings.AUTH_TOKEN_VERSION_REFRESH_SECONDS
+        )
+
+    async def current(self) -> Optional[Dict[UUID, int]]:
+        """Return the version map, reloading it if stale; None if it cannot be loaded."""
+        if not self.is_stale():
+            return self.versions if self.available else None
+        async with self._lock:
+            if self.is_stale():
+                try:
+                    self.versions = await asyncio.wait_for(self._load(), timeout=2.0)
+                    self.available = True
+                    self.refreshes += 1
+                except Exception as exc:
+                    logger.warning("Token version refresh failed (%r), checking users in the database", exc)
+                    self.available = False
+                    self.failures += 1
+                self.loaded_at = time.monotonic()
+            return self.versions if self.available else None
+
+    async def _load(self) -> Dict[UUID, int]:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(User.id, User.token_version))
+            return {user_id: version for user_id, version in result.all()}
+
+    def bump(self, user_id: UUID, version: int) -> None:
+        """Record a revocation without waiting for a refresh; versions only move forward."""
+        if version > self.versions.get(user_id, version - 1):
+            self.versions[user_id] = version
+
+    def forget(self, user_id: UUID) -> None:
+        self.versions.pop(user_id, None)
+
+    def status(self) -> dict:
+        return {
+            "enabled": settings.AUTH_STATELESS,
+            "available": self.available,
+            "users": len(self.versions),
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "refresh_seconds": settings.AUTH_TOKEN_VERSION_REFRESH_SECONDS,
+        }
+
+
+token_versions = TokenVersionMap()
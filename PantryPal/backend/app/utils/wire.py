@@ -0,0 +1,160 @@
+import zlib
+from typing import Any, Callable, Coroutine
+
+import fastapi.routing
+import msgpack
+from fastapi import HTTPException, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+MSGPACK_MEDIA_TYPE = MSGPACK_MEDIA_TYPES[0]
+
+# Content-Encoding values accepted on request bodies, as zlib window sizes
+# (16 + 15 expects a gzip header, 15 a zlib one)
+_REQUEST_ENCODINGS = {
+    "gzip": 16 + zlib.MAX_WBITS,
+    "x-gzip": 16 + zlib.MAX_WBITS,
+    "deflate": zlib.MAX_WBITS,
+}
+
+
+def _quality(params: list) -> float:
+    for param in params:
+        name, _, value = param.partition("=")
+        if name.strip() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def prefers_msgpack(request: Request) -> bool:
+    """Whether the Accept header ranks MessagePack at least as high as JSON."""
+    accept = request.headers.get("accept")
+    if not accept or "msgpack" not in accept:
+        return False
+    msgpack_q = json_q = 0.0
+    for media_range in accept.split(","):
+        media_type, *params = media_range.split(";")
+        media_type = media_type.strip().lower()
+        if media_type in MSGPACK_MEDIA_TYPES:
+            msgpack_q = max(msgpack_q, _quality(params))
+        elif media_type in ("application/json", "application/*", "*/*"):
+            json_q = max(json_q, _quality(params))
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+
+def decompress_body(body: bytes, encoding: str) -> bytes:
+    """Inflate a gzip/deflate request body, refusing ones that inflate past the configured cap."""
+    wbits = _REQUEST_ENCODINGS.get(encoding.strip().lower())
+    if wbits is None:
+        raise HTTPException(status_code=415, detail=f"Unsupported Content-Encoding: {encoding}")
+    limit = settings.REQUEST_MAX_DECOMPRESSED_BYTES
+    inflater = zlib.decompressobj(wbits)
+    try:
+        data = inflater.decompress(body, limit + 1)
+    except zlib.error:
+        raise HTTPException(status_code=400, detail="Request body is not validly compressed")
+    if len(data) > limit:
+        raise HTTPException(status_code=413, detail="Decompressed request body is too large")
+    if not inflater.eof:
+        raise HTTPException(status_code=400, detail="Compressed request body is truncated")
+    return data
+
+
+class ResponseCompressionMiddleware:
+    """GZip middleware that leaves the given path prefixes uncompressed.
+
+    Only recent Starlette releases skip text/event-stream responses, and a
+    gzipped event stream is buffered by the compressor instead of reaching
+    the client event by event.
+    """
+
+    def __init__(self, app: ASGIApp, exclude_paths: tuple, **options: Any):
+        self.app = app
+        self.gzip = GZipMiddleware(app, **options)
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+        else:
+            await self.gzip(scope, receive, send)
+
+
+class WireRequest(Request):
+    """Request whose body is transparently inflated when sent with Content-Encoding."""
+
+    async def body(self) -> bytes:
+        if not hasattr(self, "_body"):
+            body = await super().body()
+            encoding = self.headers.get("content-encoding")
+            if body and encoding and encoding.lower() != "identity":
+                body = decompress_body(body, encoding)
+            self._body = body
+        return self._body
+
+
+class MsgpackResponse(Response):
+    """Packs JSON-compatible content (what FastAPI validated it to) as MessagePack."""
+
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content)
+
+
+def wire_response(request: Request, adapter: TypeAdapter, value: Any) -> Response:
+    """Encode an already validated value as JSON or MessagePack, per the Accept header.
+
+    For endpoints that build their own response; the rest get this from
+    WireFormatRoute.
+    """
+    if prefers_msgpack(request):
+        return MsgpackResponse(adapter.dump_python(value, mode="json"))
+    return Response(adapter.dump_json(value), media_type="application/json")
+
+
+class WireFormatRoute(APIRoute):
+    """Route class adding compact wire formats to a router.
+
+    Request bodies may be gzip/deflate compressed. Clients that send
+    ``Accept: application/msgpack`` get MessagePack instead of JSON, from a
+    second handler whose response class packs the validated payload directly,
+    so the response models are shared by both formats and JSON keeps
+    FastAPI's fast path. Response compression itself is left to the GZip
+    middleware.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        json_handler = super().get_route_handler()
+        # FastAPI builds the handlers of an included route from a per-inclusion
+        # copy of its settings, when it has one
+        context_var = getattr(fastapi.routing, "_effective_route_context_var", None)
+        context = context_var.get() if context_var is not None else None
+        route = context if context is not None and context.original_route is self else self
+        response_class, route.response_class = route.response_class, MsgpackResponse
+        try:
+            msgpack_handler = super().get_route_handler()
+        finally:
+            route.response_class = response_class
+
+        async def wire_format_handler(request: Request) -> Response:
+            handler = msgpack_handler if prefers_msgpack(request) else json_handler
+            response = await handler(WireRequest(request.scope, request.receive))
+            if (
+                response.media_type not in ("application/json", MSGPACK_MEDIA_TYPE)
+                and response.status_code != 304
+            ):
+                # Streams and other explicit responses do not depend on Accept
+                return response
+            response.headers.append("Vary", "Accept")
+            return response
+
+        return wire_format_handler
@@ -0,0 +1,60 @@
+"""Backfill the daily_discrepancies rollup from existing approved counts.
+
+Runs month by month (one transaction per month) so large histories do not
+hold a single long transaction. Safe to re-run: existing rows are updated.
+
+Usage:
+    python scripts/backfill_discrepancy_rollup.py [--start YYYY-MM-DD] [--end YYYY-MM-DD]
+"""
+import argparse
+from datetime import date, timedelta
+
+from sqlalchemy import func, select
+
+from app.database import SessionLocal
+from app.models.count import Count, CountStatus
+from app.models.discrepancy import DailyDiscrepancy
+
+
+def month_ranges(start: date, end: date):
+    """Yield (first_day, last_day) pairs covering start..end."""
+    current = start.replace(day=1)
+    while current <= end:
+        next_month = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        yield max(current, start), min(next_month - timedelta(days=1), end)
+        current = next_month
+
+
+def backfill(start: date = None, end: date = None):
+    db = SessionLocal()
+    try:
+        if start is None or end is None:
+            first, last = db.execute(
+                select(func.min(Count.count_date), func.max(Count.count_date))
+                .where(Count.status == CountStatus.APPROVED)
+            ).one()
+            if first is None:
+                print("No approved counts to backfill")
+                return
+            start = start or first
+            end = end or last
+
+        total = 0
+        for range_start, range_end in month_ranges(start, end):
+            result = db.execute(DailyDiscrepancy.populate_statement(
+                (Count.count_date >= range_start) & (Count.count_date <= range_end)
+            ))
+            db.commit()
+            total += result.rowcount
+            print(f"{range_start} - {range_end}: {result.rowcount} rows")
+        print(f"Backfilled {total} rollup rows")
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--start", type=date.fromisoformat, default=None)
+    parser.add_argument("--end", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+    backfill(args.start, args.end)
@@ -0,0 +1,141 @@
+"""Benchmark count approval against a real database.
+
+For each sheet size, approves one count on its own and counts the statements
+it issues, which should stay flat as the sheet grows. It then approves several
+counts that share the same items concurrently, which must all finish without
+deadlocks. Benchmark data is removed afterwards.
+
+Usage:
+    python scripts/benchmark_approval.py [--lines 100 1000 2000] [--concurrency 4]
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+from uuid import uuid4
+
+from sqlalchemy import delete, event, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.database import AsyncSessionLocal, engine
+from app.models.count import Count, CountStatus
+from app.models.item import Item, ItemCategory
+from app.models.user import User, UserRole
+from app.schemas.count import CountItemCreate
+from app.services import CountService
+
+
+async def create_items(user_id, prefix, n):
+    rows = [
+        {
+            "id": uuid4(),
+            "name": f"{prefix} {i:05d}",
+            "category": ItemCategory.OTHER,
+            "unit_of_measure": "piece",
+            "par_level": 10,
+            "current_quantity": 20,
+            "created_by": user_id,
+        }
+        for i in range(n)
+    ]
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(Item.__table__), rows)
+        await db.commit()
+    return [row["id"] for row in rows]
+
+
+async def create_submitted_count(user_id, item_ids, count_date, quantity):
+    async with AsyncSessionLocal() as db:
+        count = Count(count_date=count_date, created_by=user_id)
+        db.add(count)
+        await db.flush()
+        count_id = count.id
+        await CountService.upsert_count_items(db, count_id, [
+            CountItemCreate(item_id=item_id, actual_quantity=quantity)
+            for item_id in item_ids
+        ])
+        count = await Count.get_by_id(db, count_id)
+        count.submit()
+        await db.commit()
+    return count_id
+
+
+async def approve(count_id, reviewer_id):
+    async with AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        await CountService.approve_count(db, count_id, reviewer_id)
+        return time.perf_counter() - start
+
+
+async def run(sizes, concurrency):
+    async with AsyncSessionLocal() as db:
+        reviewer_id = (await db.execute(
+            select(User.id).where(User.role == UserRole.ADMIN).limit(1)
+        )).scalar_one_or_none()
+    if reviewer_id is None:
+        print("No admin user found; run scripts/seed_admin.py first")
+        return
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    prefix = f"bench-approval-{uuid4().hex[:8]}"
+    count_ids = []
+    item_ids = []
+    base_date = date.today() - timedelta(days=30000)
+    try:
+        for offset, size in enumerate(sizes):
+            ids = await create_items(reviewer_id, f"{prefix}-{size}", size)
+            item_ids.extend(ids)
+            count_id = await create_submitted_count(
+                reviewer_id, ids, base_date + timedelta(days=offset), 15
+            )
+            count_ids.append(count_id)
+
+            event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+            try:
+                elapsed = await approve(count_id, reviewer_id)
+            finally:
+                event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+            print(f"{size:>6} lines: {len(statements)} statements, {elapsed * 1000:.1f} ms")
+            statements.clear()
+
+        # Several reviewers approving counts over the same items at once
+        shared = item_ids[-sizes[-1]:]
+        concurrent_ids = [
+            await create_submitted_count(
+                reviewer_id, shared, base_date - timedelta(days=i + 1), i
+            )
+            for i in range(concurrency)
+        ]
+        count_ids.extend(concurrent_ids)
+        start = time.perf_counter()
+        timings = await asyncio.gather(*(approve(cid, reviewer_id) for cid in concurrent_ids))
+        wall = time.perf_counter() - start
+        print(
+            f"{concurrency} concurrent approvals of {len(shared)} shared lines: "
+            f"{wall * 1000:.1f} ms wall, slowest {max(timings) * 1000:.1f} ms"
+        )
+
+        async with AsyncSessionLocal() as db:
+            statuses = (await db.execute(
+                select(Count.status).where(Count.id.in_(concurrent_ids))
+            )).scalars().all()
+        assert all(status == CountStatus.APPROVED for status in statuses)
+    finally:
+        async with AsyncSessionLocal() as db:
+            # count_items and rollup rows cascade with their counts
+            await db.execute(delete(Count).where(Count.id.in_(count_ids)))
+            await db.execute(delete(Item).where(Item.id.in_(item_ids)))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, nargs="+", default=[100, 1000, 2000])
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run(args.lines, args.concurrency))
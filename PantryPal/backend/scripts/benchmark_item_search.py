@@ -0,0 +1,123 @@
+"""Benchmark item search latency on a large catalog against a real database.
+
+Seeds a synthetic catalog (100k items by default), then times
+ItemService.search_items for prefix, substring and misspelled terms and
+prints the plan of the fuzzy query. The seeded items are removed afterwards.
+
+Usage:
+    python scripts/benchmark_item_search.py [--items 100000] [--repeat 50] [--limit 20]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from uuid import uuid4
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.dialects.postgresql import insert
+
+from app.database import AsyncSessionLocal, engine
+from app.models.item import Item, ItemCategory
+from app.models.user import User, UserRole
+from app.services import ItemService
+
+WORDS = (
+    "tomato", "basil", "olive", "flour", "sugar", "butter", "cheddar", "salmon",
+    "chicken", "onion", "garlic", "pepper", "vanilla", "almond", "oat", "rice",
+    "lentil", "yogurt", "spinach", "mango", "lemon", "cocoa", "honey", "paprika",
+)
+FORMS = ("paste", "sauce", "whole", "sliced", "diced", "organic", "frozen", "dried", "fresh", "ground")
+
+# (label, term); the misspellings exercise the trigram path
+TERMS = (
+    ("prefix", "toma"),
+    ("prefix, short", "ch"),
+    ("word inside name", "sauce"),
+    ("misspelled", "tomatoe pasta"),
+    ("misspelled", "chedar"),
+    ("description", "imported"),
+)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def seed(user_id, prefix, n, batch=5000):
+    rng = random.Random(42)
+    categories = list(ItemCategory)
+    ids = []
+    async with AsyncSessionLocal() as db:
+        for start in range(0, n, batch):
+            rows = []
+            for i in range(start, min(start + batch, n)):
+                words = " ".join(rng.sample(WORDS, 2)).title()
+                rows.append({
+                    "id": uuid4(),
+                    "name": f"{words} {rng.choice(FORMS).title()} {prefix}-{i:06d}",
+                    "description": f"{rng.choice(('Imported', 'Local', 'House'))} {rng.choice(WORDS)}",
+                    "category": rng.choice(categories),
+                    "unit_of_measure": "piece",
+                    "par_level": 10,
+                    "current_quantity": 20,
+                    "created_by": user_id,
+                })
+            await db.execute(insert(Item.__table__), rows)
+            ids.extend(row["id"] for row in rows)
+        await db.commit()
+        await db.execute(text("ANALYZE items"))
+    return ids
+
+
+async def run(n_items, repeat, limit):
+    async with AsyncSessionLocal() as db:
+        user_id = (await db.execute(
+            select(User.id).where(User.role == UserRole.ADMIN).limit(1)
+        )).scalar_one_or_none()
+    if user_id is None:
+        print("No admin user found; run scripts/seed_admin.py first")
+        return
+
+    prefix = f"bench-search-{uuid4().hex[:8]}"
+    item_ids = []
+    try:
+        start = time.perf_counter()
+        item_ids = await seed(user_id, prefix, n_items)
+        print(f"seeded {n_items} items in {time.perf_counter() - start:.1f}s")
+
+        async with AsyncSessionLocal() as db:
+            for label, term in TERMS:
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    found = await ItemService.search_items(db, term, None, limit)
+                    timings.append((time.perf_counter() - start) * 1000)
+                top = found[0].name if found else "-"
+                print(
+                    f"{label:>18} {term!r:>16}: p50={statistics.median(timings):6.2f} ms "
+                    f"p95={percentile(timings, 95):6.2f} ms, {len(found)} hits, top: {top}"
+                )
+
+            plan = await db.execute(text(
+                "EXPLAIN ANALYZE SELECT id FROM items "
+                "WHERE :term <% name OR :term <% description "
+                "ORDER BY word_similarity(:term, name) DESC LIMIT :limit"
+            ), {"term": "tomatoe pasta", "limit": limit})
+            print("\n".join(row[0] for row in plan))
+    finally:
+        async with AsyncSessionLocal() as db:
+            for start in range(0, len(item_ids), 10000):
+                await db.execute(delete(Item).where(Item.id.in_(item_ids[start:start + 10000])))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.repeat, args.limit))
@@ -0,0 +1,84 @@
+"""Benchmark login throughput against a running API server.
+
+N simulated users log in repeatedly and at the same time. Meanwhile a
+probe hits the root endpoint to show whether other requests stay responsive
+while passwords are being hashed.
+
+Usage:
+    python scripts/benchmark_login.py [--base-url http://localhost:8000] [--users 50]
+        [--logins 5] [--email admin@pantrypal.local] [--password adminpassword]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def user_session(client, base_url, email, password, logins, latencies, statuses):
+    for _ in range(logins):
+        start = time.perf_counter()
+        resp = await client.post(
+            f"{base_url}/api/auth/login", data={"username": email, "password": password}
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+        statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+        if resp.status_code == 503:
+            await asyncio.sleep(float(resp.headers.get("Retry-After", "1")))
+
+
+async def probe(client, base_url, stop, latencies):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get(f"{base_url}/")
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.05)
+
+
+async def run(base_url, users, logins, email, password):
+    limits = httpx.Limits(max_connections=users + 1)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        login_latencies, probe_latencies, statuses = [], [], {}
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, base_url, stop, probe_latencies))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            user_session(client, base_url, email, password, logins, login_latencies, statuses)
+            for _ in range(users)
+        ))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await probe_task
+
+    ok = statuses.get(200, 0)
+    print(f"{users} users x {logins} logins in {elapsed:.2f}s: {ok / elapsed:.1f} successful logins/s")
+    print(f"status codes: {dict(sorted(statuses.items()))}")
+    print(
+        f"login latency ms: p50={percentile(login_latencies, 50):.1f} "
+        f"p95={percentile(login_latencies, 95):.1f} max={max(login_latencies):.1f}"
+    )
+    if probe_latencies:
+        print(
+            f"probe latency ms during burst: median={statistics.median(probe_latencies):.1f} "
+            f"p95={percentile(probe_latencies, 95):.1f} max={max(probe_latencies):.1f}"
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--logins", type=int, default=5)
+    parser.add_argument("--email", default="admin@pantrypal.local")
+    parser.add_argument("--password", default="adminpassword")
+    args = parser.parse_args()
+    asyncio.run(run(args.base_url, args.users, args.logins, args.email, args.password))
@@ -0,0 +1,67 @@
+"""Benchmark count payload size and encode time per wire format, without a database.
+
+Encodes one large count (CountRead with all its lines) the ways the counts
+router can send it:
+
+- json: FastAPI's fast path, validation plus pydantic-core's dump_json.
+- msgpack: the same validation, dumped to JSON-compatible Python and packed,
+  as WireFormatRoute does for Accept: application/msgpack.
+- Each of these again, gzipped as the GZip middleware would.
+
+Usage:
+    python scripts/benchmark_wire_format.py [--lines 3000] [--rounds 20] [--level 6]
+"""
+import argparse
+import gzip
+import time
+
+import msgpack
+from pydantic import TypeAdapter
+
+from benchmark_count_serialization import build_counts
+from app.schemas.count import CountRead
+
+count_adapter = TypeAdapter(CountRead)
+
+
+def encode_json(count):
+    return count_adapter.dump_json(count_adapter.validate_python(count))
+
+
+def encode_msgpack(count):
+    return msgpack.packb(count_adapter.dump_python(count_adapter.validate_python(count), mode="json"))
+
+
+def measure(encode, rounds):
+    body = encode()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        encode()
+    return body, (time.perf_counter() - start) / rounds * 1000
+
+
+def run(lines, rounds, level):
+    count = build_counts(1, lines)[0]
+    print(f"1 count x {lines} lines, {rounds} rounds, gzip level {level}")
+    baseline = None
+    for name, encode in (("json", encode_json), ("msgpack", encode_msgpack)):
+        for compressed in (False, True):
+            if compressed:
+                def encoder(encode=encode):
+                    return gzip.compress(encode(count), compresslevel=level)
+            else:
+                def encoder(encode=encode):
+                    return encode(count)
+            body, ms = measure(encoder, rounds)
+            baseline = baseline or len(body)
+            label = f"{name}+gzip" if compressed else name
+            print(f"{label:>12}: {len(body):9d} bytes ({len(body) / baseline:6.1%}), {ms:7.2f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=3000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--level", type=int, default=6)
+    args = parser.parse_args()
+    run(args.lines, args.rounds, args.level)
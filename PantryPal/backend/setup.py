@@ -6,7 +6,7 @@ setup(
     packages=find_packages(),
     install_requires=[
         "fastapi",
-        "sqlalchemy",
+        "sqlalchemy[asyncio]",
         "pydantic",
         "pydantic-settings",
         "python-jose[cryptography]",
@@ -14,6 +14,7 @@ setup(
         "python-multipart",
         "alembic",
         "psycopg2-binary",
+        "asyncpg",
         "email-validator",
     ]
 )
\ No newline at end of file
@@ -1,12 +1,14 @@
 import os
+from contextlib import contextmanager
+
 import pytest
 
 from fastapi.testclient import TestClient
 
 from app.main import app
 from app.config import settings
-from sqlalchemy import select
-from app.database import SessionLocal
+from sqlalchemy import event, select
+from app.database import SessionLocal, engine, replica_engine
 from app.models.user import User, UserRole
 from app.utils.security import get_password_hash
 
@@ -45,3 +47,36 @@ def admin_credentials():
     db.close()
 
     return {"username": email, "password": password}
+
+
+@pytest.fixture
+def query_budget():
+    """Fail if the statements executed inside the block exceed a declared budget.
+
+    Usage::
+
+        with query_budget(5) as statements:
+            client.get(...)
+    """
+    @contextmanager
+    def budget(max_queries: int):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engines = [e.sync_engine for e in (engine, replica_engine) if e is not None]
+        for sync_engine in engines:
+            event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            for sync_engine in engines:
+                event.remove(sync_engine, "before_cursor_execute", before_cursor_execute)
+
+        assert len(statements) <= max_queries, (
+            f"Expected at most {max_queries} queries, got {len(statements)}:\n"
+            + "\n---\n".join(statements)
+        )
+
+    return budget
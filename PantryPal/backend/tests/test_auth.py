@@ -1,4 +1,14 @@
+import asyncio
 import os
+import threading
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+
+from app.database import SessionLocal
+from app.models.user import User
+from app.utils.security import PasswordHashPool
 
 def test_root(client):
     resp = client.get("/")
@@ -22,3 +32,114 @@ def test_login_and_me(client, admin_credentials):
     assert me.status_code == 200, me.text
     me_data = me.json()
     assert me_data.get("email") == admin_credentials["username"]
+
+
+def test_me_served_from_principal_cache(client, admin_credentials, query_budget):
+    resp = client.post(
+        "/api/auth/login",
+        data={"username": admin_credentials["username"], "password": admin_credentials["password"]},
+    )
+    token = resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    client.get("/api/auth/me", headers=headers)
+    # The principal is cached after the first request, so no query is needed
+    with query_budget(0):
+        me = client.get("/api/auth/me", headers=headers)
+    assert me.status_code == 200
+
+    stats = client.get("/api/metrics/cache", headers=headers).json()["principals"]
+    assert stats["hits"] >= 1
+
+
+def test_role_change_revokes_tokens(client, admin_credentials):
+    resp = client.post(
+        "/api/auth/login",
+        data={"username": admin_credentials["username"], "password": admin_credentials["password"]},
+    )
+    admin_headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+    email = f"revoke_{os.urandom(4).hex()}@example.com"
+    password = "Revoke1234"
+    resp = client.post(
+        "/api/users",
+        headers=admin_headers,
+        json={"email": email, "password": password, "full_name": "Revoke Me", "role": "staff"},
+    )
+    assert resp.status_code == 200
+    user_id = resp.json()["id"]
+
+    resp = client.post("/api/auth/login", data={"username": email, "password": password})
+    user_headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    assert client.get("/api/auth/me", headers=user_headers).status_code == 200
+
+    # Same password, new role: the old token stops working
+    resp = client.put(
+        f"/api/users/{user_id}",
+        headers=admin_headers,
+        json={"email": email, "password": password, "full_name": "Revoke Me", "role": "counter"},
+    )
+    assert resp.status_code == 200
+    assert client.get("/api/auth/me", headers=user_headers).status_code == 401
+
+    resp = client.post("/api/auth/login", data={"username": email, "password": password})
+    user_headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    me = client.get("/api/auth/me", headers=user_headers)
+    assert me.status_code == 200
+    assert me.json()["role"] == "counter"
+
+    client.delete(f"/api/users/{user_id}", headers=admin_headers)
+
+
+def test_token_newer_than_cached_principal(client, admin_credentials):
+    """A token issued after a revocation elsewhere is accepted, the old one is not."""
+    resp = client.post(
+        "/api/auth/login",
+        data={"username": admin_credentials["username"], "password": admin_credentials["password"]},
+    )
+    admin_headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+    email = f"stale_{os.urandom(4).hex()}@example.com"
+    password = "Stale1234"
+    resp = client.post(
+        "/api/users",
+        headers=admin_headers,
+        json={"email": email, "password": password, "full_name": "Stale Cache", "role": "staff"},
+    )
+    user_id = resp.json()["id"]
+    resp = client.post("/api/auth/login", data={"username": email, "password": password})
+    old_headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    # Caches the principal at the current version
+    assert client.get("/api/auth/me", headers=old_headers).status_code == 200
+
+    # Revoke as another worker would: this worker's caches are not told
+    with SessionLocal() as db:
+        db.execute(update(User).where(User.email == email).values(token_version=User.token_version + 1))
+        db.commit()
+
+    resp = client.post("/api/auth/login", data={"username": email, "password": password})
+    new_headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    assert client.get("/api/auth/me", headers=new_headers).status_code == 200
+    assert client.get("/api/auth/me", headers=old_headers).status_code == 401
+
+    client.delete(f"/api/users/{user_id}", headers=admin_headers)
+
+
+def test_password_hash_pool_rejects_when_full():
+    pool = PasswordHashPool(workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.create_task(pool.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+        with pytest.raises(HTTPException) as exc:
+            await pool.run(lambda: None)
+        release.set()
+        await blocked
+        return exc.value
+
+    error = asyncio.run(scenario())
+    assert error.status_code == 503
+    assert pool.rejected == 1
+    assert pool.completed == 1
+    assert pool.pending == 0
@@ -0,0 +1,337 @@
+import gzip
+import json
+import random
+import time
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+from uuid import UUID, uuid4
+
+import msgpack
+import pytest
+from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.utils.events import event_broker
+from app.utils.wire import WireFormatRoute, decompress_body
+
+def login(client, credentials):
+    resp = client.post(
+        "/api/auth/login",
+        data={"username": credentials["username"], "password": credentials["password"]},
+    )
+    assert resp.status_code == 200
+    return resp.json()["access_token"]
+
+def create_draft_count(client, headers):
+    """Create a draft count on a random past date so reruns do not collide."""
+    count_date = date.today() - timedelta(days=random.randint(1000, 20000))
+    resp = client.post("/api/counts", headers=headers, json={"count_date": str(count_date)})
+    assert resp.status_code == 200
+    return resp.json()
+
+def import_items(client, headers, count):
+    """Create ``count`` items through the bulk import and return their ids."""
+    prefix = f"Count Sheet {datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+    body = "".join(
+        f'{{"name": "{prefix} {i}", "category": "Other", "unit_of_measure": "piece",'
+        f' "par_level": 5, "current_quantity": 10}}\n'
+        for i in range(count)
+    )
+    resp = client.post(
+        "/api/items/import",
+        headers=headers,
+        files={"file": ("items.ndjson", body.encode(), "application/x-ndjson")}
+    )
+    assert resp.status_code == 200
+    assert resp.json()["created"] == count
+
+    ids = []
+    cursor = None
+    while True:
+        params = {"limit": 100}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get("/api/items", headers=headers, params=params)
+        ids.extend(i["id"] for i in resp.json() if i["name"].startswith(prefix))
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids
+
+def test_bulk_items_upsert(client, admin_credentials, query_budget):
+    """Bulk lines are written in one statement and re-posting updates them in place."""
+    token = login(client, admin_credentials)
+    headers = {"Authorization": f"Bearer {token}"}
+    item_ids = import_items(client, headers, 50)
+    count = create_draft_count(client, headers)
+
+    lines = [{"item_id": item_id, "actual_quantity": 7} for item_id in item_ids]
+    # A repeated item collapses to its last line
+    lines.append({"item_id": item_ids[0], "actual_quantity": 12, "notes": "recount"})
+
+    # user lookup + count lookup + upsert + reload count with its items
+    with query_budget(5):
+        resp = client.post(f"/api/counts/{count['id']}/bulk-items", headers=headers, json=lines)
+    assert resp.status_code == 200
+    by_item = {line["item_id"]: line for line in resp.json()["count_items"]}
+    assert len(by_item) == len(item_ids)
+    assert by_item[item_ids[0]]["actual_quantity"] == 12
+    assert by_item[item_ids[0]]["discrepancy"] == 2
+    assert by_item[item_ids[1]]["discrepancy"] == -3
+
+    resp = client.post(
+        f"/api/counts/{count['id']}/bulk-items",
+        headers=headers,
+        json=[{"item_id": item_ids[1], "actual_quantity": 10}]
+    )
+    assert resp.status_code == 200
+    by_item = {line["item_id"]: line for line in resp.json()["count_items"]}
+    assert len(by_item) == len(item_ids)
+    assert by_item[item_ids[1]]["discrepancy"] == 0
+    assert by_item[item_ids[0]]["notes"] == "recount"
+
+def test_bulk_items_unknown_item(client, admin_credentials):
+    """An unknown item rejects the whole batch."""
+    token = login(client, admin_credentials)
+    headers = {"Authorization": f"Bearer {token}"}
+    item_ids = import_items(client, headers, 1)
+    count = create_draft_count(client, headers)
+
+    resp = client.post(
+        f"/api/counts/{count['id']}/bulk-items",
+        headers=headers,
+        json=[
+            {"item_id": item_ids[0], "actual_quantity": 1},
+            {"item_id": str(uuid4()), "actual_quantity": 1},
+        ]
+    )
+    assert resp.status_code == 404
+
+    resp = client.get(f"/api/counts/{count['id']}", headers=headers)
+    assert resp.json()["count_items"] == []
+
+def test_approval_constant_statements(client, admin_credentials, query_budget):
+    """Approving applies quantities in the same number of statements for any sheet size."""
+    token = login(client, admin_credentials)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    issued = []
+    for size in (5, 50):
+        item_ids = import_items(client, headers, size)
+        count = create_draft_count(client, headers)
+        lines = [{"item_id": item_id, "actual_quantity": 4} for item_id in item_ids]
+        client.post(f"/api/counts/{count['id']}/bulk-items", headers=headers, json=lines)
+        client.post(f"/api/counts/{count['id']}/submit", headers=headers, json={})
+
+        with query_budget(8) as statements:
+            resp = client.post(
+                f"/api/counts/{count['id']}/review", headers=headers, json={"approved": True}
+            )
+        assert resp.status_code == 200
+        assert resp.json()["status"] == "approved"
+        issued.append(len(statements))
+
+        resp = client.get(f"/api/items/{item_ids[-1]}", headers=headers)
+        assert resp.json()["current_quantity"] == 4
+
+    assert issued[0] == issued[1]
+
+def test_list_counts_projections(client, admin_credentials, query_budget):
+    """Lists return line totals from SQL by default and lines with include=items."""
+    token = login(client, admin_credentials)
+    headers = {"Authorization": f"Bearer {token}"}
+    item_ids = import_items(client, headers, 3)
+    count = create_draft_count(client, headers)
+    lines = [{"item_id": item_id, "actual_quantity": 1} for item_id in item_ids]
+    client.post(f"/api/counts/{count['id']}/bulk-items", headers=headers, json=lines)
+
+    # user lookup + counts with creator names and line aggregates
+    with query_budget(2):
+        resp = client.get("/api/counts/drafts", headers=headers, params={"limit": 100})
+    assert resp.status_code == 200
+    summary = next(c for c in resp.json() if c["id"] == count["id"])
+    assert "count_items" not in summary
+    assert summary["items_count"] == 3
+    assert summary["total_abs_discrepancy"] == 27
+    assert summary["significant_discrepancy_count"] == 3
+
+    # ... + one selectin query for the lines of the whole page
+    with query_budget(3):
+        resp = client.get(
+            "/api/counts/drafts", headers=headers, params={"limit": 100, "include": "items"}
+        )
+    assert resp.status_code == 200
+    full = next(c for c in resp.json() if c["id"] == count["id"])
+    assert len(full["count_items"]) == 3
+    assert all(line["has_significant_discrepancy"] for line in full["count_items"])
+
+    resp = client.get("/api/counts", headers=headers)
+    assert resp.status_code == 200
+    assert all(listed["created_by_name"] for listed in resp.json())
+
+def test_get_count_conditional_get(client, admin_credentials, query_budget):
+    """A count's ETag changes when its lines change, not otherwise."""
+    token = login(client, admin_credentials)
+    headers = {"Authorization": f"Bearer {token}"}
+    item_ids = import_items(client, headers, 2)
+    count = create_draft_count(client, headers)
+
+    resp = client.get(f"/api/counts/{count['id']}", headers=headers)
+    etag = resp.headers["ETag"]
+
+    # Version check only; the count and its lines are not loaded
+    with query_budget(1):
+        resp = client.get(f"/api/counts/{count['id']}", headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 304
+
+    client.post(
+        f"/api/counts/{count['id']}/bulk-items",
+        headers=headers,
+        json=[{"item_id": item_ids[0], "actual_quantity": 3}]
+    )
+    resp = client.get(f"/api/counts/{count['id']}", headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 200
+    assert len(resp.json()["count_items"]) == 1
+    assert resp.headers["ETag"] != etag
+
+def test_bulk_items_gzip_and_msgpack(client, admin_credentials):
+    """Bulk uploads may be gzipped, and counts can be read back as MessagePack."""
+    token = login(client, admin_credentials)
+    headers = {"Authorization": f"Bearer {token}"}
+    item_ids = import_items(client, headers, 20)
+    count = create_draft_count(client, headers)
+
+    lines = [{"item_id": item_id, "actual_quantity": 2} for item_id in item_ids]
+    resp = client.post(
+        f"/api/counts/{count['id']}/bulk-items",
+        headers={**headers, "Content-Type": "application/json", "Content-Encoding": "gzip"},
+        content=gzip.compress(json.dumps(lines).encode())
+    )
+    assert resp.status_code == 200
+    assert len(resp.json()["count_items"]) == 20
+
+    resp = client.get(
+        f"/api/counts/{count['id']}",
+        headers={**headers, "Accept": "application/msgpack"}
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/msgpack"
+    assert "Accept" in resp.headers["vary"]
+    packed = msgpack.unpackb(resp.content)
+    assert packed == client.get(f"/api/counts/{count['id']}", headers=headers).json()
+
+    resp = client.get("/api/counts/drafts", headers={**headers, "Accept": "application/msgpack"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(resp.content) == client.get("/api/counts/drafts", headers=headers).json()
+
+def test_decompress_body_limits(monkeypatch):
+    body = json.dumps([{"actual_quantity": 1}] * 1000).encode()
+    assert decompress_body(gzip.compress(body), "gzip") == body
+
+    monkeypatch.setattr("app.utils.wire.settings.REQUEST_MAX_DECOMPRESSED_BYTES", 1000)
+    with pytest.raises(HTTPException) as exc:
+        decompress_body(gzip.compress(body), "gzip")
+    assert exc.value.status_code == 413
+    with pytest.raises(HTTPException) as exc:
+        decompress_body(gzip.compress(body)[:20], "gzip")
+    assert exc.value.status_code == 400
+
+def test_msgpack_packs_validated_payload():
+    """MessagePack responses go through the response model, without a JSON round trip."""
+    class Stored(BaseModel):
+        id: UUID
+        counted_at: datetime
+        notes: str = "internal"
+
+    class Public(BaseModel):
+        id: UUID
+        counted_at: datetime
+
+    router = APIRouter(route_class=WireFormatRoute)
+
+    @router.get("/line", response_model=Public)
+    async def read_line():
+        return Stored(id=UUID(int=1), counted_at=datetime(2026, 1, 2, 3, 4))
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    with TestClient(app) as client, patch("json.loads", side_effect=AssertionError):
+        resp = client.get("/api/line", headers={"Accept": "application/msgpack"})
+        assert resp.headers["content-type"] == "application/msgpack"
+        assert resp.headers["vary"] == "Accept"
+        assert msgpack.unpackb(resp.content) == {
+            "id": str(UUID(int=1)), "counted_at": "2026-01-02T03:04:00"
+        }
+        resp = client.get("/api/line")
+        assert resp.headers["content-type"] == "application/json"
+        assert resp.content == b'{"id":"%s","counted_at":"2026-01-02T03:04:00"}' % str(UUID(int=1)).encode()
+
+def test_count_line_edits_batch(client, admin_credentials, query_budget):
+    """Queued offline edits apply in one request, the last edit per item winning."""
+    token = login(client, admin_credentials)
+    headers = {"Authorization": f"Bearer {token}"}
+    item_ids = import_items(client, headers, 3)
+    count = create_draft_count(client, headers)
+    client.post(
+        f"/api/counts/{count['id']}/bulk-items",
+        headers=headers,
+        json=[{"item_id": item_id, "actual_quantity": 1} for item_id in item_ids]
+    )
+
+    edits = [
+        {"item_id": item_ids[0], "actual_quantity": 4},
+        {"item_id": item_ids[1], "remove": True},
+        {"item_id": item_ids[0], "actual_quantity": 6, "notes": "recount"},
+        {"item_id": item_ids[2], "remove": True},
+        {"item_id": item_ids[2], "actual_quantity": 9},
+    ]
+    # user lookup + count lookup + delete + upsert + reload count with its items
+    with query_budget(6):
+        resp = client.post(
+            f"/api/counts/{count['id']}/line-edits", headers=headers, json={"edits": edits}
+        )
+    assert resp.status_code == 200
+    by_item = {line["item_id"]: line for line in resp.json()["count_items"]}
+    assert set(by_item) == {item_ids[0], item_ids[2]}
+    assert by_item[item_ids[0]]["actual_quantity"] == 6
+    assert by_item[item_ids[2]]["actual_quantity"] == 9
+
+    resp = client.post(
+        f"/api/counts/{count['id']}/line-edits",
+        headers=headers,
+        json={"edits": [{"item_id": item_ids[0]}]}
+    )
+    assert resp.status_code == 422
+
+def test_submit_count_pushes_event(client, admin_credentials):
+    """Submitting through the API reaches push subscribers (via LISTEN/NOTIFY when running)."""
+    token = login(client, admin_credentials)
+    headers = {"Authorization": f"Bearer {token}"}
+    item_ids = import_items(client, headers, 1)
+    count = create_draft_count(client, headers)
+    client.post(
+        f"/api/counts/{count['id']}/bulk-items",
+        headers=headers,
+        json=[{"item_id": item_ids[0], "actual_quantity": 3}]
+    )
+
+    with event_broker.subscribe() as subscription:
+        resp = client.post(f"/api/counts/{count['id']}/submit", headers=headers, json={})
+        assert resp.status_code == 200
+
+        # Delivery is asynchronous: the event makes a round trip through Postgres
+        events = []
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            while not subscription.queue.empty():
+                events.append(json.loads(subscription.queue.get_nowait()))
+            if any(event["type"] == "count.submitted" for event in events):
+                break
+            time.sleep(0.05)
+
+    submitted = [event for event in events if event["type"] == "count.submitted"]
+    assert submitted == [{
+        "type": "count.submitted",
+        "data": {"id": count["id"], "status": "submitted", "created_by": count["created_by"]},
+    }]
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import time
+from datetime import timedelta
+from uuid import uuid4
+
+from app.routers.events import event_filter, event_stream
+from app.utils.events import RESYNC_EVENT, EventBroker
+from app.utils.principals import Principal
+from app.utils.security import create_access_token
+
+
+def make_principal(role):
+    return Principal(
+        id=uuid4(), email=f"{role}@example.com", full_name=role.title(),
+        role=role, is_active=True, token_version=0
+    )
+
+
+def drain(subscription):
+    events = []
+    while not subscription.queue.empty():
+        events.append(json.loads(subscription.queue.get_nowait()))
+    return events
+
+
+def test_event_fanout_filters_by_role():
+    """Counters and above get every event, staff only events on their own counts and the catalog."""
+    async def scenario():
+        broker = EventBroker("test_events", queue_size=10)
+        counter, staff = make_principal("counter"), make_principal("staff")
+        with broker.subscribe(event_filter(counter)) as all_events, \
+                broker.subscribe(event_filter(staff)) as own_events:
+            broker.publish("count.submitted", {"id": uuid4(), "created_by": uuid4()})
+            broker.publish("count.submitted", {"id": uuid4(), "created_by": staff.id})
+            broker.publish("item.changed", {"id": uuid4()})
+            assert len(broker.subscribers) == 2
+            return drain(all_events), drain(own_events), broker
+
+    all_events, own_events, broker = asyncio.run(scenario())
+    assert [event["type"] for event in all_events] == ["count.submitted", "count.submitted", "item.changed"]
+    assert [event["type"] for event in own_events] == ["count.submitted", "item.changed"]
+    assert not broker.subscribers
+
+
+def test_event_subscriber_overflow_resyncs():
+    """A client that falls a full queue behind gets one resync event instead of its backlog."""
+    async def scenario():
+        broker = EventBroker("test_events", queue_size=3)
+        with broker.subscribe() as subscription:
+            for _ in range(5):
+                broker.publish("item.changed", {"id": uuid4()})
+            return drain(subscription), broker.status()
+
+    events, status = asyncio.run(scenario())
+    assert [event["type"] for event in events] == [RESYNC_EVENT, "item.changed"]
+    assert status["published"] == 5
+    assert status["overflows"] == 1
+
+
+def test_event_stream_format_and_expiry():
+    """Events go out as SSE data lines and the stream ends when the token expires."""
+    async def scenario():
+        broker = EventBroker("test_events", queue_size=10)
+        with broker.subscribe() as subscription:
+            broker.publish("item.deleted", {"id": "abc"})
+            return [chunk async for chunk in event_stream(subscription, time.time() + 0.2)]
+
+    chunks = asyncio.run(scenario())
+    assert chunks[0].startswith("retry: ")
+    assert json.loads(chunks[1].removeprefix("data: ")) == {"type": "item.deleted", "data": {"id": "abc"}}
+    assert all(chunk.endswith("\n\n") for chunk in chunks)
+
+
+def test_stream_events_requires_token(client):
+    resp = client.get("/api/events")
+    assert resp.status_code == 401
+
+    resp = client.get("/api/events", params={"token": "not-a-token"})
+    assert resp.status_code == 401
+
+
+def test_stream_events_not_compressed(client, monkeypatch):
+    """The event stream skips the GZip middleware, which would hold events back."""
+    principal = make_principal("admin")
+
+    async def authenticate(token):
+        return principal
+
+    monkeypatch.setattr("app.routers.events.authenticate_token", authenticate)
+    token = create_access_token({"sub": str(principal.id)}, timedelta(seconds=1))
+    resp = client.get("/api/events", params={"token": token}, headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    assert "content-encoding" not in resp.headers
+    assert resp.text.startswith("retry: ")
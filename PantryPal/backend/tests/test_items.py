@@ -1,6 +1,9 @@
 import pytest
 from datetime import datetime
-from app.models.item import ItemCategory
+from uuid import UUID
+from sqlalchemy import update
+from app.database import SessionLocal
+from app.models.item import Item, ItemCategory
 
 def get_unique_name(base_name: str) -> str:
     """Generate a unique item name using timestamp."""
@@ -195,4 +198,375 @@ def test_low_stock_items(client, admin_credentials):
     low_stock = resp.json()
     assert isinstance(low_stock, list)
     assert any('Low Stock Item' in item["name"] for item in low_stock)
-    assert not any('Good Stock Item' in item["name"] for item in low_stock)
\ No newline at end of file
+    assert not any('Good Stock Item' in item["name"] for item in low_stock)
+
+
+def test_list_items_cursor_pagination(client, admin_credentials):
+    """Cursor pages follow on from each other without overlap."""
+    resp = client.post(
+        "/api/auth/login",
+        data={"username": admin_credentials["username"], "password": admin_credentials["password"]},
+    )
+    token = resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for base_name in ("Paging Item A", "Paging Item B", "Paging Item C"):
+        resp = client.post(
+            "/api/items",
+            headers=headers,
+            json={
+                "name": get_unique_name(base_name),
+                "category": ItemCategory.OTHER.value,
+                "unit_of_measure": "piece",
+                "par_level": 1,
+                "current_quantity": 1
+            }
+        )
+        assert resp.status_code == 200
+
+    first = client.get("/api/items", headers=headers, params={"limit": 2})
+    assert first.status_code == 200
+    assert len(first.json()) == 2
+    cursor = first.headers.get("X-Next-Cursor")
+    assert cursor
+
+    second = client.get("/api/items", headers=headers, params={"limit": 2, "cursor": cursor})
+    assert second.status_code == 200
+    first_ids = {item["id"] for item in first.json()}
+    assert not first_ids & {item["id"] for item in second.json()}
+    # Pages are ordered by name
+    names = [item["name"] for item in first.json() + second.json()]
+    assert names == sorted(names)
+
+    # Offset callers still work and match the cursor page
+    offset = client.get("/api/items", headers=headers, params={"limit": 2, "skip": 2})
+    assert [i["id"] for i in offset.json()] == [i["id"] for i in second.json()]
+
+def test_list_items_invalid_cursor(client, admin_credentials):
+    resp = client.post(
+        "/api/auth/login",
+        data={"username": admin_credentials["username"], "password": admin_credentials["password"]},
+    )
+    token = resp.json()["access_token"]
+    resp = client.get(
+        "/api/items",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"cursor": "not-a-cursor"}
+    )
+    assert resp.status_code == 400
+
+def test_import_items_csv(client, admin_credentials):
+    """Test bulk import creates new items, updates existing names and reports bad rows."""
+    resp = client.post(
+        "/api/auth/login",
+        data={"username": admin_credentials["username"], "password": admin_credentials["password"]},
+    )
+    token = resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    existing = get_unique_name("Import Existing")
+    resp = client.post(
+        "/api/items",
+        headers=headers,
+        json={
+            "name": existing,
+            "category": ItemCategory.DAIRY.value,
+            "unit_of_measure": "l",
+            "par_level": 2,
+            "current_quantity": 1
+        }
+    )
+    assert resp.status_code == 200
+    item_id = resp.json()["id"]
+
+    new_name = get_unique_name("Import New")
+    csv_body = (
+        "name,description,category,unit_of_measure,par_level,current_quantity\n"
+        f"{new_name},,Produce,kg,5,2\n"
+        f"{existing},Restocked,Dairy,l,2,8\n"
+        "Broken,,Not A Category,kg,0,1\n"
+    )
+    resp = client.post(
+        "/api/items/import",
+        headers=headers,
+        files={"file": ("items.csv", csv_body.encode(), "text/csv")}
+    )
+    assert resp.status_code == 200
+    report = resp.json()
+    assert report["total_rows"] == 3
+    assert report["created"] == 1
+    assert report["updated"] == 1
+    assert report["failed"] == 1
+    assert report["errors"][0]["row"] == 4
+    assert len(report["errors"][0]["errors"]) == 2
+
+    resp = client.get(f"/api/items/{item_id}", headers=headers)
+    assert resp.json()["current_quantity"] == 8
+    assert resp.json()["description"] == "Restocked"
+
+def test_import_items_unknown_format(client, admin_credentials):
+    resp = client.post(
+        "/api/auth/login",
+        data={"username": admin_credentials["username"], "password": admin_credentials["password"]},
+    )
+    token = resp.json()["access_token"]
+    resp = client.post(
+        "/api/items/import",
+        headers={"Authorization": f"Bearer {token}"},
+        files={"file": ("items.xlsx", b"binary", "application/octet-stream")}
+    )
+    assert resp.status_code == 400
+
+def test_adjust_item_records_movements(client, admin_credentials):
+    """Quantity changes are applied in place and appended to the item's ledger."""
+    resp = client.post(
+        "/api/auth/login",
+        data={"username": admin_credentials["username"], "password": admin_credentials["password"]},
+    )
+    token = resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    resp = client.post(
+        "/api/items",
+        headers=headers,
+        json={
+            "name": get_unique_name("Ledger Item"),
+            "category": ItemCategory.DRY_GOODS.value,
+            "unit_of_measure": "bag",
+            "par_level": 5,
+            "current_quantity": 10
+        }
+    )
+    item_id = resp.json()["id"]
+
+    resp = client.post(f"/api/items/{item_id}/adjust", headers=headers, json={"delta": -3, "notes": "spoiled"})
+    assert resp.status_code == 200
+    assert resp.json()["current_quantity"] == 7
+
+    resp = client.put(f"/api/items/{item_id}", headers=headers, json={"current_quantity": 12})
+    assert resp.status_code == 200
+    assert resp.json()["current_quantity"] == 12
+
+    resp = client.get(f"/api/items/{item_id}/movements", headers=headers)
+    assert resp.status_code == 200
+    movements = resp.json()
+    assert [(m["reason"], m["delta"], m["quantity_after"]) for m in movements] == [
+        ("manual", 5, 12),
+        ("adjustment", -3, 7),
+    ]
+    assert movements[1]["notes"] == "spoiled"
+
+    resp = client.post(
+        "/api/items/00000000-0000-0000-0000-000000000000/adjust", headers=headers, json={"delta": 1}
+    )
+    assert resp.status_code == 404
+
+def test_list_items_conditional_get(client, admin_credentials, query_budget):
+    """Polling with If-None-Match costs a version check until the catalog changes."""
+    resp = client.post(
+        "/api/auth/login",
+        data={"username": admin_credentials["username"], "password": admin_credentials["password"]},
+    )
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+    resp = client.get("/api/items", headers=headers)
+    assert resp.status_code == 200
+    etag = resp.headers["ETag"]
+    assert resp.headers["Last-Modified"]
+
+    # Only the catalog version query runs (the principal is cached)
+    with query_budget(1):
+        resp = client.get("/api/items", headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == etag
+    assert resp.content == b""
+
+    resp = client.post("/api/items", headers=headers, json={
+        "name": get_unique_name("ETag Item"),
+        "category": ItemCategory.OTHER.value,
+        "unit_of_measure": "piece",
+        "par_level": 1,
+        "current_quantity": 1
+    })
+    assert resp.status_code == 200
+
+    item_id = resp.json()["id"]
+
+    resp = client.get("/api/items", headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+    etag = resp.headers["ETag"]
+
+    # Deletes move the version too, through the tombstone
+    assert client.delete(f"/api/items/{item_id}", headers=headers).status_code == 200
+    resp = client.get("/api/items", headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 200
+    etag = resp.headers["ETag"]
+
+    # Writes committed while an older transaction runs wait for it to finish
+    with SessionLocal() as slow:
+        slow.execute(update(Item).where(Item.name.like("ETag Item%")).values(par_level=2))
+        resp = client.post("/api/items", headers=headers, json={
+            "name": get_unique_name("ETag Item"),
+            "category": ItemCategory.OTHER.value,
+            "unit_of_measure": "piece",
+            "par_level": 1,
+            "current_quantity": 1
+        })
+        resp = client.get("/api/items", headers={**headers, "If-None-Match": etag})
+        assert resp.status_code == 304
+        slow.commit()
+    resp = client.get("/api/items", headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 200
+
+def test_search_items(client, admin_credentials):
+    """Search finds items by prefix, misspelling and category, best match first."""
+    resp = client.post(
+        "/api/auth/login",
+        data={"username": admin_credentials["username"], "password": admin_credentials["password"]},
+    )
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    name = get_unique_name("Zanzibar Clove Powder")
+    resp = client.post("/api/items", headers=headers, json={
+        "name": name,
+        "description": "Whole spice, ground in house",
+        "category": ItemCategory.DRY_GOODS.value,
+        "unit_of_measure": "kg",
+        "par_level": 1,
+        "current_quantity": 1
+    })
+    assert resp.status_code == 200
+    item_id = resp.json()["id"]
+
+    resp = client.get("/api/items/search", headers=headers, params={"q": "zanzib"})
+    assert resp.status_code == 200
+    assert resp.json()[0]["id"] == item_id
+
+    resp = client.get("/api/items/search", headers=headers, params={"q": "zanzibr clove"})
+    assert item_id in [item["id"] for item in resp.json()]
+
+    resp = client.get(
+        "/api/items/search",
+        headers=headers,
+        params={"q": "zanzib", "category": ItemCategory.PRODUCE.value}
+    )
+    assert item_id not in [item["id"] for item in resp.json()]
+
+    resp = client.get("/api/items/search", headers=headers, params={"q": ""})
+    assert resp.status_code == 422
+
+def test_item_codes_lookup(client, admin_credentials, query_budget):
+    """Items resolve by any of their codes, singly or in one batch query."""
+    resp = client.post(
+        "/api/auth/login",
+        data={"username": admin_credentials["username"], "password": admin_credentials["password"]},
+    )
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    suffix = datetime.now().strftime("%H%M%S%f")
+    item_ids = []
+    for i in range(2):
+        resp = client.post("/api/items", headers=headers, json={
+            "name": get_unique_name(f"Scanned Item {i}"),
+            "category": ItemCategory.OTHER.value,
+            "unit_of_measure": "piece",
+            "par_level": 1,
+            "current_quantity": 1
+        })
+        item_ids.append(resp.json()["id"])
+
+    ean = f"40{suffix}"
+    sku = f"sku-{suffix}"
+    assert client.post(f"/api/items/{item_ids[0]}/codes", headers=headers, json={"code": ean}).status_code == 200
+    resp = client.post(f"/api/items/{item_ids[0]}/codes", headers=headers, json={"code": f" {sku} "})
+    assert resp.json()["code"] == sku.upper()
+    # A code belongs to one item only
+    resp = client.post(f"/api/items/{item_ids[1]}/codes", headers=headers, json={"code": ean})
+    assert resp.status_code == 409
+    # Blank once trimmed
+    resp = client.post(f"/api/items/{item_ids[1]}/codes", headers=headers, json={"code": "   "})
+    assert resp.status_code == 422
+    resp = client.post("/api/items/by-code", headers=headers, json={"codes": [ean, " "]})
+    assert resp.status_code == 422
+
+    resp = client.get(f"/api/items/by-code/{sku}", headers=headers)
+    assert resp.status_code == 200
+    assert resp.json()["id"] == item_ids[0]
+    assert client.get("/api/items/by-code/unknown-code", headers=headers).status_code == 404
+
+    codes = [ean, sku, "nope"] + [f"missing-{i}" for i in range(200)]
+    # user lookup + one query for the whole batch
+    with query_budget(2):
+        resp = client.post("/api/items/by-code", headers=headers, json={"codes": codes})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert {code: item["id"] for code, item in body["items"].items()} == {
+        ean: item_ids[0], sku: item_ids[0]
+    }
+    assert len(body["missing"]) == 201
+
+    resp = client.delete(f"/api/items/{item_ids[0]}/codes/{ean}", headers=headers)
+    assert resp.status_code == 200
+    assert client.get(f"/api/items/by-code/{ean}", headers=headers).status_code == 404
+
+def test_item_changes_sync(client, admin_credentials):
+    """Delta sync hands out changed items and tombstones after the last token."""
+    resp = client.post(
+        "/api/auth/login",
+        data={"username": admin_credentials["username"], "password": admin_credentials["password"]},
+    )
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+    # Catch up with the current catalog first
+    token = None
+    while True:
+        params = {"limit": 1000, **({"since": token} if token else {})}
+        resp = client.get("/api/items/changes", headers=headers, params=params)
+        assert resp.status_code == 200
+        token = resp.json()["next_token"]
+        if not resp.json()["has_more"]:
+            break
+
+    item_ids = []
+    for i in range(2):
+        resp = client.post("/api/items", headers=headers, json={
+            "name": get_unique_name(f"Synced Item {i}"),
+            "category": ItemCategory.OTHER.value,
+            "unit_of_measure": "piece",
+            "par_level": 1,
+            "current_quantity": 1
+        })
+        item_ids.append(resp.json()["id"])
+    assert client.delete(f"/api/items/{item_ids[1]}", headers=headers).status_code == 200
+
+    resp = client.get("/api/items/changes", headers=headers, params={"since": token})
+    body = resp.json()
+    assert [item["id"] for item in body["items"]] == [item_ids[0]]
+    assert body["deleted"] == [item_ids[1]]
+
+    resp = client.get("/api/items/changes", headers=headers, params={"since": body["next_token"]})
+    assert resp.json()["items"] == [] and resp.json()["deleted"] == []
+
+    resp = client.get("/api/items/changes", headers=headers, params={"since": "not-a-token"})
+    assert resp.status_code == 400
+
+    # A slow transaction that wrote first but commits last is not skipped
+    token = body["next_token"]
+    with SessionLocal() as slow:
+        slow.execute(update(Item).where(Item.id == UUID(item_ids[0])).values(par_level=2))
+        resp = client.post("/api/items", headers=headers, json={
+            "name": get_unique_name("Synced Item fast"),
+            "category": ItemCategory.OTHER.value,
+            "unit_of_measure": "piece",
+            "par_level": 1,
+            "current_quantity": 1
+        })
+        fast_id = resp.json()["id"]
+        resp = client.get("/api/items/changes", headers=headers, params={"since": token})
+        # Held back until the older transaction finishes
+        assert resp.json()["items"] == []
+        token = resp.json()["next_token"]
+        slow.commit()
+
+    resp = client.get("/api/items/changes", headers=headers, params={"since": token})
+    assert [item["id"] for item in resp.json()["items"]] == [item_ids[0], fast_id]
+    assert resp.json()["items"][0]["par_level"] == 2
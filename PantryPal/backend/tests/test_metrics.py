@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+from app.utils.loop_monitor import LoopMonitor
+
+def login(client, credentials):
+    resp = client.post(
+        "/api/auth/login",
+        data={"username": credentials["username"], "password": credentials["password"]},
+    )
+    assert resp.status_code == 200
+    return resp.json()["access_token"]
+
+def test_db_pool_metrics(client, admin_credentials):
+    """Admins can read live connection pool metrics."""
+    token = login(client, admin_credentials)
+
+    resp = client.get("/api/metrics/db-pool", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 200
+    stats = resp.json()
+    primary = stats["pools"]["primary"]
+    assert primary["checkouts"] >= 1
+    assert primary["checked_out"] >= 0
+    assert "p95_ms" in primary["checkout_wait_ms"]
+
+def test_db_pool_metrics_requires_auth(client):
+    resp = client.get("/api/metrics/db-pool")
+    assert resp.status_code == 401
+
+def test_loop_monitor_captures_blocking_call():
+    """A synchronous sleep on the loop is reported with the stack that caused it."""
+    def blocking_report_query():
+        time.sleep(0.3)
+
+    async def scenario():
+        monitor = LoopMonitor(interval_ms=20, threshold_ms=100)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        blocking_report_query()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["stalls"] == 1
+    stall = stats["recent_stalls"][0]
+    assert stall["duration_ms"] >= 250
+    assert any("blocking_report_query" in line for line in stall["stack"])
+    assert stats["lag_ms"]["max_ms"] >= 250
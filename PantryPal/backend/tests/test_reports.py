@@ -0,0 +1,105 @@
+import asyncio
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+from app.utils.export import encode_csv, encode_ndjson
+
+def login(client, credentials):
+    resp = client.post(
+        "/api/auth/login",
+        data={"username": credentials["username"], "password": credentials["password"]},
+    )
+    assert resp.status_code == 200
+    return resp.json()["access_token"]
+
+def test_count_summary_query_budget(client, admin_credentials, query_budget):
+    """Count summary resolves names and item totals with joins, not per-row loads."""
+    token = login(client, admin_credentials)
+    headers = {"Authorization": f"Bearer {token}"}
+    params = {"start_date": str(date.today() - timedelta(days=365))}
+
+    # Warm up so connection setup is not counted
+    client.get("/api/reports/counts", headers=headers, params=params)
+
+    # 1 user lookup + 1 summary query
+    with query_budget(2):
+        resp = client.get("/api/reports/counts", headers=headers, params=params)
+    assert resp.status_code == 200
+    assert isinstance(resp.json(), list)
+
+def test_discrepancy_report_single_query(client, admin_credentials, query_budget):
+    """Discrepancy thresholds and grouping are computed in one SQL query."""
+    token = login(client, admin_credentials)
+    headers = {"Authorization": f"Bearer {token}"}
+    params = {
+        "start_date": str(date.today() - timedelta(days=365)),
+        "min_variance_percentage": 25,
+    }
+
+    client.get("/api/reports/discrepancies", headers=headers, params=params)
+
+    # 1 user lookup + 1 report query
+    with query_budget(2):
+        resp = client.get("/api/reports/discrepancies", headers=headers, params=params)
+    assert resp.status_code == 200
+    for entry in resp.json():
+        assert entry["discrepancies"]
+        assert all(d["variance_percentage"] >= 25 for d in entry["discrepancies"])
+
+def test_count_summary_csv_export(client, admin_credentials):
+    """format=csv streams the count summary as a download with a header row."""
+    token = login(client, admin_credentials)
+    resp = client.get(
+        "/api/reports/counts",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"start_date": str(date.today() - timedelta(days=365)), "format": "csv"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    assert "attachment" in resp.headers["content-disposition"]
+    assert resp.text.splitlines()[0] == "id,date,staff,status,total_items,submitted_at,reviewed_at,reviewer"
+
+def test_report_export_rejects_unknown_format(client, admin_credentials):
+    token = login(client, admin_credentials)
+    resp = client.get(
+        "/api/reports/discrepancies",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"start_date": str(date.today()), "format": "xlsx"},
+    )
+    assert resp.status_code == 422
+
+async def _synthetic_rows(n):
+    for i in range(n):
+        yield {
+            "item_name": f"Item {i % 500}",
+            "date": date(2024, 1, 1) + timedelta(days=i % 365),
+            "expected": i,
+            "actual": i - 3,
+            "discrepancy": -3,
+            "variance_percentage": Decimal("12.5"),
+        }
+
+def _peak_encoding_memory(encode, n):
+    async def drain():
+        size = 0
+        async for chunk in encode(_synthetic_rows(n)):
+            size += len(chunk)
+        return size
+
+    tracemalloc.start()
+    try:
+        size = asyncio.run(drain())
+        return size, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def test_export_encoding_memory_is_flat():
+    """Peak memory of the encoders does not grow with the number of rows."""
+    columns = ("item_name", "date", "expected", "actual", "discrepancy", "variance_percentage")
+    for encode in (lambda rows: encode_csv(rows, columns), encode_ndjson):
+        small_size, small_peak = _peak_encoding_memory(encode, 10_000)
+        large_size, large_peak = _peak_encoding_memory(encode, 100_000)
+        assert large_size > 9 * small_size
+        # Ten times the output, but the peak stays around one chunk
+        assert large_peak < small_peak * 1.5
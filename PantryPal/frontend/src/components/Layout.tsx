@@ -1,5 +1,6 @@
 import { Link, Outlet, useNavigate, useLocation } from "react-router-dom";
 import { useAuth } from "../hooks/useAuth";
+import { useServerEvents } from "../hooks/useServerEvents";
 import {
   LayoutGrid,
   Box,
@@ -28,6 +29,7 @@ export default function Layout() {
   const location = useLocation();
   const [userMenuOpen, setUserMenuOpen] = useState(false);
   const [sidebarCollapsed, setSidebarCollapsed] = useState(false);
+  useServerEvents(!!user);
 
   const handleLogout = () => {
     logout();
@@ -0,0 +1,61 @@
+import { useEffect } from "react";
+import { useQueryClient } from "@tanstack/react-query";
+import { API_BASE_URL } from "../services/api";
+
+interface ServerEvent {
+  type: string;
+  data: Record<string, unknown>;
+}
+
+// Delay before reopening a stream the server refused (e.g. an expired token)
+const RETRY_MS = 5000;
+
+/**
+ * Subscribes to server-pushed change events and invalidates the affected
+ * queries, so pages refetch when data changes instead of polling.
+ */
+export function useServerEvents(enabled: boolean) {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    if (!enabled || typeof EventSource === "undefined") return;
+
+    let source: EventSource | null = null;
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+
+    const invalidate = (...keys: string[]) =>
+      keys.forEach((key) => queryClient.invalidateQueries({ queryKey: [key] }));
+
+    const handle = (event: ServerEvent) => {
+      if (event.type.startsWith("count.")) {
+        invalidate("counts", "count-stats", "dashboardStats");
+        if (event.data.items_changed) invalidate("items", "item", "lowStockItems");
+      } else if (event.type.startsWith("item")) {
+        invalidate("items", "item", "lowStockItems", "dashboardStats");
+      } else if (event.type === "resync") {
+        queryClient.invalidateQueries();
+      }
+    };
+
+    const connect = () => {
+      const token = localStorage.getItem("access_token");
+      if (!token) return;
+      // EventSource cannot send headers, so the token goes in the query string
+      source = new EventSource(`${API_BASE_URL}/events?token=${encodeURIComponent(token)}`);
+      source.onmessage = (message) => handle(JSON.parse(message.data));
+      source.onerror = () => {
+        // A closed source was refused; reopen it with the current token
+        if (source?.readyState === EventSource.CLOSED) {
+          source.close();
+          retryTimer = setTimeout(connect, RETRY_MS);
+        }
+      };
+    };
+
+    connect();
+    return () => {
+      clearTimeout(retryTimer);
+      source?.close();
+    };
+  }, [enabled, queryClient]);
+}
@@ -26,7 +26,7 @@ export default function PendingRequestsPage() {
   const { data: pendingCounts, isLoading } = useQuery({
     queryKey: ["counts", "pending"],
     queryFn: async () => {
-      const response = await apiClient.get("/counts?status=SUBMITTED");
+      const response = await apiClient.get("/counts?status=SUBMITTED&include=items");
       return response.data;
     },
   });
@@ -98,6 +98,10 @@ export interface Count {
   rejection_reason?: string;
   notes?: string;
   items: CountItem[];
+  // Line totals returned by the count list endpoints (without include=items)
+  items_count?: number;
+  total_abs_discrepancy?: number;
+  significant_discrepancy_count?: number;
   created_at: string;
   updated_at: string;
 }